@@ -3,18 +3,12 @@ from pathlib import Path
 import tkinter as tk
 import logging
 sys.path.insert(0, str(Path(__file__).parent.parent))
+from services import configuracion_logging
 from services.gestor_tareas import GestorTareas
 from Vista.vista import AppGUI
 
 def configurar_logging():
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('gestor_tareas.log', encoding='utf-8'),
-            logging.StreamHandler(stream=sys.stdout)  
-        ]
-    )
+    configuracion_logging.configurar_logging(archivo='gestor_tareas.log', consola=True)
     logging.addLevelName(logging.INFO, "[INFO]")
 
 def inicializar_gestor():
@@ -32,7 +26,7 @@ def inicializar_gestor():
         logging.info("✅ Conexión exitosa a PostgreSQL")
         return gestor
     except Exception as e:
-        logging.error(f"Error al conectar a PostgreSQL: {e}")
+        logging.error("Error al conectar a PostgreSQL: %s", e)
         logging.info("🔌 Usando modo memoria")
         return GestorTareas()  
 
@@ -45,8 +39,10 @@ if __name__ == "__main__":
         app = AppGUI(root, gestor)
         root.mainloop()
     except Exception as e:
-        logging.critical(f"Error crítico: {e}")
+        logging.critical("Error crítico: %s", e)
     finally:
+        # Escribe la actividad pendiente y cierra la conexión
+        gestor.cerrar()
         logging.info("Aplicación terminada")
 
 """
@@ -5,6 +5,7 @@ import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk
 from datetime import datetime
 from services.gestor_tareas import GestorTareas
+from services.configuracion_logging import asegurar_logging
 from exceptions.exceptions import (
     DescripcionVaciaError, CategoriaInvalidaError,
     TareaNoEncontradaError, UsuarioSinTareasError
@@ -30,7 +31,7 @@ class AppGUI:
                 self.gestor = GestorTareas(self.db_config)
                 logging.info("Conexión a PostgreSQL establecida")
         except Exception as e:
-            logging.error(f"Error al conectar a PostgreSQL: {e}")
+            logging.error("Error al conectar a PostgreSQL: %s", e)
             messagebox.showwarning(
                 "Modo Local", 
                 "No se pudo conectar a la base de datos. Trabajando en modo local."
@@ -40,16 +41,15 @@ class AppGUI:
         self.usuarios = {}  
         self.usuarioActual = None
         self.tarea_seleccionada = None
+        # Copia local de las tareas del usuario; se actualiza con cambios_desde
+        self._tareas_locales = {}
+        self._marca_tareas = 0
         self.configurar_logging()
         self.menuPrincipal()
 
     def configurar_logging(self):
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            filename='gestor_tareas.log',
-            encoding='utf-8'
-        )
+        # La interfaz es una aplicación: si nadie configuró el logging, a archivo
+        asegurar_logging(archivo='gestor_tareas.log', consola=False)
 
     def limpiarVentana(self):
         for widget in self.root.winfo_children():
@@ -112,7 +112,7 @@ class AppGUI:
             
         self.usuarios[nombre] = Usuario(nombre, clave)
         messagebox.showinfo("Registro exitoso", "Usuario creado correctamente.")
-        logging.info(f"Nuevo usuario registrado: {nombre}")
+        logging.info("Nuevo usuario registrado: %s", nombre)
 
     def iniciarSesion(self):
         nombre = simpledialog.askstring("Inicio de sesión", "Usuario:")
@@ -123,17 +123,32 @@ class AppGUI:
         clave = simpledialog.askstring("Inicio de sesión", "Contraseña:", show='*')
         if self.usuarios[nombre].verificarClave(clave):
             self.usuarioActual = nombre
-            logging.info(f"Usuario autenticado: {nombre}")
+            logging.info("Usuario autenticado: %s", nombre)
             self.menuUsuario()
         else:
             messagebox.showerror("Error", "Contraseña incorrecta.")
-            logging.warning(f"Intento de inicio fallido para: {nombre}")
+            logging.warning("Intento de inicio fallido para: %s", nombre)
 
     def cerrarSesion(self):
-        logging.info(f"Usuario cerró sesión: {self.usuarioActual}")
+        logging.info("Usuario cerró sesión: %s", self.usuarioActual)
         self.usuarioActual = None
+        self._tareas_locales = {}
+        self._marca_tareas = 0
         self.menuPrincipal()
 
+    def _sincronizar_tareas(self):
+        """Trae solo lo que cambió desde la última vez y devuelve la copia local (más recientes primero)."""
+        cambios = self.gestor.cambios_desde(self.usuarioActual, self._marca_tareas)
+        if cambios['completo']:
+            self._tareas_locales = {}
+        for tarea in cambios['tareas']:
+            self._tareas_locales[tarea['id']] = tarea
+        for tarea_id in cambios['eliminadas']:
+            self._tareas_locales.pop(tarea_id, None)
+        self._marca_tareas = cambios['marca']
+        return sorted(self._tareas_locales.values(),
+                      key=lambda tarea: (tarea['fecha_creacion'], tarea['id']), reverse=True)
+
     def agregarTarea(self):
         if not self.usuarioActual:
             messagebox.showerror("Error", "Debe iniciar sesión primero")
@@ -160,7 +175,7 @@ class AppGUI:
             return
             
         try:
-            tareas = self.gestor.obtener_tareas_usuario(self.usuarioActual)
+            tareas = self._sincronizar_tareas()
             
             ventana_tareas = tk.Toplevel(self.root)
             ventana_tareas.title("Mis Tareas")
@@ -199,7 +214,7 @@ class AppGUI:
             messagebox.showinfo("Info", "No hay tareas registradas")
         except Exception as e:
             messagebox.showerror("Error", f"No se pudieron cargar las tareas: {str(e)}")
-            logging.error(f"Error al cargar tareas: {str(e)}")
+            logging.error("Error al cargar tareas: %s", e)
 
     def eliminarTarea(self):
         if not self.usuarioActual:
@@ -223,14 +238,14 @@ class AppGUI:
             if confirmacion:
                 self.gestor.eliminar_tarea(tarea_id)
                 messagebox.showinfo("Éxito", "Tarea eliminada correctamente")
-                logging.info(f"Tarea eliminada - ID: {tarea_id} por {self.usuarioActual}")
+                logging.info("Tarea eliminada - ID: %s por %s", tarea_id, self.usuarioActual)
             
         except TareaNoEncontradaError as e:
             messagebox.showerror("Error", str(e))
-            logging.warning(f"Error al eliminar: {str(e)}")
+            logging.warning("Error al eliminar: %s", e)
         except Exception as e:
             messagebox.showerror("Error", f"Error inesperado: {str(e)}")
-            logging.error(f"Error al eliminar tarea: {str(e)}")
+            logging.error("Error al eliminar tarea: %s", e)
 
     def mostrar_ventana_cambiar_estado(self):
         if not self.usuarioActual:
@@ -264,7 +279,7 @@ class AppGUI:
 
         # Cargar tareas
         try:
-            tareas = self.gestor.obtener_tareas_usuario(self.usuarioActual)
+            tareas = self._sincronizar_tareas()
             if not tareas:
                 self.lista_tareas.insert(tk.END, "No hay tareas registradas")
             else:
@@ -330,7 +345,7 @@ if __name__ == "__main__":
         app = AppGUI(root)
         root.mainloop()
     except Exception as e:
-        logging.critical(f"Error crítico en la aplicación: {str(e)}")
+        logging.critical("Error crítico en la aplicación: %s", e)
         messagebox.showerror(
             "Error Fatal", 
             "Ha ocurrido un error crítico. Ver logs para detalles."
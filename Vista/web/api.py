@@ -0,0 +1,240 @@
+"""
+API JSON de tareas: ``/api/v1/tareas``.
+
+Usa la misma sesión que la interfaz HTML (hay que haber iniciado sesión en
+``/login``) y responde solo JSON. Los cuerpos de POST y PATCH deben enviarse
+con ``Content-Type: application/json``; así otro sitio no puede enviarlos
+con un formulario aprovechando la cookie de sesión.
+
+Las respuestas GET llevan ``ETag`` (huella del contenido) y
+``Cache-Control: private, no-cache``; la de una tarea, también
+``Last-Modified`` cuando se conoce. Si el cliente envía ``If-None-Match``
+con el ETag que ya tiene, se responde 304 sin cuerpo. ``Last-Modified``
+solo tiene segundos enteros: con solo ``If-Modified-Since`` se responde 304
+únicamente si la tarea no cambió en ese segundo ni después.
+
+Para mantener una copia local, ``/tareas/cambios`` devuelve solo lo que
+cambió desde la marca de la llamada anterior (ver
+``GestorTareas.cambios_desde``).
+
+Rutas:
+-----
+- GET    /api/v1/tareas                 listado paginado (limit, cursor, categoria, estado)
+- GET    /api/v1/tareas/cambios         cambios desde una marca (desde)
+- POST   /api/v1/tareas                 crea una tarea {descripcion, categoria}
+- POST   /api/v1/tareas/lote            crea varias {tareas: [{descripcion, categoria}, ...]}
+- GET    /api/v1/tareas/<id>            una tarea
+- PATCH  /api/v1/tareas/<id>            cambia descripcion y/o categoria
+- PATCH  /api/v1/tareas/<id>/estado     cambia el estado {estado}
+- DELETE /api/v1/tareas/<id>            elimina la tarea
+
+Ejemplo de uso:
+--------------
+>>> app.extensions['gestor_tareas'] = gestor
+>>> app.register_blueprint(api)
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from flask import Blueprint, current_app, jsonify, request, session, url_for
+from werkzeug.exceptions import HTTPException
+
+from services.gestor_tareas import (
+    AccesoDenegadoError, CategoriaInvalidaError, DescripcionVaciaError, EstadoInvalidoError,
+    TareaNoEncontradaError
+)
+
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+LIMITE_PAGINA = 50
+LIMITE_PAGINA_MAX = 500
+
+# Errores de validación del gestor: llegan envueltos en RuntimeError
+_ERRORES_VALIDACION = (ValueError, CategoriaInvalidaError, DescripcionVaciaError, EstadoInvalidoError)
+
+
+class PeticionInvalidaError(Exception): pass
+
+
+def _gestor():
+    return current_app.extensions['gestor_tareas']
+
+
+def _tarea_json(tarea) -> Dict[str, Any]:
+    datos = {
+        'id': tarea['id'],
+        'descripcion': tarea['descripcion'],
+        'categoria': tarea['categoria'],
+        'estado': tarea['estado'],
+        'fecha_creacion': tarea['fecha_creacion'].isoformat()
+    }
+    if tarea.get('version') is not None:
+        datos['actualizado_en'] = tarea['actualizado_en'].isoformat()
+        datos['version'] = tarea['version']
+    return datos
+
+
+def _cuerpo_json() -> Dict[str, Any]:
+    if not request.is_json:
+        raise PeticionInvalidaError("Se esperaba un cuerpo 'application/json'")
+    datos = request.get_json(silent=True)
+    if not isinstance(datos, dict):
+        raise PeticionInvalidaError("El cuerpo debe ser un objeto JSON")
+    return datos
+
+
+def _campo_texto(datos: Dict[str, Any], campo: str) -> str:
+    valor = datos.get(campo)
+    if not isinstance(valor, str):
+        raise PeticionInvalidaError(f"Falta el campo de texto '{campo}'")
+    return valor
+
+
+def _en_utc(fecha: datetime) -> datetime:
+    # PostgreSQL entrega actualizado_en con zona; el modo memoria, en hora local de este proceso
+    return fecha.astimezone(timezone.utc)
+
+
+def _respuesta_condicional(datos, ultima_modificacion: Optional[datetime] = None):
+    respuesta = jsonify(datos)
+    respuesta.cache_control.private = True
+    respuesta.cache_control.no_cache = True
+    respuesta.add_etag()
+    if ultima_modificacion is not None:
+        ultima_modificacion = _en_utc(ultima_modificacion)
+        respuesta.last_modified = ultima_modificacion
+    desde = request.if_modified_since
+    if 'If-None-Match' not in request.headers and desde is not None:
+        # If-Modified-Since tiene segundos enteros: un cambio dentro del mismo
+        # segundo que la copia del cliente parecería no modificado. Sin ETag
+        # con el que comparar, solo es seguro el 304 si el último cambio es
+        # anterior a ese segundo.
+        if ultima_modificacion is None or ultima_modificacion >= desde:
+            return respuesta
+    return respuesta.make_conditional(request)
+
+
+def _error(mensaje: str, estado: int):
+    return jsonify({'error': mensaje}), estado
+
+
+@api.before_request
+def exigir_sesion():
+    if 'usuario' not in session:
+        return _error("Sesión no iniciada", 401)
+
+
+@api.errorhandler(PeticionInvalidaError)
+def peticion_invalida(e):
+    return _error(str(e), 400)
+
+
+@api.errorhandler(TareaNoEncontradaError)
+def tarea_no_encontrada(e):
+    return _error(str(e), 404)
+
+
+@api.errorhandler(AccesoDenegadoError)
+def acceso_denegado(e):
+    return _error(str(e), 403)
+
+
+@api.errorhandler(RuntimeError)
+def error_gestor(e):
+    if isinstance(e.__context__, _ERRORES_VALIDACION):
+        return _error(str(e.__context__), 400)
+    current_app.logger.error("Error en la API: %s", e)
+    return _error(str(e), 500)
+
+
+@api.errorhandler(HTTPException)
+def error_http(e):
+    return _error(e.description, e.code)
+
+
+@api.route('/tareas', methods=['GET'])
+def listar_tareas():
+    limite = min(max(request.args.get('limit', LIMITE_PAGINA, type=int), 1), LIMITE_PAGINA_MAX)
+    pagina = _gestor().obtener_tareas_usuario_paginado(
+        session['usuario'], limite=limite, cursor=request.args.get('cursor') or None,
+        categoria=request.args.get('categoria') or None, estado=request.args.get('estado') or None
+    )
+    return _respuesta_condicional({
+        'tareas': [_tarea_json(tarea) for tarea in pagina['tareas']],
+        'siguiente_cursor': pagina['siguiente_cursor']
+    })
+
+
+@api.route('/tareas/cambios', methods=['GET'])
+def cambios_tareas():
+    desde = request.args.get('desde', '0')
+    if not desde.isdecimal():
+        raise PeticionInvalidaError(f"Marca inválida: '{desde}'")
+    cambios = _gestor().cambios_desde(session['usuario'], int(desde))
+    respuesta = jsonify({
+        'tareas': [_tarea_json(tarea) for tarea in cambios['tareas']],
+        'eliminadas': cambios['eliminadas'],
+        'marca': cambios['marca'],
+        'completo': cambios['completo']
+    })
+    respuesta.cache_control.no_store = True
+    return respuesta
+
+
+@api.route('/tareas', methods=['POST'])
+def crear_tarea():
+    datos = _cuerpo_json()
+    usuario = session['usuario']
+    tarea_id = _gestor().agregar_tarea(usuario, _campo_texto(datos, 'descripcion'),
+                                       _campo_texto(datos, 'categoria'))
+    respuesta = jsonify(_tarea_json(_gestor().obtener_tarea_de_usuario(tarea_id, usuario)))
+    respuesta.status_code = 201
+    respuesta.headers['Location'] = url_for('api.obtener_tarea', id=tarea_id)
+    return respuesta
+
+
+@api.route('/tareas/lote', methods=['POST'])
+def crear_tareas_lote():
+    tareas = _cuerpo_json().get('tareas')
+    if not isinstance(tareas, list) or not all(isinstance(tarea, dict) for tarea in tareas):
+        raise PeticionInvalidaError("'tareas' debe ser una lista de objetos")
+    resultado = _gestor().agregar_tareas_lote(session['usuario'], tareas)
+    # Los items inválidos no detienen el lote: se informan por su índice
+    return jsonify({
+        'ids': resultado['ids'],
+        'errores': {str(indice): mensaje for indice, mensaje in resultado['errores'].items()}
+    }), 201
+
+
+@api.route('/tareas/<int:id>', methods=['GET'])
+def obtener_tarea(id):
+    tarea = _gestor().obtener_tarea_de_usuario(id, session['usuario'])
+    return _respuesta_condicional(_tarea_json(tarea), tarea.get('actualizado_en'))
+
+
+@api.route('/tareas/<int:id>', methods=['PATCH'])
+def editar_tarea(id):
+    datos = _cuerpo_json()
+    if 'descripcion' not in datos and 'categoria' not in datos:
+        raise PeticionInvalidaError("Indica 'descripcion' y/o 'categoria'")
+    usuario = session['usuario']
+    gestor = _gestor()
+    actual = gestor.obtener_tarea_de_usuario(id, usuario)
+    descripcion = _campo_texto(datos, 'descripcion') if 'descripcion' in datos else actual['descripcion']
+    categoria = _campo_texto(datos, 'categoria') if 'categoria' in datos else actual['categoria']
+    gestor.editar_tarea_de_usuario(id, usuario, descripcion, categoria)
+    return jsonify(_tarea_json(gestor.obtener_tarea_de_usuario(id, usuario)))
+
+
+@api.route('/tareas/<int:id>/estado', methods=['PATCH'])
+def cambiar_estado_tarea(id):
+    estado = _campo_texto(_cuerpo_json(), 'estado')
+    usuario = session['usuario']
+    _gestor().cambiar_estado_tarea_de_usuario(id, usuario, estado)
+    return jsonify(_tarea_json(_gestor().obtener_tarea_de_usuario(id, usuario)))
+
+
+@api.route('/tareas/<int:id>', methods=['DELETE'])
+def eliminar_tarea(id):
+    _gestor().eliminar_tarea_de_usuario(id, session['usuario'])
+    return '', 204
@@ -1,80 +1,249 @@
+import logging
 import sys
 import os
+import threading
+from typing import Optional
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from flask import Flask, render_template, request, redirect, url_for, session, flash
-from werkzeug.security import generate_password_hash, check_password_hash
-from services.gestor_tareas import GestorTareas, UsuarioSinTareasError, TareaNoEncontradaError
-from database.database_config import DB_CONFIG
+from flask import Flask, Response, current_app, render_template, request, redirect, url_for, session, flash
+from services.gestor_tareas import (
+    GestorTareas, TareaNoEncontradaError, AccesoDenegadoError
+)
+from services.instrumentacion import Instrumentacion
+from services.cache_listados import CacheListadosMemoria, CacheListadosRedis
+from services.refresco_reportes import RefrescoReportes
+from services.mantenimiento_logs import MantenimientoLogs
+from services.sesiones import crear_almacen_sesiones
+from services.autenticacion import (
+    Autenticacion, CredencialesInvalidasError, DemasiadosIntentosError,
+    UsuarioYaExisteError, AutenticacionSaturadaError
+)
+from database.database_config import (
+    DB_CONFIG, POOL_CONFIG, CACHE_LISTADOS_CONFIG, REPORTES_CONFIG, ACTIVIDAD_CONFIG, LOGS_CONFIG,
+    AUTENTICACION_CONFIG, SESIONES_CONFIG
+)
+from Vista.web.sesiones import InterfazSesionesServidor
+from Vista.web.api import api
 
-app = Flask(__name__)
-app.secret_key = 'clave_secreta_segura'
-gestor = GestorTareas(db_config=DB_CONFIG)
+# Recursos del proceso (los crea iniciar_recursos). Con varios procesos
+# servidor cada uno debe crear los suyos después del fork: una conexión
+# psycopg2 heredada y usada por dos procesos a la vez se corrompe.
+gestor: Optional[GestorTareas] = None
+autenticacion: Optional[Autenticacion] = None
+instrumentacion: Optional[Instrumentacion] = None
+refresco_reportes: Optional[RefrescoReportes] = None
+mantenimiento_logs: Optional[MantenimientoLogs] = None
 
-@app.route('/')
+LIMITE_PAGINA = 50
+LIMITE_PAGINA_MAX = 500
+
+_rutas = []
+_lock_app = threading.Lock()
+logger = logging.getLogger(__name__)
+
+
+def ruta(regla: str, **opciones):
+    """Como ``app.route``; las rutas se registran en cada app que crea crear_app."""
+    def decorador(funcion):
+        _rutas.append((regla, funcion, opciones))
+        return funcion
+    return decorador
+
+
+def crear_app(iniciar: bool = True, db_config: Optional[dict] = None,
+              pool_config: Optional[dict] = None) -> Flask:
+    """
+    Crea la aplicación Flask.
+
+    Con ``iniciar=False`` no abre conexiones ni arranca hilos: es lo que usa
+    un servidor con varios procesos (Vista/web/servidor.py) para cargar la
+    aplicación y las plantillas una sola vez antes del fork, y llamar a
+    ``iniciar_recursos`` en cada proceso hijo.
+    """
+    app = Flask(__name__)
+    app.secret_key = 'clave_secreta_segura'
+    for regla, funcion, opciones in _rutas:
+        app.add_url_rule(regla, view_func=funcion, **opciones)
+    app.register_blueprint(api)
+    app.before_request(verificar_usuario_sesion)
+    if iniciar:
+        iniciar_recursos(app, db_config, pool_config)
+    return app
+
+
+def __getattr__(nombre: str):
+    # ``gestor_tareas_web:app`` (flask run, gunicorn...) sigue funcionando: la
+    # app del proceso, con sus recursos, se crea la primera vez que se pide
+    if nombre != 'app':
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    with _lock_app:
+        if 'app' not in globals():
+            globals()['app'] = crear_app()
+    return globals()['app']
+
+
+def precargar_plantillas(app: Flask):
+    """Compila todas las plantillas (antes del fork, para que los hijos las hereden)."""
+    for nombre in app.jinja_env.list_templates():
+        app.jinja_env.get_template(nombre)
+
+
+def _crear_cache_listados(multiproceso: bool):
+    config = dict(CACHE_LISTADOS_CONFIG)
+    url = config.pop('redis_url', None)
+    if url:
+        return CacheListadosRedis.desde_url(url, ttl=config.get('ttl'))
+    if multiproceso:
+        # Cada proceso invalidaría solo su copia y los demás servirían listados obsoletos
+        logger.warning("Caché de listados desactivada: hay varios procesos y no se configuró 'redis_url'")
+        return None
+    return CacheListadosMemoria(**config)
+
+
+def iniciar_recursos(app: Flask, db_config: Optional[dict] = None, pool_config: Optional[dict] = None,
+                     multiproceso: bool = False):
+    """
+    Abre las conexiones y arranca los servicios de fondo del proceso actual.
+    Con ``multiproceso`` solo se usan cachés que se puedan compartir entre procesos.
+    """
+    global gestor, autenticacion, instrumentacion, refresco_reportes, mantenimiento_logs
+    # Sesiones en el servidor: la cookie solo lleva el identificador
+    app.session_interface = InterfazSesionesServidor(crear_almacen_sesiones(**SESIONES_CONFIG))
+    # Con PostgreSQL el gestor escribe logs_actividad por lotes con su propio registro
+    gestor = GestorTareas(db_config=db_config or DB_CONFIG, pool_config=pool_config or POOL_CONFIG,
+                          cache_listados=_crear_cache_listados(multiproceso),
+                          actividad_config=ACTIVIDAD_CONFIG)
+    app.extensions['gestor_tareas'] = gestor
+    autenticacion = Autenticacion(gestor, **AUTENTICACION_CONFIG)
+
+    # Instrumentación opcional: GESTOR_METRICAS=1 activa /metrics
+    instrumentacion = None
+    if os.environ.get('GESTOR_METRICAS') == '1':
+        instrumentacion = Instrumentacion()
+        instrumentacion.instrumentar(gestor)
+
+    # Los reportes se leen de una vista materializada que se refresca en segundo plano
+    # y logs_actividad se reparte en particiones mensuales
+    refresco_reportes = mantenimiento_logs = None
+    if gestor.usa_postgresql:
+        refresco_reportes = RefrescoReportes(gestor, **REPORTES_CONFIG).iniciar()
+        mantenimiento_logs = MantenimientoLogs(gestor, **LOGS_CONFIG).iniciar()
+
+
+def detener_recursos():
+    """Para los servicios de fondo (escribiendo lo pendiente) y cierra las conexiones."""
+    global gestor, autenticacion, refresco_reportes, mantenimiento_logs
+    for servicio in (mantenimiento_logs, refresco_reportes):
+        if servicio is not None:
+            servicio.detener()
+    refresco_reportes = mantenimiento_logs = None
+    if autenticacion is not None:
+        autenticacion.cerrar()
+        autenticacion = None
+    if gestor is not None:
+        gestor.cerrar()
+        gestor = None
+
+
+def verificar_usuario_sesion():
+    # Si el usuario se borró o se renombró después de iniciar sesión, la sesión
+    # ya no vale: se cierra en lugar de volver a meter el par viejo en la caché
+    if 'usuario_id' not in session:
+        return
+    if not current_app.extensions['gestor_tareas'].verificar_usuario(session['usuario'], session['usuario_id']):
+        session.clear()
+
+@ruta('/')
 def index():
     if 'usuario' not in session:
         return redirect(url_for('login'))
 
     usuario = session['usuario']
+    cursor = request.args.get('cursor') or None
+    limite = min(max(request.args.get('limit', LIMITE_PAGINA, type=int), 1), LIMITE_PAGINA_MAX)
+    siguiente_cursor = None
     try:
-        tareas = gestor.obtener_tareas_usuario(usuario)
-    except UsuarioSinTareasError:
-        tareas = []
+        pagina = gestor.obtener_tareas_usuario_paginado(usuario, limite=limite, cursor=cursor)
+        tareas = pagina['tareas']
+        siguiente_cursor = pagina['siguiente_cursor']
     except Exception as e:
         flash(f"Error inesperado: {str(e)}")
         tareas = []
 
-    return render_template('index.html', usuario=usuario, tareas=tareas)
+    return render_template('index.html', usuario=usuario, tareas=tareas, cursor=cursor,
+                           siguiente_cursor=siguiente_cursor, limite=limite)
+
+@ruta('/buscar')
+def buscar():
+    if 'usuario' not in session:
+        return redirect(url_for('login'))
+
+    usuario = session['usuario']
+    consulta = request.args.get('q', '').strip()
+    limite = min(max(request.args.get('limit', LIMITE_PAGINA, type=int), 1), LIMITE_PAGINA_MAX)
+    tareas = []
+    if consulta:
+        try:
+            tareas = gestor.buscar_texto(usuario, consulta, limite=limite)
+        except Exception as e:
+            flash(f"Error inesperado: {str(e)}")
+
+    return render_template('buscar.html', usuario=usuario, consulta=consulta, tareas=tareas)
 
-@app.route('/login', methods=['GET', 'POST'])
+@ruta('/metrics')
+def metrics():
+    if instrumentacion is None:
+        return Response("Instrumentación desactivada (GESTOR_METRICAS=1 para activarla)\n",
+                        status=404, mimetype='text/plain')
+    return Response(instrumentacion.exportar_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@ruta('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
         usuario = request.form['usuario']
         password = request.form['password']
 
         try:
-            usuario_id = gestor._obtener_id_usuario(usuario)
-            if usuario_id is None:
-                flash('Usuario no registrado')
-                return render_template('login.html')
-
-            with gestor.conn.cursor() as cur:
-                cur.execute("SELECT password_hash FROM usuarios WHERE id = %s", (usuario_id,))
-                result = cur.fetchone()
-                if result and check_password_hash(result[0], password):
-                    session['usuario'] = usuario
-                    return redirect(url_for('index'))
-                else:
-                    flash('Contraseña incorrecta')
+            usuario_id = autenticacion.autenticar(usuario, password, origen=request.remote_addr)
+            session.regenerar()
+            session['usuario'] = usuario.strip()
+            session['usuario_id'] = usuario_id
+            gestor.recordar_usuario(session['usuario'], usuario_id)
+            return redirect(url_for('index'))
+        except CredencialesInvalidasError:
+            flash('Usuario o contraseña incorrectos')
+        except DemasiadosIntentosError:
+            flash('Demasiados intentos fallidos, espera unos minutos')
+        except AutenticacionSaturadaError:
+            flash('Servidor ocupado, inténtalo de nuevo')
         except Exception as e:
             flash(f'Error en la base de datos: {str(e)}')
     return render_template('login.html')
 
-@app.route('/register', methods=['GET', 'POST'])
+@ruta('/register', methods=['GET', 'POST'])
 def register():
     if request.method == 'POST':
         usuario = request.form['usuario']
         password = request.form['password']
-        hash_pw = generate_password_hash(password)
 
         try:
-            with gestor.conn.cursor() as cur:
-                cur.execute("INSERT INTO usuarios (username, password_hash) VALUES (%s, %s)", (usuario, hash_pw))
-                gestor.conn.commit()
-                flash('Registro exitoso, inicia sesión')
-                return redirect(url_for('login'))
+            autenticacion.registrar(usuario, password)
+            flash('Registro exitoso, inicia sesión')
+            return redirect(url_for('login'))
+        except UsuarioYaExisteError:
+            flash('Ese usuario ya existe')
+        except AutenticacionSaturadaError:
+            flash('Servidor ocupado, inténtalo de nuevo')
         except Exception as e:
-            gestor.conn.rollback()
             flash(f'Error al registrar: {str(e)}')
     return render_template('register.html')
 
-@app.route('/logout')
+@ruta('/logout')
 def logout():
-    session.pop('usuario', None)
+    session.clear()
     return redirect(url_for('login'))
 
-@app.route('/agregar', methods=['POST'])
+@ruta('/agregar', methods=['POST'])
 def agregar():
     if 'usuario' not in session:
         return redirect(url_for('login'))
@@ -90,7 +259,7 @@ def agregar():
         flash(f"Error al agregar tarea: {str(e)}")
     return redirect(url_for('index'))
 
-@app.route('/eliminar/<int:id>')
+@ruta('/eliminar/<int:id>')
 def eliminar(id):
     if 'usuario' not in session:
         return redirect(url_for('login'))
@@ -98,20 +267,17 @@ def eliminar(id):
     usuario = session['usuario']
 
     try:
-        tarea = gestor.obtener_tarea(id)
-        if not gestor.tarea_pertenece_a_usuario(id, usuario):
-            flash("No tienes permiso para eliminar esta tarea")
-            return redirect(url_for('index'))
-
-        gestor.eliminar_tarea(id)
+        gestor.eliminar_tarea_de_usuario(id, usuario)
         flash("Tarea eliminada")
+    except AccesoDenegadoError:
+        flash("No tienes permiso para eliminar esta tarea")
     except TareaNoEncontradaError:
         flash("Tarea no encontrada")
     except Exception as e:
         flash(f"Error: {str(e)}")
     return redirect(url_for('index'))
 
-@app.route('/cambiar_estado/<int:id>', methods=['POST'])
+@ruta('/cambiar_estado/<int:id>', methods=['POST'])
 def cambiar_estado(id):
     if 'usuario' not in session:
         return redirect(url_for('login'))
@@ -120,19 +286,17 @@ def cambiar_estado(id):
     nuevo_estado = request.form['estado']
 
     try:
-        if not gestor.tarea_pertenece_a_usuario(id, usuario):
-            flash("No tienes permiso para cambiar el estado de esta tarea")
-            return redirect(url_for('index'))
-
-        gestor.cambiar_estado_tarea(id, nuevo_estado)
+        gestor.cambiar_estado_tarea_de_usuario(id, usuario, nuevo_estado)
         flash("Estado actualizado correctamente")
+    except AccesoDenegadoError:
+        flash("No tienes permiso para cambiar el estado de esta tarea")
     except TareaNoEncontradaError:
         flash("Tarea no encontrada para cambiar estado")
     except Exception as e:
         flash(f"Error al cambiar estado: {str(e)}")
     return redirect(url_for('index'))
 
-@app.route('/editar/<int:id>', methods=['GET', 'POST'])
+@ruta('/editar/<int:id>', methods=['GET', 'POST'])
 def editar(id):
     if 'usuario' not in session:
         return redirect(url_for('login'))
@@ -144,25 +308,27 @@ def editar(id):
         nueva_categoria = request.form['categoria']
 
         try:
-            if not gestor.tarea_pertenece_a_usuario(id, usuario):
-                flash("No tienes permiso para editar esta tarea")
-                return redirect(url_for('index'))
-
-            gestor.editar_tarea(id, nueva_descripcion, nueva_categoria)
+            gestor.editar_tarea_de_usuario(id, usuario, nueva_descripcion, nueva_categoria)
             flash("Tarea actualizada exitosamente")
             return redirect(url_for('index'))
+        except AccesoDenegadoError:
+            flash("No tienes permiso para editar esta tarea")
+            return redirect(url_for('index'))
+        except TareaNoEncontradaError:
+            flash("Tarea no encontrada")
+            return redirect(url_for('index'))
         except Exception as e:
             flash(f"Error al actualizar tarea: {str(e)}")
-            # Se Agrega esta línea para renderizar de nuevo el formulario con error
-            tarea = gestor.obtener_tarea(id)  # Recupera la tarea para mostrarla
+            # Se vuelve a mostrar el formulario con los datos que envió el usuario
+            tarea = {'id': id, 'descripcion': nueva_descripcion, 'categoria': nueva_categoria}
             return render_template('editar.html', tarea=tarea)
 
     else:
         try:
-            tarea = gestor.obtener_tarea(id)
-            if not gestor.tarea_pertenece_a_usuario(id, usuario):
-                flash("No tienes permiso para editar esta tarea")
-                return redirect(url_for('index'))
+            tarea = gestor.obtener_tarea_de_usuario(id, usuario)
+        except AccesoDenegadoError:
+            flash("No tienes permiso para editar esta tarea")
+            return redirect(url_for('index'))
         except Exception as e:
             flash(f"Tarea no encontrada: {str(e)}")
             return redirect(url_for('index'))
@@ -170,4 +336,5 @@ def editar(id):
         return render_template('editar.html', tarea=tarea)
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    # Servidor de desarrollo; en producción: python -m Vista.web.servidor
+    crear_app().run(debug=True, threaded=True)
@@ -0,0 +1,228 @@
+"""
+Servidor de producción de la interfaz web: N procesos x M hilos.
+
+El proceso maestro abre el socket, crea la aplicación con
+``crear_app(iniciar=False)`` y compila las plantillas; después lanza los
+procesos hijo con fork. Cada hijo llama a ``iniciar_recursos`` (su propio
+pool de conexiones, caché y servicios de fondo) y atiende peticiones con un
+pool de M hilos sobre el socket compartido. Si un hijo muere, el maestro lanza
+otro.
+
+Señales del maestro:
+-------------------
+- SIGTERM / SIGINT: parada ordenada. Los hijos dejan de aceptar conexiones,
+  terminan las peticiones en curso, escriben lo pendiente y cierran.
+- SIGHUP: recarga ordenada. Se lanzan hijos nuevos y se paran los
+  anteriores del mismo modo (conexiones nuevas, sin cortar peticiones). El
+  código no se recarga: para eso hay que reiniciar el maestro.
+
+Todos los procesos escriben en el mismo archivo de log (``--log``) sin
+rotarlo: si se rota con logrotate (o similar), cada proceso reabre el
+archivo nuevo al escribir.
+
+Solo funciona en sistemas con ``os.fork`` (Linux, macOS).
+
+Uso:
+----
+python -m Vista.web.servidor --host 0.0.0.0 --puerto 8000 --procesos 4 --hilos 8
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from services.configuracion_logging import configurar_logging, detener_logging
+from Vista.web import gestor_tareas_web
+from database.database_config import SESIONES_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class _ManejadorPeticiones(WSGIRequestHandler):
+    # Una petición por conexión: con un número fijo de hilos, una conexión
+    # keep-alive inactiva no debe ocupar uno indefinidamente
+    protocol_version = 'HTTP/1.0'
+    timeout = 30
+
+
+class ServidorHilos(BaseWSGIServer):
+    """Servidor WSGI que atiende con un pool fijo de ``hilos`` sobre un socket ya abierto."""
+
+    multithread = True
+
+    def __init__(self, app, host: str, fd: int, hilos: int):
+        super().__init__(host, 0, app, handler=_ManejadorPeticiones, fd=fd)
+        self._ejecutor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='peticion')
+        # Con todos los hilos ocupados deja de aceptar: la conexión la toma otro proceso
+        self._plazas = threading.BoundedSemaphore(hilos)
+
+    def process_request(self, request, client_address):
+        self._plazas.acquire()
+        self._ejecutor.submit(self._atender, request, client_address)
+
+    def _atender(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._plazas.release()
+
+    def terminar(self):
+        """Espera a que acaben las peticiones en curso."""
+        self._ejecutor.shutdown(wait=True)
+
+
+class Servidor:
+    def __init__(self, host: str = '127.0.0.1', puerto: int = 8000, procesos: int = 2,
+                 hilos: int = 8, timeout_parada: float = 30.0):
+        self.host = host
+        self.puerto = puerto
+        self.procesos = procesos
+        self.hilos = hilos
+        self.timeout_parada = timeout_parada
+        self._hijos: Dict[int, int] = {}   # pid -> generación
+        self._generacion = 0
+        self._parar = False
+        self._recargar = False
+
+    def ejecutar(self):
+        self.socket = socket.create_server((self.host, self.puerto), backlog=2048)
+        self.app = gestor_tareas_web.crear_app(iniciar=False)
+        gestor_tareas_web.precargar_plantillas(self.app)
+
+        signal.signal(signal.SIGTERM, self._al_parar)
+        signal.signal(signal.SIGINT, self._al_parar)
+        signal.signal(signal.SIGHUP, self._al_recargar)
+        logger.info("Servidor en %s:%s con %s procesos x %s hilos",
+                    self.host, self.puerto, self.procesos, self.hilos)
+        for _ in range(self.procesos):
+            self._lanzar_hijo()
+
+        while not self._parar:
+            if self._recargar:
+                self._recargar = False
+                self._recargar_hijos()
+            self._recoger_hijos()
+            time.sleep(0.2)
+        self._detener_hijos()
+        self.socket.close()
+        logger.info("Servidor detenido")
+
+    def _al_parar(self, signum, frame):
+        self._parar = True
+
+    def _al_recargar(self, signum, frame):
+        self._recargar = True
+
+    def _lanzar_hijo(self):
+        pid = os.fork()
+        if pid == 0:
+            codigo = 0
+            try:
+                self._trabajar()
+            except BaseException:
+                logger.exception("Error en el proceso %s", os.getpid())
+                codigo = 1
+            finally:
+                # os._exit no ejecuta atexit: se vacía la cola de logs a mano
+                detener_logging()
+                os._exit(codigo)
+        self._hijos[pid] = self._generacion
+        logger.info("Proceso %s iniciado", pid)
+
+    def _recargar_hijos(self):
+        logger.info("Recargando procesos")
+        anteriores = list(self._hijos)
+        self._generacion += 1
+        for _ in range(self.procesos):
+            self._lanzar_hijo()
+        for pid in anteriores:
+            self._enviar(pid, signal.SIGTERM)
+
+    def _recoger_hijos(self):
+        while self._hijos:
+            try:
+                pid, estado = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            generacion = self._hijos.pop(pid, None)
+            if generacion == self._generacion and not self._parar:
+                logger.warning("Proceso %s terminó inesperadamente (estado %s); se lanza otro", pid, estado)
+                self._lanzar_hijo()
+
+    def _detener_hijos(self):
+        for pid in list(self._hijos):
+            self._enviar(pid, signal.SIGTERM)
+        limite = time.monotonic() + self.timeout_parada
+        while self._hijos and time.monotonic() < limite:
+            self._recoger_hijos()
+            time.sleep(0.1)
+        for pid in list(self._hijos):
+            logger.warning("Proceso %s no terminó a tiempo; se fuerza su salida", pid)
+            self._enviar(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            self._hijos.pop(pid, None)
+
+    @staticmethod
+    def _enviar(pid: int, senal: int):
+        try:
+            os.kill(pid, senal)
+        except ProcessLookupError:
+            pass
+
+    def _trabajar(self):
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        gestor_tareas_web.iniciar_recursos(self.app, multiproceso=self.procesos > 1)
+        servidor = ServidorHilos(self.app, self.host, self.socket.fileno(), self.hilos)
+
+        def al_parar(signum, frame):
+            # shutdown() espera al bucle de serve_forever: se llama desde otro hilo
+            threading.Thread(target=servidor.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, al_parar)
+        try:
+            servidor.serve_forever()
+        finally:
+            servidor.terminar()
+            gestor_tareas_web.detener_recursos()
+            logger.info("Proceso %s detenido", os.getpid())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de producción de la interfaz web")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8000)
+    parser.add_argument('--procesos', type=int, default=os.cpu_count() or 2,
+                        help="Procesos servidor (por defecto, uno por CPU)")
+    parser.add_argument('--hilos', type=int, default=8, help="Hilos por proceso")
+    parser.add_argument('--timeout-parada', type=float, default=30.0,
+                        help="Segundos de espera a que los procesos terminen sus peticiones")
+    parser.add_argument('--log', default='gestor_tareas_web.log', help="Archivo de log")
+    args = parser.parse_args()
+
+    if not hasattr(os, 'fork'):
+        sys.exit("Este servidor necesita os.fork; en este sistema usa gestor_tareas_web.py")
+    if args.procesos > 1 and SESIONES_CONFIG['backend'] == 'memoria':
+        sys.exit("Con varios procesos las sesiones deben compartirse: usa SESIONES_CONFIG['backend'] = 'sqlite'")
+    # Sin rotación propia: varios procesos no pueden rotar el mismo archivo
+    configurar_logging(archivo=args.log, rotar=False)
+    Servidor(args.host, args.puerto, args.procesos, args.hilos, args.timeout_parada).ejecutar()
+
+
+if __name__ == '__main__':
+    main()
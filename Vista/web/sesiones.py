@@ -0,0 +1,74 @@
+"""
+Sesiones de Flask guardadas en el servidor.
+
+La cookie lleva solo un identificador aleatorio; el contenido de la sesión
+se serializa (mismo formato que las sesiones por cookie de Flask) en uno de
+los almacenes de ``services.sesiones``. Así se puede guardar en la sesión
+el ``usuario_id`` ya resuelto sin que el cliente pueda verlo ni alterarlo.
+
+Ejemplo de uso:
+--------------
+>>> app.session_interface = InterfazSesionesServidor(AlmacenSesionesMemoria())
+"""
+import secrets
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+
+class SesionServidor(CallbackDict, SessionMixin):
+    def __init__(self, datos=None, sid=None, nueva=False):
+        def al_modificar(sesion):
+            sesion.modified = True
+        super().__init__(datos, al_modificar)
+        self.sid = sid or secrets.token_urlsafe(32)
+        self.new = nueva
+        self.modified = False
+        self.sid_anterior = None
+
+    def regenerar(self):
+        """Cambia el identificador (al iniciar sesión, contra la fijación de sesión)."""
+        if not self.new and self.sid_anterior is None:
+            self.sid_anterior = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.modified = True
+
+
+class InterfazSesionesServidor(SessionInterface):
+    serializador = TaggedJSONSerializer()
+
+    def __init__(self, almacen):
+        self.almacen = almacen
+
+    def open_session(self, app, request) -> SesionServidor:
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            datos = self.almacen.obtener(sid)
+            if datos is not None:
+                return SesionServidor(self.serializador.loads(datos), sid)
+        return SesionServidor(nueva=True)
+
+    def save_session(self, app, session: SesionServidor, response):
+        nombre = self.get_cookie_name(app)
+        dominio = self.get_cookie_domain(app)
+        ruta = self.get_cookie_path(app)
+        if session.sid_anterior is not None:
+            self.almacen.eliminar(session.sid_anterior)
+        if not session:
+            if session.modified and not session.new:
+                self.almacen.eliminar(session.sid)
+                response.delete_cookie(nombre, domain=dominio, path=ruta)
+            return
+        if not self.should_set_cookie(app, session):
+            return
+        self.almacen.guardar(session.sid, self.serializador.dumps(dict(session)))
+        response.set_cookie(
+            nombre, session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+            domain=dominio,
+            path=ruta
+        )
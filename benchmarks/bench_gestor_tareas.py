@@ -0,0 +1,188 @@
+"""
+Benchmark de rendimiento de las operaciones de GestorTareas.
+
+Mide latencia (p50/p99/media) y rendimiento (operaciones por segundo) de:
+agregar_tarea, obtener_tarea, obtener_tareas_usuario, cambiar_estado_tarea,
+editar_tarea y eliminar_tarea, con el almacén precargado a distintos tamaños
+y contra el backend en memoria y/o PostgreSQL.
+
+En PostgreSQL las tareas se crean bajo usuarios con prefijo ``bench_`` que se
+eliminan al terminar cada tamaño, así que puede apuntarse a una base local de
+desarrollo sin tocar los datos existentes.
+
+Los resultados se guardan en JSON; con --comparar se contrastan contra una
+ejecución anterior y el proceso termina con código 1 si alguna operación
+empeora su p50 más allá de la tolerancia.
+
+Uso:
+----
+python -m benchmarks.bench_gestor_tareas --backend memoria --tamanos 1000,100000,1000000
+python -m benchmarks.bench_gestor_tareas --backend postgresql --host localhost --port 5433 \\
+    --salida resultados.json --comparar base.json
+"""
+import argparse
+import json
+import logging
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from database.database_config import DB_CONFIG, POOL_CONFIG
+from models.tarea import RegistroTarea
+from services.gestor_tareas import GestorTareas
+
+CATEGORIAS = RegistroTarea.CATEGORIAS
+ESTADOS = RegistroTarea.ESTADOS
+PREFIJO_USUARIO = "bench_"
+
+
+def _percentil(ordenados: List[int], p: float) -> float:
+    indice = min(int(round(p * (len(ordenados) - 1))), len(ordenados) - 1)
+    return ordenados[indice]
+
+
+def _medir(nombre: str, argumentos: List[tuple], funcion: Callable) -> Dict[str, Any]:
+    latencias = []
+    inicio_total = time.perf_counter()
+    for args in argumentos:
+        inicio = time.perf_counter_ns()
+        funcion(*args)
+        latencias.append(time.perf_counter_ns() - inicio)
+    total = time.perf_counter() - inicio_total
+    latencias.sort()
+    return {
+        'operacion': nombre,
+        'n': len(latencias),
+        'p50_ms': _percentil(latencias, 0.50) / 1e6,
+        'p99_ms': _percentil(latencias, 0.99) / 1e6,
+        'media_ms': sum(latencias) / len(latencias) / 1e6,
+        'ops_por_segundo': len(latencias) / total if total else 0.0
+    }
+
+
+def _precargar(gestor: GestorTareas, tamano: int, usuarios: List[str]) -> List[int]:
+    ids = []
+    por_usuario, resto = divmod(tamano, len(usuarios))
+    for i, usuario in enumerate(usuarios):
+        cantidad = por_usuario + (1 if i < resto else 0)
+        resultado = gestor.agregar_tareas_lote(
+            usuario, [(f"Tarea de prueba {j}", CATEGORIAS[j % 3]) for j in range(cantidad)]
+        )
+        ids.extend(resultado['ids'])
+    return ids
+
+
+def ejecutar(gestor: GestorTareas, tamano: int, operaciones: int, n_usuarios: int,
+             semilla: int) -> List[Dict[str, Any]]:
+    azar = random.Random(semilla)
+    usuarios = [f"{PREFIJO_USUARIO}{i}" for i in range(min(n_usuarios, tamano))]
+    ids = _precargar(gestor, tamano, usuarios)
+    muestra = [azar.choice(ids) for _ in range(operaciones)]
+    resultados = []
+    nuevos: List[int] = []
+
+    def agregar(usuario, descripcion, categoria):
+        nuevos.append(gestor.agregar_tarea(usuario, descripcion, categoria))
+
+    resultados.append(_medir('agregar_tarea', [
+        (azar.choice(usuarios), f"Tarea nueva {i}", CATEGORIAS[i % 3]) for i in range(operaciones)
+    ], agregar))
+    resultados.append(_medir('obtener_tarea', [(i,) for i in muestra], gestor.obtener_tarea))
+    resultados.append(_medir('obtener_tareas_usuario', [
+        (azar.choice(usuarios),) for _ in range(operaciones)
+    ], gestor.obtener_tareas_usuario))
+    resultados.append(_medir('cambiar_estado_tarea', [
+        (i, ESTADOS[k % 3]) for k, i in enumerate(muestra)
+    ], gestor.cambiar_estado_tarea))
+    resultados.append(_medir('editar_tarea', [
+        (i, f"Tarea editada {k}", CATEGORIAS[k % 3]) for k, i in enumerate(muestra)
+    ], gestor.editar_tarea))
+    resultados.append(_medir('eliminar_tarea', [(i,) for i in nuevos], gestor.eliminar_tarea))
+
+    for usuario in usuarios:
+        gestor.eliminar_usuario(usuario)
+    return resultados
+
+
+def comparar(resultados: List[Dict[str, Any]], base: List[Dict[str, Any]], tolerancia: float) -> bool:
+    """Imprime la comparación con ``base``; devuelve False si hay regresiones."""
+    clave = lambda r: (r['backend'], r['tamano'], r['operacion'])
+    anteriores = {clave(r): r for r in base}
+    sin_regresiones = True
+    print(f"\n{'backend':<11}{'tamaño':>9}  {'operación':<24}{'p50 base':>10}{'p50 ahora':>11}{'cambio':>9}")
+    for r in resultados:
+        anterior = anteriores.get(clave(r))
+        if anterior is None or not anterior['p50_ms']:
+            continue
+        cambio = r['p50_ms'] / anterior['p50_ms'] - 1
+        marca = ''
+        if cambio > tolerancia:
+            marca = '  REGRESIÓN'
+            sin_regresiones = False
+        print(f"{r['backend']:<11}{r['tamano']:>9}  {r['operacion']:<24}"
+              f"{anterior['p50_ms']:>10.4f}{r['p50_ms']:>11.4f}{cambio:>+9.1%}{marca}")
+    return sin_regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=['memoria', 'postgresql', 'ambos'], default='memoria')
+    parser.add_argument('--tamanos', default='1000,100000,1000000',
+                        help="Tamaños de precarga separados por comas")
+    parser.add_argument('--operaciones', type=int, default=1000, help="Operaciones medidas por método")
+    parser.add_argument('--usuarios', type=int, default=1000)
+    parser.add_argument('--semilla', type=int, default=2025)
+    parser.add_argument('--salida', help="Archivo JSON donde guardar los resultados")
+    parser.add_argument('--comparar', help="JSON de una ejecución anterior para detectar regresiones")
+    parser.add_argument('--tolerancia', type=float, default=0.20,
+                        help="Aumento relativo de p50 tolerado antes de marcar regresión")
+    for campo in ('dbname', 'user', 'password', 'host', 'port'):
+        parser.add_argument(f'--{campo}', default=DB_CONFIG.get(campo))
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    tamanos = [int(t) for t in args.tamanos.split(',')]
+    backends = ['memoria', 'postgresql'] if args.backend == 'ambos' else [args.backend]
+    db_config = {campo: getattr(args, campo) for campo in ('dbname', 'user', 'password', 'host', 'port')}
+
+    resultados = []
+    for backend in backends:
+        for tamano in tamanos:
+            if backend == 'memoria':
+                gestor = GestorTareas()
+            else:
+                gestor = GestorTareas(db_config=db_config, pool_config=POOL_CONFIG)
+                if not gestor.usa_postgresql:
+                    sys.exit("No se pudo conectar a PostgreSQL con la configuración indicada")
+            try:
+                for r in ejecutar(gestor, tamano, args.operaciones, args.usuarios, args.semilla):
+                    r.update(backend=backend, tamano=tamano)
+                    resultados.append(r)
+                    print(f"{backend:<11}{tamano:>9}  {r['operacion']:<24}"
+                          f"p50 {r['p50_ms']:>9.4f} ms  p99 {r['p99_ms']:>9.4f} ms  "
+                          f"{r['ops_por_segundo']:>11.0f} ops/s")
+            finally:
+                gestor.cerrar()
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump({
+                'fecha': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'operaciones': args.operaciones,
+                'usuarios': args.usuarios,
+                'resultados': resultados
+            }, f, indent=2, ensure_ascii=False)
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            base = json.load(f)['resultados']
+        if not comparar(resultados, base, args.tolerancia):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark de memoria por tarea del almacenamiento en memoria.
+
+Compara los bytes por tarea de:
+- dict: la representación anterior (un dict con claves de texto y datetime)
+- RegistroTarea: el registro compacto con __slots__ y códigos enteros
+- GestorTareas: el almacén completo en modo memoria (registros + índices)
+
+Uso:
+----
+python -m benchmarks.bench_memoria_tareas --tareas 200000 --usuarios 1000
+"""
+import argparse
+import gc
+import logging
+import tracemalloc
+from datetime import datetime
+
+from models.tarea import RegistroTarea
+from services.gestor_tareas import GestorTareas
+
+CATEGORIAS = RegistroTarea.CATEGORIAS
+
+
+def _medir(construir, n):
+    gc.collect()
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    datos = construir(n)
+    usado = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    del datos
+    return usado / n
+
+
+def _dicts(n, usuarios):
+    ahora = datetime.now()
+    return {
+        i: {
+            'id': i,
+            'usuario': f"usuario{i % usuarios}",
+            'descripcion': "Tarea de prueba",
+            'categoria': CATEGORIAS[i % 3],
+            'fecha_creacion': ahora.replace(microsecond=i % 1000000),
+            'estado': 'Pendiente'
+        } for i in range(n)
+    }
+
+
+def _registros(n, usuarios):
+    ahora = datetime.now()
+    return {
+        i: RegistroTarea(i, f"usuario{i % usuarios}", "Tarea de prueba", CATEGORIAS[i % 3],
+                         ahora.replace(microsecond=i % 1000000))
+        for i in range(n)
+    }
+
+
+def _gestor(n, usuarios):
+    gestor = GestorTareas()
+    por_usuario = max(n // usuarios, 1)
+    for u in range(usuarios):
+        gestor.agregar_tareas_lote(
+            f"usuario{u}", [("Tarea de prueba", CATEGORIAS[i % 3]) for i in range(por_usuario)]
+        )
+    return gestor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tareas', type=int, default=100000)
+    parser.add_argument('--usuarios', type=int, default=100)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    n, usuarios = args.tareas, args.usuarios
+    antes = _medir(lambda k: _dicts(k, usuarios), n)
+    despues = _medir(lambda k: _registros(k, usuarios), n)
+    almacen = _medir(lambda k: _gestor(k, usuarios), n)
+
+    print(f"Tareas: {n}  Usuarios: {usuarios}")
+    print(f"{'dict (antes)':<28}{antes:>10.1f} bytes/tarea")
+    print(f"{'RegistroTarea (después)':<28}{despues:>10.1f} bytes/tarea")
+    print(f"{'GestorTareas + índices':<28}{almacen:>10.1f} bytes/tarea")
+    print(f"Reducción del registro: {100 * (1 - despues / antes):.1f}%")
+
+
+if __name__ == '__main__':
+    main()
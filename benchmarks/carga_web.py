@@ -0,0 +1,253 @@
+"""
+Generador de carga para la aplicación web Flask.
+
+Simula N usuarios virtuales concurrentes (un hilo cada uno) que repiten el
+flujo completo de la interfaz web:
+
+    login -> listar -> agregar -> listar -> cambiar estado -> editar -> eliminar
+
+y al final informa peticiones por segundo, tasa de errores e histograma de
+latencias por ruta. Sirve para dimensionar procesos e hilos antes de
+desplegar.
+
+Dos modos de cliente:
+- Sin --url: usa el test client de Flask en el mismo proceso (mide la
+  aplicación y el gestor sin red ni servidor WSGI).
+- Con --url: peticiones HTTP reales contra un servidor ya levantado
+  (p. ej. ``python -m Vista.web.servidor``), con cookies por usuario.
+
+Los usuarios virtuales se registran e inician sesión por la propia web. Si
+el gestor de la aplicación está en modo memoria (sin PostgreSQL no hay
+login), el test client inyecta la sesión directamente.
+
+Uso:
+----
+python -m benchmarks.carga_web --usuarios 20 --iteraciones 50
+python -m benchmarks.carga_web --url http://127.0.0.1:5000 --usuarios 50 --duracion 60 --salida carga.json
+"""
+import argparse
+import json
+import logging
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.cookiejar import CookieJar
+from typing import Any, Dict, List, Optional, Tuple
+
+# Límites superiores (ms) de las cubetas del histograma; la última es "+inf"
+CUBETAS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+_ENLACE_EDITAR = re.compile(r'/editar/(\d+)')
+
+
+class _SinRedirecciones(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class ClienteFlask:
+    """Cliente en proceso sobre ``app.test_client()``."""
+
+    def __init__(self, app):
+        self._cliente = app.test_client()
+
+    def peticion(self, metodo: str, ruta: str, datos: Optional[Dict[str, str]] = None) -> Tuple[int, str]:
+        respuesta = self._cliente.open(ruta, method=metodo, data=datos)
+        return respuesta.status_code, respuesta.get_data(as_text=True)
+
+    def fijar_sesion(self, usuario: str):
+        with self._cliente.session_transaction() as sesion:
+            sesion['usuario'] = usuario
+
+
+class ClienteHttp:
+    """Cliente HTTP real con su propio almacén de cookies."""
+
+    def __init__(self, url_base: str, timeout: float = 30.0):
+        self._url_base = url_base.rstrip('/')
+        self._timeout = timeout
+        self._abridor = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(CookieJar()), _SinRedirecciones
+        )
+
+    def peticion(self, metodo: str, ruta: str, datos: Optional[Dict[str, str]] = None) -> Tuple[int, str]:
+        cuerpo = urllib.parse.urlencode(datos).encode() if datos is not None else None
+        req = urllib.request.Request(self._url_base + ruta, data=cuerpo, method=metodo)
+        try:
+            with self._abridor.open(req, timeout=self._timeout) as respuesta:
+                return respuesta.status, respuesta.read().decode('utf-8', 'replace')
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode('utf-8', 'replace')
+
+
+class Estadisticas:
+    """Latencias y errores por ruta, compartidas entre hilos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencias: Dict[str, List[float]] = {}
+        self._errores: Dict[str, int] = {}
+
+    def registrar(self, ruta: str, segundos: float, error: bool):
+        with self._lock:
+            self._latencias.setdefault(ruta, []).append(segundos * 1000)
+            if error:
+                self._errores[ruta] = self._errores.get(ruta, 0) + 1
+
+    def resumen(self, duracion: float) -> Dict[str, Any]:
+        rutas = {}
+        total = errores = 0
+        with self._lock:
+            for ruta, latencias in self._latencias.items():
+                ordenadas = sorted(latencias)
+                n = len(ordenadas)
+                fallidas = self._errores.get(ruta, 0)
+                histograma = [0] * (len(CUBETAS_MS) + 1)
+                for ms in ordenadas:
+                    histograma[next((i for i, tope in enumerate(CUBETAS_MS) if ms <= tope), len(CUBETAS_MS))] += 1
+                rutas[ruta] = {
+                    'peticiones': n,
+                    'errores': fallidas,
+                    'tasa_errores': fallidas / n,
+                    'p50_ms': ordenadas[int(0.50 * (n - 1))],
+                    'p90_ms': ordenadas[int(0.90 * (n - 1))],
+                    'p99_ms': ordenadas[int(0.99 * (n - 1))],
+                    'max_ms': ordenadas[-1],
+                    'histograma': dict(zip([f"<={c}ms" for c in CUBETAS_MS] + ['>2000ms'], histograma))
+                }
+                total += n
+                errores += fallidas
+        return {
+            'duracion_s': duracion,
+            'peticiones': total,
+            'errores': errores,
+            'tasa_errores': errores / total if total else 0.0,
+            'peticiones_por_segundo': total / duracion if duracion else 0.0,
+            'rutas': rutas
+        }
+
+
+class UsuarioVirtual(threading.Thread):
+    def __init__(self, numero: int, cliente, estadisticas: Estadisticas, iteraciones: Optional[int],
+                 fin: Optional[float], pausa: float, sesion_directa: bool, prefijo: str):
+        super().__init__(daemon=True)
+        self.usuario = f"{prefijo}{numero}"
+        self.cliente = cliente
+        self.estadisticas = estadisticas
+        self.iteraciones = iteraciones
+        self.fin = fin
+        self.pausa = pausa
+        self.sesion_directa = sesion_directa
+
+    def _pedir(self, nombre: str, metodo: str, ruta: str, datos=None, esperado=(200, 302)) -> Tuple[int, str]:
+        inicio = time.perf_counter()
+        try:
+            estado, cuerpo = self.cliente.peticion(metodo, ruta, datos)
+        except Exception:
+            self.estadisticas.registrar(nombre, time.perf_counter() - inicio, True)
+            return 0, ''
+        self.estadisticas.registrar(nombre, time.perf_counter() - inicio, estado not in esperado)
+        if self.pausa:
+            time.sleep(self.pausa)
+        return estado, cuerpo
+
+    def _iniciar_sesion(self):
+        if self.sesion_directa:
+            self.cliente.fijar_sesion(self.usuario)
+            return
+        credenciales = {'usuario': self.usuario, 'password': 'carga'}
+        self._pedir('POST /login', 'POST', '/login', credenciales, esperado=(302,))
+
+    def _flujo(self, i: int):
+        self._iniciar_sesion()
+        self._pedir('GET /', 'GET', '/')
+        self._pedir('POST /agregar', 'POST', '/agregar',
+                    {'descripcion': f"Tarea de carga {i}", 'categoria': 'trabajo'}, esperado=(302,))
+        _, cuerpo = self._pedir('GET /', 'GET', '/')
+        encontrado = _ENLACE_EDITAR.search(cuerpo)
+        if encontrado is None:
+            self.estadisticas.registrar('flujo sin tarea nueva', 0.0, True)
+            return
+        tarea_id = encontrado.group(1)
+        self._pedir('POST /cambiar_estado/<id>', 'POST', f'/cambiar_estado/{tarea_id}',
+                    {'estado': 'Completada'}, esperado=(302,))
+        self._pedir('POST /editar/<id>', 'POST', f'/editar/{tarea_id}',
+                    {'descripcion': f"Tarea de carga {i} editada", 'categoria': 'personal'}, esperado=(302,))
+        self._pedir('GET /eliminar/<id>', 'GET', f'/eliminar/{tarea_id}', esperado=(302,))
+
+    def run(self):
+        if not self.sesion_directa:
+            # Si el usuario ya existía, /register responde 200 con un aviso
+            self._pedir('POST /register', 'POST', '/register', {'usuario': self.usuario, 'password': 'carga'})
+        i = 0
+        while (self.iteraciones is None or i < self.iteraciones) and (self.fin is None or time.time() < self.fin):
+            self._flujo(i)
+            i += 1
+
+
+def ejecutar(crear_cliente, usuarios: int, iteraciones: Optional[int], duracion: Optional[float],
+             pausa: float = 0.0, sesion_directa: bool = False, prefijo: str = 'carga_') -> Dict[str, Any]:
+    """Lanza los usuarios virtuales, espera a que terminen y devuelve el resumen."""
+    estadisticas = Estadisticas()
+    fin = time.time() + duracion if duracion else None
+    hilos = [
+        UsuarioVirtual(n, crear_cliente(), estadisticas, iteraciones, fin, pausa, sesion_directa, prefijo)
+        for n in range(usuarios)
+    ]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return estadisticas.resumen(time.perf_counter() - inicio)
+
+
+def imprimir(resumen: Dict[str, Any]):
+    print(f"Duración: {resumen['duracion_s']:.2f} s  Peticiones: {resumen['peticiones']}  "
+          f"Peticiones/s: {resumen['peticiones_por_segundo']:.1f}  Errores: {resumen['tasa_errores']:.2%}")
+    print(f"\n{'ruta':<28}{'n':>8}{'errores':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for ruta, r in sorted(resumen['rutas'].items()):
+        print(f"{ruta:<28}{r['peticiones']:>8}{r['tasa_errores']:>9.1%}"
+              f"{r['p50_ms']:>9.2f}{r['p90_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['max_ms']:>9.2f}")
+    print("\nHistograma de latencias por ruta:")
+    for ruta, r in sorted(resumen['rutas'].items()):
+        celdas = '  '.join(f"{cubeta}:{n}" for cubeta, n in r['histograma'].items() if n)
+        print(f"  {ruta:<26}{celdas}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help="URL de un servidor en marcha; sin ella se usa el test client de Flask")
+    parser.add_argument('--usuarios', type=int, default=10, help="Usuarios virtuales concurrentes")
+    parser.add_argument('--iteraciones', type=int, default=20, help="Flujos completos por usuario")
+    parser.add_argument('--duracion', type=float, help="Segundos de prueba (ignora --iteraciones)")
+    parser.add_argument('--pausa', type=float, default=0.0, help="Segundos de espera entre peticiones")
+    parser.add_argument('--prefijo', default='carga_', help="Prefijo de los nombres de usuario virtuales")
+    parser.add_argument('--salida', help="Archivo JSON donde guardar el resumen")
+    args = parser.parse_args()
+    iteraciones = None if args.duracion else args.iteraciones
+
+    if args.url:
+        resumen = ejecutar(lambda: ClienteHttp(args.url), args.usuarios, iteraciones, args.duracion,
+                           args.pausa, prefijo=args.prefijo)
+    else:
+        from Vista.web import gestor_tareas_web as web
+        app = web.crear_app()
+        logging.disable(logging.INFO)
+        resumen = ejecutar(lambda: ClienteFlask(app), args.usuarios, iteraciones, args.duracion,
+                           args.pausa, sesion_directa=not web.gestor.usa_postgresql, prefijo=args.prefijo)
+        web.detener_recursos()
+
+    imprimir(resumen)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resumen, f, indent=2, ensure_ascii=False)
+    if resumen['peticiones'] == 0:
+        sys.exit("No se realizó ninguna petición")
+
+
+if __name__ == '__main__':
+    main()
@@ -24,33 +24,83 @@ CREATE TABLE IF NOT EXISTS tareas (
     CONSTRAINT chk_categoria_valida CHECK (categoria IN ('trabajo', 'personal', 'estudio'))
 );
 
--- Tabla de logs de actividad 
-CREATE TABLE IF NOT EXISTS logs_actividad (
-    id SERIAL PRIMARY KEY,
-    usuario_id INTEGER,
-    accion VARCHAR(50) NOT NULL,
-    descripcion TEXT,
-    fecha_log TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE SET NULL
+-- Búsqueda de texto completo sobre la descripción
+ALTER TABLE tareas ADD COLUMN IF NOT EXISTS descripcion_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('spanish', descripcion)) STORED;
+
+-- Sincronización incremental: fecha y versión del último cambio de cada tarea.
+-- version es el ID (64 bits) de la última transacción que escribió la fila;
+-- con el xmin del snapshot se sabe hasta qué versión está todo confirmado.
+ALTER TABLE tareas
+    ADD COLUMN IF NOT EXISTS actualizado_en TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT pg_current_xact_id()::text::bigint;
+-- Bases anteriores la crearon sin zona horaria (si ya es TIMESTAMPTZ no hace nada)
+ALTER TABLE tareas ALTER COLUMN actualizado_en TYPE TIMESTAMPTZ;
+
+-- Tareas eliminadas (para que los clientes sincronizados borren su copia)
+CREATE TABLE IF NOT EXISTS tareas_eliminadas (
+    tarea_id INTEGER PRIMARY KEY,
+    usuario_id INTEGER NOT NULL,
+    version BIGINT NOT NULL DEFAULT pg_current_xact_id()::text::bigint,
+    eliminada_en TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Versión más alta de las eliminadas ya purgadas (una sola fila)
+CREATE TABLE IF NOT EXISTS tareas_eliminadas_purga (
+    id BOOLEAN PRIMARY KEY DEFAULT true CHECK (id),
+    version BIGINT NOT NULL
+);
+
+-- Transacción que creó cada usuario: una marca anterior es de otro usuario
+-- con el mismo nombre (borrado y vuelto a crear)
+ALTER TABLE usuarios ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT pg_current_xact_id()::text::bigint;
+
+-- Contadores de tareas por usuario y estado (mantenidos por triggers)
+CREATE TABLE IF NOT EXISTS estadisticas_usuario (
+    usuario_id INTEGER PRIMARY KEY REFERENCES usuarios(id) ON DELETE CASCADE,
+    total INTEGER NOT NULL DEFAULT 0,
+    completadas INTEGER NOT NULL DEFAULT 0,
+    pendientes INTEGER NOT NULL DEFAULT 0,
+    sin_realizar INTEGER NOT NULL DEFAULT 0
 );
 
+-- Tabla de logs de actividad, particionada por mes de fecha_log
+-- (logs_actividad_AAAAMM más una partición por defecto)
+DO $$
+BEGIN
+    CREATE SEQUENCE IF NOT EXISTS logs_actividad_id_seq;
+    -- Versiones anteriores: tabla sin particionar; se aparta y sus filas se
+    -- copian más abajo, una vez creadas las particiones de sus meses
+    IF EXISTS (SELECT 1 FROM pg_class WHERE oid = to_regclass('logs_actividad') AND relkind = 'r') THEN
+        ALTER SEQUENCE logs_actividad_id_seq OWNED BY NONE;
+        ALTER TABLE logs_actividad RENAME TO logs_actividad_sin_particionar;
+        ALTER TABLE logs_actividad_sin_particionar RENAME CONSTRAINT logs_actividad_pkey TO logs_actividad_sin_particionar_pkey;
+        ALTER INDEX IF EXISTS idx_logs_usuario_fecha RENAME TO idx_logs_usuario_fecha_sin_particionar;
+    END IF;
+    CREATE TABLE IF NOT EXISTS logs_actividad (
+        id INTEGER NOT NULL DEFAULT nextval('logs_actividad_id_seq'),
+        usuario_id INTEGER REFERENCES usuarios(id) ON DELETE SET NULL,
+        accion VARCHAR(50) NOT NULL,
+        descripcion TEXT,
+        fecha_log TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, fecha_log)
+    ) PARTITION BY RANGE (fecha_log);
+    -- Recoge lo que no tenga partición mensual; crear_particion_logs lo reubica
+    CREATE TABLE IF NOT EXISTS logs_actividad_default PARTITION OF logs_actividad DEFAULT;
+    ALTER SEQUENCE logs_actividad_id_seq OWNED BY logs_actividad.id;
+END
+$$;
+
 -- =============================================
 -- FUNCIONES 
 -- =============================================
 
--- Función para registrar cambios de estado
-CREATE OR REPLACE FUNCTION registrar_cambio_estado()
-RETURNS TRIGGER AS $$
-BEGIN
-    IF OLD.estado IS DISTINCT FROM NEW.estado THEN
-        INSERT INTO logs_actividad (usuario_id, accion, descripcion)
-        VALUES (NEW.usuario_id, 'CAMBIAR_ESTADO', 
-                'Tarea ID: ' || NEW.id || 
-                ' - Estado cambiado de ' || OLD.estado || ' a ' || NEW.estado);
-    END IF;
-    RETURN NEW;
-END;
-$$ LANGUAGE plpgsql;
+-- Los eventos de logs_actividad (AGREGAR_TAREA, CAMBIAR_ESTADO) de la
+-- aplicación los escribe por lotes services/registro_actividad.py, fuera de la
+-- transacción de cada cambio. Se retiran el trigger por fila y su función;
+-- quien llama directamente a la función agregar_tarea() sigue dejando su log.
+DROP TRIGGER IF EXISTS after_update_tarea ON tareas;
+DROP FUNCTION IF EXISTS registrar_cambio_estado();
 
 -- Función para agregar tarea 
 CREATE OR REPLACE FUNCTION agregar_tarea(
@@ -83,7 +133,7 @@ BEGIN
     VALUES (v_usuario_id, p_descripcion, p_categoria)
     RETURNING id INTO v_tarea_id;
     
-    -- Registrar datos en logs
+    -- Registrar datos en logs (GestorTareas no usa esta función)
     INSERT INTO logs_actividad (usuario_id, accion, descripcion)
     VALUES (v_usuario_id, 'AGREGAR_TAREA', 'Nueva tarea: ' || LEFT(p_descripcion, 50));
     
@@ -91,14 +141,198 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Suma a estadisticas_usuario las diferencias (usuario, estado, +1/-1) de una sentencia
+CREATE OR REPLACE FUNCTION aplicar_delta_estadisticas(p_usuarios INTEGER[], p_estados TEXT[], p_signos INTEGER[])
+RETURNS VOID AS $$
+    INSERT INTO estadisticas_usuario AS e (usuario_id, total, completadas, pendientes, sin_realizar)
+    SELECT usuario_id,
+           SUM(signo),
+           COALESCE(SUM(signo) FILTER (WHERE estado = 'Completada'), 0),
+           COALESCE(SUM(signo) FILTER (WHERE estado = 'Pendiente'), 0),
+           COALESCE(SUM(signo) FILTER (WHERE estado = 'Sin realizar'), 0)
+    FROM unnest(p_usuarios, p_estados, p_signos) AS d(usuario_id, estado, signo)
+    GROUP BY usuario_id
+    ON CONFLICT (usuario_id) DO UPDATE SET
+        total = e.total + EXCLUDED.total,
+        completadas = e.completadas + EXCLUDED.completadas,
+        pendientes = e.pendientes + EXCLUDED.pendientes,
+        sin_realizar = e.sin_realizar + EXCLUDED.sin_realizar
+$$ LANGUAGE sql;
+
+-- Mantiene estadisticas_usuario con una sola actualización por usuario y sentencia
+CREATE OR REPLACE FUNCTION acumular_estadisticas_usuario()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM aplicar_delta_estadisticas(array_agg(usuario_id), array_agg(estado::text),
+                                           array_agg(1)) FROM nuevas;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM aplicar_delta_estadisticas(array_agg(usuario_id), array_agg(estado::text),
+                                           array_agg(-1)) FROM viejas;
+    ELSE
+        PERFORM aplicar_delta_estadisticas(array_agg(x.usuario_id), array_agg(x.estado),
+                                           array_agg(x.signo))
+        FROM nuevas n
+        JOIN viejas v ON v.id = n.id
+        CROSS JOIN LATERAL (VALUES (n.usuario_id, n.estado::text, 1), (v.usuario_id, v.estado::text, -1))
+            AS x(usuario_id, estado, signo)
+        WHERE (n.usuario_id, n.estado) IS DISTINCT FROM (v.usuario_id, v.estado);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Marca la fecha y la versión de las tareas modificadas
+CREATE OR REPLACE FUNCTION marcar_cambio_tarea()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.actualizado_en := CURRENT_TIMESTAMP;
+    NEW.version := pg_current_xact_id()::text::bigint;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Guarda en tareas_eliminadas las tareas borradas por una sentencia
+CREATE OR REPLACE FUNCTION registrar_tareas_eliminadas()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO tareas_eliminadas (tarea_id, usuario_id)
+    SELECT id, usuario_id FROM viejas
+    ON CONFLICT (tarea_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =============================================
+-- PARTICIONES DE logs_actividad
+-- =============================================
+
+-- Crea la partición del mes de p_mes (si no existe). Devuelve si la creó.
+CREATE OR REPLACE FUNCTION crear_particion_logs(p_mes DATE)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_desde DATE := date_trunc('month', p_mes)::date;
+    v_hasta DATE := (date_trunc('month', p_mes) + INTERVAL '1 month')::date;
+    v_nombre TEXT := 'logs_actividad_' || to_char(p_mes, 'YYYYMM');
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('logs_actividad_particiones'));
+    IF to_regclass(v_nombre) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+    IF EXISTS (SELECT 1 FROM logs_actividad_default WHERE fecha_log >= v_desde AND fecha_log < v_hasta) THEN
+        -- Hay filas del mes en la partición por defecto: se mueven a la nueva
+        ALTER TABLE logs_actividad DETACH PARTITION logs_actividad_default;
+        EXECUTE format('CREATE TABLE %I PARTITION OF logs_actividad FOR VALUES FROM (%L) TO (%L)',
+                       v_nombre, v_desde, v_hasta);
+        EXECUTE format('INSERT INTO %I SELECT * FROM logs_actividad_default WHERE fecha_log >= %L AND fecha_log < %L',
+                       v_nombre, v_desde, v_hasta);
+        DELETE FROM logs_actividad_default WHERE fecha_log >= v_desde AND fecha_log < v_hasta;
+        ALTER TABLE logs_actividad ATTACH PARTITION logs_actividad_default DEFAULT;
+    ELSE
+        EXECUTE format('CREATE TABLE %I PARTITION OF logs_actividad FOR VALUES FROM (%L) TO (%L)',
+                       v_nombre, v_desde, v_hasta);
+    END IF;
+    RETURN true;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Asegura las particiones del mes actual y de los p_meses_futuros siguientes
+CREATE OR REPLACE FUNCTION asegurar_particiones_logs(p_meses_futuros INTEGER DEFAULT 3)
+RETURNS INTEGER AS $$
+DECLARE
+    v_creadas INTEGER := 0;
+BEGIN
+    FOR i IN 0..p_meses_futuros LOOP
+        IF crear_particion_logs((date_trunc('month', CURRENT_DATE) + make_interval(months => i))::date) THEN
+            v_creadas := v_creadas + 1;
+        END IF;
+    END LOOP;
+    RETURN v_creadas;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Retención: separa (y, salvo p_solo_separar, borra) las particiones de meses
+-- anteriores a los últimos p_meses_retencion. Devuelve sus nombres.
+CREATE OR REPLACE FUNCTION purgar_particiones_logs(p_meses_retencion INTEGER, p_solo_separar BOOLEAN DEFAULT false)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    v_limite DATE := (date_trunc('month', CURRENT_DATE) - make_interval(months => p_meses_retencion))::date;
+    v_particion TEXT;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('logs_actividad_particiones'));
+    FOR v_particion IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'logs_actividad'::regclass
+          AND c.relname ~ '^logs_actividad_[0-9]{6}$'
+          AND to_date(right(c.relname, 6), 'YYYYMM') < v_limite
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('ALTER TABLE logs_actividad DETACH PARTITION %I', v_particion);
+        IF NOT p_solo_separar THEN
+            EXECUTE format('DROP TABLE %I', v_particion);
+        END IF;
+        RETURN NEXT v_particion;
+    END LOOP;
+    DELETE FROM logs_actividad_default WHERE fecha_log < v_limite;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Migración desde logs_actividad sin particionar (no hace nada si no la hay)
+DO $$
+DECLARE
+    v_mes DATE;
+BEGIN
+    IF to_regclass('logs_actividad_sin_particionar') IS NOT NULL THEN
+        FOR v_mes IN SELECT DISTINCT date_trunc('month', fecha_log)::date
+                     FROM logs_actividad_sin_particionar WHERE fecha_log IS NOT NULL LOOP
+            PERFORM crear_particion_logs(v_mes);
+        END LOOP;
+        INSERT INTO logs_actividad (id, usuario_id, accion, descripcion, fecha_log)
+        SELECT id, usuario_id, accion, descripcion, COALESCE(fecha_log, CURRENT_TIMESTAMP)
+        FROM logs_actividad_sin_particionar;
+        DROP TABLE logs_actividad_sin_particionar;
+    END IF;
+END
+$$;
+
+SELECT asegurar_particiones_logs(3);
+
 -- =============================================
 -- TRIGGERS 
 -- =============================================
-CREATE OR REPLACE TRIGGER after_update_tarea
-AFTER UPDATE ON tareas
-FOR EACH ROW
-WHEN (OLD.estado IS DISTINCT FROM NEW.estado)
-EXECUTE FUNCTION registrar_cambio_estado();
+CREATE OR REPLACE TRIGGER estadisticas_tareas_insert
+AFTER INSERT ON tareas REFERENCING NEW TABLE AS nuevas
+FOR EACH STATEMENT EXECUTE FUNCTION acumular_estadisticas_usuario();
+
+CREATE OR REPLACE TRIGGER estadisticas_tareas_update
+AFTER UPDATE ON tareas REFERENCING OLD TABLE AS viejas NEW TABLE AS nuevas
+FOR EACH STATEMENT EXECUTE FUNCTION acumular_estadisticas_usuario();
+
+CREATE OR REPLACE TRIGGER estadisticas_tareas_delete
+AFTER DELETE ON tareas REFERENCING OLD TABLE AS viejas
+FOR EACH STATEMENT EXECUTE FUNCTION acumular_estadisticas_usuario();
+
+CREATE OR REPLACE TRIGGER marcar_cambio_tarea
+BEFORE UPDATE ON tareas FOR EACH ROW
+WHEN ((OLD.usuario_id, OLD.descripcion, OLD.categoria, OLD.estado)
+      IS DISTINCT FROM (NEW.usuario_id, NEW.descripcion, NEW.categoria, NEW.estado))
+EXECUTE FUNCTION marcar_cambio_tarea();
+
+CREATE OR REPLACE TRIGGER tareas_eliminadas_delete
+AFTER DELETE ON tareas REFERENCING OLD TABLE AS viejas
+FOR EACH STATEMENT EXECUTE FUNCTION registrar_tareas_eliminadas();
+
+-- Carga inicial de los contadores si la tabla se crea sobre datos existentes
+INSERT INTO estadisticas_usuario (usuario_id, total, completadas, pendientes, sin_realizar)
+SELECT usuario_id, COUNT(*),
+       COUNT(*) FILTER (WHERE estado = 'Completada'),
+       COUNT(*) FILTER (WHERE estado = 'Pendiente'),
+       COUNT(*) FILTER (WHERE estado = 'Sin realizar')
+FROM tareas
+WHERE NOT EXISTS (SELECT 1 FROM estadisticas_usuario)
+GROUP BY usuario_id;
 
 -- =============================================
 -- VISTAS 
@@ -114,35 +348,60 @@ FROM tareas t
 JOIN usuarios u ON t.usuario_id = u.id
 WHERE t.estado = 'Pendiente';
 
+-- Lee los contadores precalculados en lugar de agregar toda la tabla tareas
 CREATE OR REPLACE VIEW vista_estadisticas_tareas AS
 SELECT 
     u.username,
-    COUNT(t.id) AS total_tareas,
-    SUM(CASE WHEN t.estado = 'Completada' THEN 1 ELSE 0 END) AS tareas_completadas,
-    SUM(CASE WHEN t.estado = 'Pendiente' THEN 1 ELSE 0 END) AS tareas_pendientes,
-    SUM(CASE WHEN t.estado = 'Sin realizar' THEN 1 ELSE 0 END) AS tareas_sin_realizar,
-    ROUND(100.0 * SUM(CASE WHEN t.estado = 'Completada' THEN 1 ELSE 0 END) / 
-          NULLIF(COUNT(t.id), 0), 2) AS porcentaje_completado
+    COALESCE(e.total, 0)::bigint AS total_tareas,
+    COALESCE(e.completadas, 0)::bigint AS tareas_completadas,
+    COALESCE(e.pendientes, 0)::bigint AS tareas_pendientes,
+    COALESCE(e.sin_realizar, 0)::bigint AS tareas_sin_realizar,
+    ROUND(100.0 * e.completadas / NULLIF(e.total, 0), 2) AS porcentaje_completado
 FROM usuarios u
-LEFT JOIN tareas t ON u.id = t.usuario_id
-GROUP BY u.id, u.username;
+LEFT JOIN estadisticas_usuario e ON e.usuario_id = u.id;
 
-CREATE OR REPLACE VIEW reporte_productividad AS
+-- Vista materializada: los reportes no recorren la tabla tareas en cada
+-- consulta. Se recalcula con
+--   REFRESH MATERIALIZED VIEW CONCURRENTLY reporte_productividad;
+-- (services/refresco_reportes.py lo hace periódicamente), que necesita el
+-- índice único sobre username.
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_views
+               WHERE schemaname = current_schema() AND viewname = 'reporte_productividad') THEN
+        DROP VIEW reporte_productividad;
+    END IF;
+END
+$$;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS reporte_productividad AS
 SELECT 
     u.username,
     COUNT(t.id) FILTER (WHERE t.estado = 'Completada') AS tareas_completadas_mes,
     COUNT(t.id) FILTER (WHERE t.estado = 'Pendiente' AND t.fecha_creacion >= CURRENT_DATE - INTERVAL '30 days') AS tareas_pendientes,
     ROUND(COUNT(t.id) FILTER (WHERE t.estado = 'Completada') * 100.0 / 
-          NULLIF(COUNT(t.id) FILTER (WHERE t.fecha_creacion >= CURRENT_DATE - INTERVAL '30 days'), 0), 2) AS porcentaje_eficiencia
+          NULLIF(COUNT(t.id) FILTER (WHERE t.fecha_creacion >= CURRENT_DATE - INTERVAL '30 days'), 0), 2) AS porcentaje_eficiencia,
+    now() AS calculado_en
 FROM usuarios u
 LEFT JOIN tareas t ON u.id = t.usuario_id
 GROUP BY u.id, u.username;
 
+CREATE UNIQUE INDEX IF NOT EXISTS idx_reporte_productividad_username ON reporte_productividad(username);
+
 -- =============================================
 -- ÍNDICES OPTIMIZADOS
 -- =============================================
 CREATE INDEX IF NOT EXISTS idx_tareas_usuario ON tareas(usuario_id);
 CREATE INDEX IF NOT EXISTS idx_tareas_estado ON tareas(estado);
 CREATE INDEX IF NOT EXISTS idx_tareas_fecha ON tareas(fecha_creacion);
+-- Paginación por clave (fecha_creacion, id) del listado de tareas de un usuario
+CREATE INDEX IF NOT EXISTS idx_tareas_usuario_fecha_id ON tareas(usuario_id, fecha_creacion DESC, id DESC);
+-- Búsquedas filtradas por estado o categoría, ordenadas por fecha
+CREATE INDEX IF NOT EXISTS idx_tareas_usuario_estado ON tareas(usuario_id, estado, fecha_creacion DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tareas_usuario_categoria ON tareas(usuario_id, categoria, fecha_creacion DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tareas_descripcion_tsv ON tareas USING GIN (descripcion_tsv);
+-- Sincronización incremental (cambios desde una versión)
+CREATE INDEX IF NOT EXISTS idx_tareas_usuario_version ON tareas(usuario_id, version);
+CREATE INDEX IF NOT EXISTS idx_tareas_eliminadas_usuario_version ON tareas_eliminadas(usuario_id, version);
 CREATE INDEX IF NOT EXISTS idx_logs_usuario_fecha ON logs_actividad(usuario_id, fecha_log);
 
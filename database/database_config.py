@@ -6,4 +6,62 @@ DB_CONFIG = {
     'host': 'localhost',               
     'port': '5433',                    
     'client_encoding': 'utf8'          
-}
\ No newline at end of file
+}
+
+# Pool de conexiones usado por la interfaz web (un hilo por petición)
+POOL_CONFIG = {
+    'minimo': 2,
+    'maximo': 10,
+    'timeout': 30.0,
+    'verificar_tras': 30.0
+}
+
+# Caché de listados de tareas por usuario (services/cache_listados.py).
+# Con varios procesos servidor solo se usa si hay 'redis_url'
+CACHE_LISTADOS_CONFIG = {
+    'maximo': 1024,
+    'ttl': 30.0,
+    'redis_url': None
+}
+
+# Refresco de reportes materializados (services/refresco_reportes.py):
+# cada 'intervalo' segundos o tras 'cada_mutaciones' filas cambiadas
+REPORTES_CONFIG = {
+    'intervalo': 300.0,
+    'cada_mutaciones': 500
+}
+
+# Registro de actividad por lotes (services/registro_actividad.py);
+# durabilidad: 'sincrona', 'lote' o 'mejor_esfuerzo'
+ACTIVIDAD_CONFIG = {
+    'tamano_lote': 500,
+    'intervalo': 1.0,
+    'durabilidad': 'lote',
+    'espera_maxima': 5.0,
+    'reintento_maximo': 60.0
+}
+
+# Particiones mensuales de logs_actividad (services/mantenimiento_logs.py)
+LOGS_CONFIG = {
+    'meses_futuros': 3,
+    'meses_retencion': 12,
+    'intervalo': 6 * 3600.0
+}
+
+# Autenticación (services/autenticacion.py). Cambiar 'metodo_hash' es seguro:
+# cada usuario pasa al nuevo método la próxima vez que inicia sesión
+AUTENTICACION_CONFIG = {
+    'metodo_hash': 'scrypt:32768:8:1',
+    'hilos': 4,
+    'intentos_maximos': 5,
+    'ventana': 300.0
+}
+
+# Sesiones del lado del servidor (services/sesiones.py): 'memoria' para un
+# solo proceso, 'sqlite' (archivo 'ruta') para varios procesos en la máquina
+SESIONES_CONFIG = {
+    'backend': 'sqlite',
+    'ttl': 8 * 3600.0,
+    'maximo': 10000,
+    'ruta': 'sesiones.db'
+}
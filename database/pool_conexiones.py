@@ -0,0 +1,223 @@
+# pool_conexiones.py
+"""
+Pool de conexiones PostgreSQL seguro para hilos.
+
+Permite que varios hilos (por ejemplo, los workers de un servidor WSGI)
+compartan un conjunto acotado de conexiones psycopg2 en lugar de una sola
+conexión global. Cada operación toma una conexión del pool, la usa y la
+devuelve al terminar.
+
+Características:
+---------------
+- Tamaño mínimo (conexiones abiertas al iniciar) y máximo configurable
+- Espera acotada por ``timeout`` cuando todas las conexiones están en uso
+- Verificación de salud al entregar una conexión (conexión cerrada o
+  ``SELECT 1`` si estuvo inactiva más de ``verificar_tras`` segundos)
+- Métricas: hilos en espera, latencia de obtención, timeouts, descartes
+
+Ejemplo de uso:
+--------------
+>>> pool = PoolConexiones(DB_CONFIG, minimo=2, maximo=10)
+>>> with pool.conexion() as conn:
+...     with conn.cursor() as cur:
+...         cur.execute("SELECT 1")
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolAgotadoError(Exception):
+    """Se lanza cuando no se obtiene una conexión dentro del timeout."""
+    pass
+
+
+class PoolConexiones:
+    MUESTRAS_LATENCIA = 1024
+
+    def __init__(self, db_config: Dict[str, Any], minimo: int = 1, maximo: int = 10,
+                 timeout: float = 30.0, verificar_tras: float = 30.0,
+                 fabrica_conexion: Optional[Callable[[], Any]] = None):
+        if minimo < 0 or maximo < 1 or minimo > maximo:
+            raise ValueError(f"Tamaños de pool inválidos: minimo={minimo}, maximo={maximo}")
+        self.db_config = db_config
+        self.minimo = minimo
+        self.maximo = maximo
+        self.timeout = timeout
+        self.verificar_tras = verificar_tras
+        self._fabrica = fabrica_conexion or (lambda: psycopg2.connect(**self.db_config))
+
+        self._cond = threading.Condition()
+        self._libres: List[Any] = []
+        self._ultimo_uso: Dict[int, float] = {}
+        self._total = 0
+        self._cerrado = False
+
+        self._esperando = 0
+        self._max_esperando = 0
+        self._obtenciones = 0
+        self._esperas = 0
+        self._timeouts = 0
+        self._descartadas = 0
+        self._latencias = deque(maxlen=self.MUESTRAS_LATENCIA)
+        self._latencia_max = 0.0
+
+        for _ in range(minimo):
+            conn = self._crear_conexion()
+            self._total += 1
+            self._libres.append(conn)
+            self._ultimo_uso[id(conn)] = time.monotonic()
+
+    def _crear_conexion(self):
+        conn = self._fabrica()
+        conn.autocommit = False
+        return conn
+
+    def _esta_sana(self, conn) -> bool:
+        if conn.closed:
+            return False
+        inactiva = time.monotonic() - self._ultimo_uso.get(id(conn), 0.0)
+        if inactiva < self.verificar_tras:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _cerrar_silencioso(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def obtener(self):
+        """Entrega una conexión sana, esperando hasta ``timeout`` si el pool está lleno."""
+        inicio = time.perf_counter()
+        limite = inicio + self.timeout
+        conn = None
+        with self._cond:
+            while True:
+                if self._cerrado:
+                    raise PoolAgotadoError("El pool de conexiones está cerrado")
+                if self._libres:
+                    conn = self._libres.pop()
+                    break
+                if self._total < self.maximo:
+                    self._total += 1
+                    break
+                restante = limite - time.perf_counter()
+                if restante <= 0:
+                    self._timeouts += 1
+                    raise PoolAgotadoError(
+                        f"No hay conexiones libres tras {self.timeout}s (maximo={self.maximo})"
+                    )
+                self._esperas += 1
+                self._esperando += 1
+                self._max_esperando = max(self._max_esperando, self._esperando)
+                try:
+                    self._cond.wait(restante)
+                finally:
+                    self._esperando -= 1
+
+        if conn is not None and not self._esta_sana(conn):
+            self._ultimo_uso.pop(id(conn), None)
+            self._cerrar_silencioso(conn)
+            with self._cond:
+                self._descartadas += 1
+            conn = None
+        if conn is None:
+            try:
+                conn = self._crear_conexion()
+            except Exception:
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                raise
+
+        latencia = time.perf_counter() - inicio
+        with self._cond:
+            self._obtenciones += 1
+            self._latencias.append(latencia)
+            self._latencia_max = max(self._latencia_max, latencia)
+        return conn
+
+    def devolver(self, conn, descartar: bool = False):
+        """Devuelve una conexión al pool, deshaciendo cualquier transacción abierta."""
+        if not descartar and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                descartar = True
+        with self._cond:
+            if descartar or self._cerrado or conn.closed:
+                self._total -= 1
+                self._descartadas += 1
+                self._ultimo_uso.pop(id(conn), None)
+                self._cerrar_silencioso(conn)
+            else:
+                self._libres.append(conn)
+                self._ultimo_uso[id(conn)] = time.monotonic()
+            self._cond.notify()
+
+    @contextmanager
+    def conexion(self):
+        conn = self.obtener()
+        descartar = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            descartar = True
+            raise
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                descartar = True
+            raise
+        finally:
+            self.devolver(conn, descartar=descartar)
+
+    def metricas(self) -> Dict[str, Any]:
+        with self._cond:
+            muestras = sorted(self._latencias)
+            libres = len(self._libres)
+            datos = {
+                'minimo': self.minimo,
+                'maximo': self.maximo,
+                'total': self._total,
+                'libres': libres,
+                'en_uso': self._total - libres,
+                'esperando': self._esperando,
+                'max_esperando': self._max_esperando,
+                'obtenciones': self._obtenciones,
+                'esperas': self._esperas,
+                'timeouts': self._timeouts,
+                'descartadas': self._descartadas,
+                'latencia_max_ms': self._latencia_max * 1000,
+            }
+        if muestras:
+            datos['latencia_p50_ms'] = muestras[len(muestras) // 2] * 1000
+            datos['latencia_p99_ms'] = muestras[min(len(muestras) - 1, int(len(muestras) * 0.99))] * 1000
+        else:
+            datos['latencia_p50_ms'] = datos['latencia_p99_ms'] = 0.0
+        return datos
+
+    def cerrar(self):
+        """Cierra las conexiones libres; las que estén en uso se cierran al devolverse."""
+        with self._cond:
+            self._cerrado = True
+            for conn in self._libres:
+                self._cerrar_silencioso(conn)
+            self._total -= len(self._libres)
+            self._libres.clear()
+            self._ultimo_uso.clear()
+            self._cond.notify_all()
@@ -1,3 +1,7 @@
+import sys
+from datetime import datetime, timedelta
+
+
 class Tarea:
     def __init__(self, id_tarea, usuario, descripcion, categoria):
         self.id = id_tarea
@@ -20,6 +24,8 @@ class Tarea:
         __str__(): Representación en texto de la tarea.
     """
 
+    __slots__ = ('id', 'usuario', 'descripcion', 'categoria')
+
     def __init__(self, id, usuario, descripcion, categoria):
         """
         Inicializa una nueva instancia de Tarea.
@@ -45,6 +51,125 @@ class Tarea:
         return f"[{self.id}] {self.descripcion} - {self.categoria} (Usuario: {self.usuario})"
 
 
+class RegistroTarea:
+    """
+    Registro compacto de una tarea para el almacenamiento en memoria.
+
+    Usa ``__slots__`` (sin ``__dict__`` por instancia), guarda categoría y
+    estado como códigos enteros pequeños, las fechas como microsegundos desde
+    1970 y el usuario como cadena internada. Ofrece además una vista
+    compatible con dict (``tarea['estado']``, ``tarea.get(...)``) para el
+    código y las plantillas que trabajan con diccionarios; incluye
+    ``version`` y ``actualizado_en`` (último cambio, para la sincronización
+    incremental), que solo se cambian con ``marcar_cambio``.
+    """
+
+    CATEGORIAS = ('trabajo', 'personal', 'estudio')
+    ESTADOS = ('Pendiente', 'Completada', 'Sin realizar')
+    CAMPOS = ('id', 'usuario', 'descripcion', 'categoria', 'fecha_creacion', 'estado', 'version', 'actualizado_en')
+    _SOLO_LECTURA = ('id', 'version', 'actualizado_en')
+    _CODIGO_CATEGORIA = {nombre: codigo for codigo, nombre in enumerate(CATEGORIAS)}
+    _CODIGO_ESTADO = {nombre: codigo for codigo, nombre in enumerate(ESTADOS)}
+    _EPOCA = datetime(1970, 1, 1)
+    _MICROSEGUNDO = timedelta(microseconds=1)
+
+    __slots__ = ('id', '_usuario', 'descripcion', '_categoria', '_estado', '_fecha', 'version', '_actualizado')
+
+    def __init__(self, id, usuario, descripcion, categoria, fecha_creacion, estado='Pendiente', version=0):
+        self.id = id
+        self.usuario = usuario
+        self.descripcion = descripcion
+        self.categoria = categoria
+        self.fecha_creacion = fecha_creacion
+        self.estado = estado
+        self.version = version
+        # Hasta el primer cambio comparte el entero de la fecha de creación
+        self._actualizado = self._fecha
+
+    @property
+    def usuario(self):
+        return self._usuario
+
+    @usuario.setter
+    def usuario(self, valor):
+        self._usuario = sys.intern(valor)
+
+    @property
+    def categoria(self):
+        return self.CATEGORIAS[self._categoria]
+
+    @categoria.setter
+    def categoria(self, valor):
+        try:
+            self._categoria = self._CODIGO_CATEGORIA[valor]
+        except KeyError:
+            raise ValueError(f"Categoría inválida: '{valor}'")
+
+    @property
+    def estado(self):
+        return self.ESTADOS[self._estado]
+
+    @estado.setter
+    def estado(self, valor):
+        try:
+            self._estado = self._CODIGO_ESTADO[valor]
+        except KeyError:
+            raise ValueError(f"Estado inválido: '{valor}'")
+
+    @property
+    def fecha_creacion(self):
+        return self._EPOCA + self._fecha * self._MICROSEGUNDO
+
+    @fecha_creacion.setter
+    def fecha_creacion(self, valor):
+        self._fecha = (valor - self._EPOCA) // self._MICROSEGUNDO
+
+    @property
+    def actualizado_en(self):
+        return self._EPOCA + self._actualizado * self._MICROSEGUNDO
+
+    def marcar_cambio(self, version, fecha):
+        """Anota la versión y la fecha del último cambio de la tarea."""
+        self.version = version
+        self._actualizado = (fecha - self._EPOCA) // self._MICROSEGUNDO
+
+    # Vista compatible con dict
+    def __getitem__(self, clave):
+        if clave not in self.CAMPOS:
+            raise KeyError(clave)
+        return getattr(self, clave)
+
+    def __setitem__(self, clave, valor):
+        if clave not in self.CAMPOS or clave in self._SOLO_LECTURA:
+            raise KeyError(clave)
+        setattr(self, clave, valor)
+
+    def __contains__(self, clave):
+        return clave in self.CAMPOS
+
+    def __iter__(self):
+        return iter(self.CAMPOS)
+
+    def __len__(self):
+        return len(self.CAMPOS)
+
+    def get(self, clave, defecto=None):
+        return getattr(self, clave) if clave in self.CAMPOS else defecto
+
+    def keys(self):
+        return self.CAMPOS
+
+    def items(self):
+        return [(campo, getattr(self, campo)) for campo in self.CAMPOS]
+
+    def como_dict(self):
+        """Copia del registro como dict (para serializar)."""
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"RegistroTarea({self.como_dict()!r})"
+
+
 """
 Modelo que representa una tarea en el sistema de gestión.
 
@@ -0,0 +1,154 @@
+"""
+Autenticación de usuarios contra la tabla ``usuarios``.
+
+- Una sola consulta (id y hash) por intento; nunca crea usuarios.
+- El método de hash de werkzeug es configurable (``metodo_hash``, p. ej.
+  'scrypt:32768:8:1' o 'pbkdf2:sha256:600000'). Si un usuario entra con un
+  hash generado con otro método, se vuelve a calcular con el actual y se
+  guarda: subir o bajar el coste no obliga a nadie a cambiar de contraseña.
+- El hash se calcula en un pool de ``hilos`` acotado. Si ya hay
+  ``maximo_en_espera`` verificaciones en curso o en cola, el intento se
+  rechaza con AutenticacionSaturadaError en lugar de acumular peticiones.
+- Caché de intentos fallidos por usuario y por origen (IP): tras
+  ``intentos_maximos`` fallos seguidos se rechazan los intentos con
+  DemasiadosIntentosError, sin consultar la base de datos ni calcular
+  ningún hash, hasta que pasen ``ventana`` segundos desde el último fallo.
+
+Ejemplo de uso:
+--------------
+>>> autenticacion = Autenticacion(gestor, metodo_hash='pbkdf2:sha256:600000')
+>>> autenticacion.registrar("ana", "secreto")
+>>> autenticacion.autenticar("ana", "secreto", origen="10.0.0.7")
+1
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import psycopg2
+import psycopg2.errors
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from services.cache import CacheLRU
+
+logger = logging.getLogger(__name__)
+
+
+class CredencialesInvalidasError(Exception): pass
+class DemasiadosIntentosError(Exception): pass
+class UsuarioYaExisteError(Exception): pass
+class AutenticacionSaturadaError(Exception): pass
+
+
+class Autenticacion:
+    def __init__(self, gestor, metodo_hash: str = 'scrypt:32768:8:1', hilos: int = 4,
+                 maximo_en_espera: Optional[int] = None, intentos_maximos: int = 5,
+                 ventana: float = 300.0, maximo_registros: int = 10000):
+        self.gestor = gestor
+        self.intentos_maximos = intentos_maximos
+        # Hash de referencia: da el método normalizado (con sus parámetros por
+        # defecto) y sirve para igualar el tiempo de los usuarios inexistentes
+        self._hash_referencia = generate_password_hash('', metodo_hash)
+        self.metodo_hash = self._hash_referencia.split('$', 1)[0]
+        self._ejecutor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='autenticacion')
+        self._plazas = threading.BoundedSemaphore(maximo_en_espera or hilos * 4)
+        self._fallos = CacheLRU(maximo_registros, ventana)
+        self._lock_fallos = threading.Lock()
+
+    def cerrar(self):
+        self._ejecutor.shutdown(wait=True)
+
+    def autenticar(self, usuario: str, password: str, origen: Optional[str] = None) -> int:
+        """Devuelve el ID del usuario si la contraseña es correcta."""
+        usuario = usuario.strip()
+        claves = [('usuario', usuario)] + ([('origen', origen)] if origen else [])
+        if any(self._fallos_de(clave) >= self.intentos_maximos for clave in claves):
+            raise DemasiadosIntentosError("Demasiados intentos fallidos; espera unos minutos")
+
+        credenciales = self._leer_credenciales(usuario)
+        usuario_id, hash_guardado = credenciales if credenciales else (None, '')
+        # Sin hash válido se verifica contra el de referencia para no
+        # revelar por el tiempo de respuesta si el usuario existe
+        valido, nuevo_hash = self._en_pool(self._verificar, hash_guardado or self._hash_referencia, password)
+        if usuario_id is None or not hash_guardado or not valido:
+            for clave in claves:
+                self._anotar_fallo(clave)
+            raise CredencialesInvalidasError("Usuario o contraseña incorrectos")
+
+        self._fallos.invalidar(('usuario', usuario))
+        if nuevo_hash is not None:
+            self._actualizar_hash(usuario_id, hash_guardado, nuevo_hash)
+            logger.info("Hash de '%s' actualizado a %s", usuario, self.metodo_hash)
+        return usuario_id
+
+    def registrar(self, usuario: str, password: str) -> int:
+        """
+        Crea el usuario con la contraseña dada. Lanza UsuarioYaExisteError si
+        el nombre ya está en uso, aunque sea de un usuario sin contraseña
+        (creado, por ejemplo, desde la interfaz de escritorio).
+        """
+        usuario = usuario.strip()
+        if not usuario or not password:
+            raise ValueError("Usuario y contraseña son obligatorios")
+        hash_pw = self._en_pool(generate_password_hash, password, self.metodo_hash)
+        try:
+            with self.gestor.conexion() as conn, conn.cursor() as cur:
+                cur.execute(
+                    "INSERT INTO usuarios (username, password_hash) VALUES (%s, %s) RETURNING id",
+                    (usuario, hash_pw)
+                )
+                fila = cur.fetchone()
+                conn.commit()
+        except psycopg2.errors.UniqueViolation:
+            raise UsuarioYaExisteError(f"El usuario '{usuario}' ya existe")
+        except Exception as e:
+            raise RuntimeError(f"Error al registrar a '{usuario}': {e}")
+        logger.info("Usuario '%s' registrado con ID %s", usuario, fila[0])
+        return fila[0]
+
+    def fallos(self, usuario: str) -> int:
+        """Intentos fallidos recientes de ``usuario``."""
+        return self._fallos_de(('usuario', usuario.strip()))
+
+    def _fallos_de(self, clave: Tuple[str, str]) -> int:
+        return self._fallos.obtener(clave) or 0
+
+    def _anotar_fallo(self, clave: Tuple[str, str]):
+        with self._lock_fallos:
+            self._fallos.guardar(clave, self._fallos_de(clave) + 1)
+
+    def _en_pool(self, funcion, *args):
+        if not self._plazas.acquire(blocking=False):
+            raise AutenticacionSaturadaError("Demasiadas verificaciones en curso; inténtalo de nuevo")
+        try:
+            return self._ejecutor.submit(funcion, *args).result()
+        finally:
+            self._plazas.release()
+
+    def _verificar(self, hash_guardado: str, password: str) -> Tuple[bool, Optional[str]]:
+        if not check_password_hash(hash_guardado, password):
+            return False, None
+        if hash_guardado.split('$', 1)[0] != self.metodo_hash:
+            return True, generate_password_hash(password, self.metodo_hash)
+        return True, None
+
+    def _leer_credenciales(self, usuario: str) -> Optional[Tuple[int, str]]:
+        try:
+            with self.gestor.conexion() as conn, conn.cursor() as cur:
+                cur.execute("SELECT id, password_hash FROM usuarios WHERE username = %s", (usuario,))
+                return cur.fetchone()
+        except Exception as e:
+            raise RuntimeError(f"Error al leer las credenciales de '{usuario}': {e}")
+
+    def _actualizar_hash(self, usuario_id: int, hash_anterior: str, nuevo_hash: str):
+        # Solo si nadie lo ha cambiado entretanto
+        try:
+            with self.gestor.conexion() as conn, conn.cursor() as cur:
+                cur.execute(
+                    "UPDATE usuarios SET password_hash = %s WHERE id = %s AND password_hash = %s",
+                    (nuevo_hash, usuario_id, hash_anterior)
+                )
+                conn.commit()
+        except Exception as e:
+            logger.error("No se pudo actualizar el hash del usuario %s: %s", usuario_id, e)
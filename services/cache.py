@@ -0,0 +1,92 @@
+"""
+Cachés en proceso usadas por los servicios del gestor de tareas.
+
+CacheLRU:
+--------
+Caché acotada con política LRU (se descarta la entrada usada hace más tiempo)
+y segura para hilos. Con ``ttl`` (segundos) además caduca cada entrada a ese
+tiempo de guardarse. Lleva contadores de aciertos y fallos para poder
+comprobar en producción cuántas consultas evita.
+
+Ejemplo de uso:
+--------------
+>>> cache = CacheLRU(maximo=2)
+>>> cache.guardar("ana", 1)
+>>> cache.obtener("ana")
+1
+>>> cache.estadisticas()['aciertos']
+1
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class CacheLRU:
+    def __init__(self, maximo: int = 1024, ttl: Optional[float] = None):
+        if maximo < 1:
+            raise ValueError(f"El tamaño máximo de la caché debe ser positivo: {maximo}")
+        if ttl is not None and ttl <= 0:
+            raise ValueError(f"El TTL de la caché debe ser positivo: {ttl}")
+        self.maximo = maximo
+        self.ttl = ttl
+        # clave -> (valor, instante de caducidad o None)
+        self._datos: "OrderedDict[Hashable, tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        self.caducadas = 0
+
+    def obtener(self, clave: Hashable, defecto: Optional[Any] = None) -> Any:
+        with self._lock:
+            try:
+                valor, caduca = self._datos[clave]
+            except KeyError:
+                self.fallos += 1
+                return defecto
+            if caduca is not None and caduca <= time.monotonic():
+                del self._datos[clave]
+                self.caducadas += 1
+                self.fallos += 1
+                return defecto
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    def guardar(self, clave: Hashable, valor: Any):
+        caduca = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._datos[clave] = (valor, caduca)
+            self._datos.move_to_end(clave)
+            if len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+                self.expulsiones += 1
+
+    def invalidar(self, clave: Hashable):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+    def __contains__(self, clave: Hashable) -> bool:
+        return clave in self._datos
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'tamano': len(self._datos),
+                'maximo': self.maximo,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'expulsiones': self.expulsiones,
+                'caducadas': self.caducadas,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+            }
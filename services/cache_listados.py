@@ -0,0 +1,132 @@
+"""
+Caché de listados de tareas por usuario con invalidación por escritura.
+
+GestorTareas guarda aquí el resultado de ``obtener_tareas_usuario`` y
+``obtener_tareas_usuario_paginado`` y, cada vez que uno de sus métodos
+modifica tareas de un usuario, llama a ``invalidar_usuario``. La
+invalidación no busca claves: incrementa una *generación* por usuario que
+forma parte de cada clave, así que las entradas anteriores dejan de ser
+alcanzables y acaban expulsadas por LRU o por TTL.
+
+Backends:
+--------
+- CacheListadosMemoria: en proceso (CacheLRU con TTL). Basta con un solo
+  proceso servidor, aunque tenga muchos hilos.
+- CacheListadosRedis: cualquier cliente compatible con Redis (``get``,
+  ``set(..., ex=)``, ``incr``), compartido por varios procesos. Los valores
+  se guardan como JSON (fechas en ISO 8601), nunca con pickle: quien pueda
+  escribir en ese Redis no puede ejecutar código en los procesos web.
+
+Ejemplo de uso:
+--------------
+>>> gestor = GestorTareas(db_config=DB_CONFIG, cache_listados=CacheListadosMemoria(ttl=30))
+"""
+import json
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from services.cache import CacheLRU
+
+
+class CacheListadosMemoria:
+    def __init__(self, maximo: int = 1024, ttl: Optional[float] = 30.0):
+        self._cache = CacheLRU(maximo, ttl)
+        self._generaciones: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def generacion(self, usuario_id: int) -> int:
+        return self._generaciones.get(usuario_id, 0)
+
+    def invalidar_usuario(self, usuario_id: int):
+        with self._lock:
+            self._generaciones[usuario_id] = self._generaciones.get(usuario_id, 0) + 1
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        return self._cache.obtener(clave)
+
+    def guardar(self, clave: str, valor: Any):
+        self._cache.guardar(clave, valor)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        return self._cache.estadisticas()
+
+
+def _a_json(valor: Any) -> Any:
+    # JSON no distingue tuplas de listas ni tiene fechas: se marcan para recuperarlas
+    if isinstance(valor, tuple):
+        return {'$tupla': [_a_json(elemento) for elemento in valor]}
+    if isinstance(valor, list):
+        return [_a_json(elemento) for elemento in valor]
+    if isinstance(valor, dict):
+        return {clave: _a_json(elemento) for clave, elemento in valor.items()}
+    if isinstance(valor, datetime):
+        return {'$fecha_hora': valor.isoformat()}
+    if isinstance(valor, date):
+        return {'$fecha': valor.isoformat()}
+    return valor
+
+
+def _desde_json(objeto: Dict[str, Any]) -> Any:
+    if '$tupla' in objeto:
+        return tuple(objeto['$tupla'])
+    if '$fecha_hora' in objeto:
+        return datetime.fromisoformat(objeto['$fecha_hora'])
+    if '$fecha' in objeto:
+        return date.fromisoformat(objeto['$fecha'])
+    return objeto
+
+
+class CacheListadosRedis:
+    def __init__(self, cliente, ttl: Optional[float] = 30.0, prefijo: str = 'gestor_tareas:listados'):
+        self.cliente = cliente
+        self.ttl = int(ttl) if ttl else None
+        self.prefijo = prefijo
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    @classmethod
+    def desde_url(cls, url: str, **opciones) -> 'CacheListadosRedis':
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("Para CacheListadosRedis.desde_url hace falta el paquete 'redis'")
+        return cls(redis.Redis.from_url(url), **opciones)
+
+    def _clave_generacion(self, usuario_id: int) -> str:
+        return f"{self.prefijo}:generacion:{usuario_id}"
+
+    def generacion(self, usuario_id: int) -> int:
+        return int(self.cliente.get(self._clave_generacion(usuario_id)) or 0)
+
+    def invalidar_usuario(self, usuario_id: int):
+        self.cliente.incr(self._clave_generacion(usuario_id))
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        datos = self.cliente.get(f"{self.prefijo}:{clave}")
+        valor = None
+        if datos is not None:
+            try:
+                valor = json.loads(datos, object_hook=_desde_json)
+            except ValueError:
+                # Entrada ilegible (p. ej. de una versión anterior): cuenta como fallo
+                datos = None
+        with self._lock:
+            if datos is None:
+                self.fallos += 1
+                return None
+            self.aciertos += 1
+        return valor
+
+    def guardar(self, clave: str, valor: Any):
+        self.cliente.set(f"{self.prefijo}:{clave}", json.dumps(_a_json(valor)), ex=self.ttl)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+            }
@@ -0,0 +1,207 @@
+"""
+Configuración centralizada del logging de la aplicación.
+
+Los módulos solo crean mensajes: el registro raíz tiene un único
+``QueueHandler`` que encola cada registro sin bloquear, y un
+``QueueListener`` en un hilo de fondo los escribe en un archivo rotativo
+y (opcionalmente) en la consola. Así una operación como ``agregar_tarea``
+nunca espera a que el disco termine de escribir.
+
+Características:
+---------------
+- Archivo con rotación por tamaño (``RotatingFileHandler``) o, con
+  ``rotar=False``, sin rotación propia (``WatchedFileHandler``: reabre el
+  archivo si logrotate lo mueve), para varios procesos sobre el mismo archivo
+- Formato de texto o JSON de una línea por registro
+- Nivel por logger (``niveles={'services.gestor_tareas': 'WARNING'}``)
+- Vaciado de la cola al salir del proceso
+- Sin archivo salvo que se pida: los gestores solo llaman a
+  ``asegurar_logging``, que no toca una configuración que ya exista y, si no
+  hay ninguna, escribe solo en la consola
+- Tras un fork, el proceso hijo arranca su propio hilo de escritura y
+  nunca rota el archivo que comparte con el padre
+
+Ejemplo de uso:
+--------------
+>>> configurar_logging(archivo='gestor_tareas.log', formato_json=True)
+>>> logging.getLogger(__name__).info("Tarea %s agregada", 7)
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Union
+
+FORMATO_TEXTO = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_lock = threading.Lock()
+_handler_cola: Optional[logging.handlers.QueueHandler] = None
+_listener: Optional['_ListenerCola'] = None
+
+
+class FormatoJSON(logging.Formatter):
+    """Un objeto JSON por línea, apto para agregadores de logs."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            'fecha': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+            'hilo': record.threadName
+        }
+        if record.exc_info:
+            datos['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False)
+
+
+class _HandlerCola(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Se formatea el mensaje en el hilo de fondo, no en el que registra:
+        # solo se resuelven los argumentos para que el registro sea inmutable.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _ListenerCola(logging.handlers.QueueListener):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Tomado mientras se escribe un registro (ver _antes_de_fork)
+        self.escribiendo = threading.Lock()
+
+    def handle(self, record: logging.LogRecord):
+        with self.escribiendo:
+            super().handle(record)
+
+
+def configurar_logging(archivo: Optional[str] = None,
+                       nivel: Union[int, str] = logging.INFO,
+                       consola: bool = True,
+                       formato_json: bool = False,
+                       max_bytes: int = 10 * 1024 * 1024,
+                       copias: int = 5,
+                       rotar: bool = True,
+                       niveles: Optional[Dict[str, Union[int, str]]] = None) -> logging.handlers.QueueListener:
+    """
+    (Re)configura el logging de la aplicación y devuelve el listener de fondo.
+
+    Sin ``archivo`` solo se escribe en la consola. Si ya había una
+    configuración previa se detiene (vaciando su cola) y se reemplaza.
+    """
+    global _handler_cola, _listener
+    formateador = FormatoJSON() if formato_json else logging.Formatter(FORMATO_TEXTO)
+    destinos = []
+    if archivo and rotar:
+        destinos.append(logging.handlers.RotatingFileHandler(
+            archivo, maxBytes=max_bytes, backupCount=copias, encoding='utf-8', delay=True
+        ))
+    elif archivo:
+        destinos.append(logging.handlers.WatchedFileHandler(archivo, encoding='utf-8', delay=True))
+    if consola:
+        destinos.append(logging.StreamHandler(sys.stdout))
+    for destino in destinos:
+        destino.setFormatter(formateador)
+
+    with _lock:
+        _detener()
+        cola = queue.SimpleQueue()
+        _handler_cola = _HandlerCola(cola)
+        _listener = _ListenerCola(cola, *destinos, respect_handler_level=True)
+        raiz = logging.getLogger()
+        raiz.addHandler(_handler_cola)
+        raiz.setLevel(nivel)
+        for nombre, nivel_logger in (niveles or {}).items():
+            logging.getLogger(nombre).setLevel(nivel_logger)
+        _listener.start()
+        return _listener
+
+
+def asegurar_logging(**opciones):
+    """
+    Configura el logging (``opciones`` como en configurar_logging; por
+    defecto, solo consola) si nadie lo ha hecho: ni con configurar_logging
+    ni la propia aplicación, p. ej. con ``logging.basicConfig``.
+    """
+    with _lock:
+        if _listener is not None or logging.getLogger().handlers:
+            return
+    configurar_logging(**opciones)
+
+
+def fijar_nivel(nombre: str, nivel: Union[int, str]):
+    """Cambia en caliente el nivel de un logger concreto."""
+    logging.getLogger(nombre).setLevel(nivel)
+
+
+def detener_logging():
+    """Vacía la cola pendiente y retira el handler del registro raíz."""
+    with _lock:
+        _detener()
+
+
+def _detener():
+    global _handler_cola, _listener
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_handler_cola)
+    _listener.stop()
+    for destino in _listener.handlers:
+        destino.close()
+    _handler_cola = _listener = None
+
+
+def _destino_en_hijo(destino: logging.Handler) -> logging.Handler:
+    # Dos procesos rotando el mismo archivo se pisan (cada uno renombra el que
+    # el otro acaba de crear): el hijo solo añade y lo reabre si otro lo rota
+    if not isinstance(destino, logging.handlers.RotatingFileHandler):
+        return destino
+    vigilado = logging.handlers.WatchedFileHandler(destino.baseFilename, encoding=destino.encoding, delay=True)
+    vigilado.setFormatter(destino.formatter)
+    vigilado.setLevel(destino.level)
+    destino.close()
+    return vigilado
+
+
+def _antes_de_fork():
+    # Si el hilo del listener estuviera escribiendo durante el fork, el hijo
+    # heredaría tomado el lock interno del archivo (o de stdout) y su propio
+    # hilo de escritura se bloquearía para siempre: se espera a que termine
+    # el registro en curso y no empieza otro hasta después del fork.
+    _lock.acquire()
+    if _listener is not None:
+        _listener.escribiendo.acquire()
+
+
+def _tras_fork_en_padre():
+    if _listener is not None:
+        _listener.escribiendo.release()
+    _lock.release()
+
+
+def _reiniciar_en_hijo():
+    # El hilo del listener no existe en el hijo y el lock quedó tomado por
+    # _antes_de_fork: se crean de nuevo sobre los mismos destinos.
+    global _lock, _handler_cola, _listener
+    _lock = threading.Lock()
+    if _listener is None:
+        return
+    raiz = logging.getLogger()
+    raiz.removeHandler(_handler_cola)
+    cola = queue.SimpleQueue()
+    _handler_cola = _HandlerCola(cola)
+    destinos = [_destino_en_hijo(destino) for destino in _listener.handlers]
+    _listener = _ListenerCola(cola, *destinos, respect_handler_level=True)
+    raiz.addHandler(_handler_cola)
+    _listener.start()
+
+
+atexit.register(detener_logging)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(before=_antes_de_fork, after_in_parent=_tras_fork_en_padre,
+                        after_in_child=_reiniciar_en_hijo)
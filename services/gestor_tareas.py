@@ -1,8 +1,20 @@
 import psycopg2
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from psycopg2.extras import execute_values
+from typing import Callable, List, Optional, Dict, Any, Iterable, Iterator, Tuple
+from datetime import date, datetime, timedelta
+from contextlib import contextmanager
+import base64
+import hashlib
 import logging
-import sys
+import threading
+import uuid
+
+from database.pool_conexiones import PoolConexiones
+from services.cache import CacheLRU
+from services.configuracion_logging import asegurar_logging
+from services.indice_invertido import IndiceInvertido
+from services.registro_actividad import RegistroActividad
+from models.tarea import RegistroTarea
 
 # Excepciones personalizadas
 class DescripcionVaciaError(Exception): pass
@@ -10,29 +22,425 @@ class CategoriaInvalidaError(Exception): pass
 class TareaNoEncontradaError(Exception): pass
 class UsuarioSinTareasError(Exception): pass
 class EstadoInvalidoError(Exception): pass
+class AccesoDenegadoError(Exception): pass
 
 class GestorTareas:
     CATEGORIAS_VALIDAS = {"trabajo", "personal", "estudio"}
     ESTADOS_VALIDOS = {"Pendiente", "Completada", "Sin realizar"}
+    # Criterios de orden de buscar_tareas: SQL y clave equivalente en memoria
+    ORDENES = {
+        'reciente': "t.fecha_creacion DESC, t.id DESC",
+        'antigua': "t.fecha_creacion ASC, t.id ASC",
+        'categoria': "t.categoria ASC, t.fecha_creacion DESC, t.id DESC",
+        'estado': "t.estado ASC, t.fecha_creacion DESC, t.id DESC",
+    }
+    # Esquema mínimo que el gestor crea al conectar (el completo está en database/DDL.sql)
+    SCRIPTS_ESTRUCTURA = (
+        # Se ejecutan en una transacción; el lock evita que varios procesos que
+        # arrancan a la vez choquen creando los mismos objetos
+        """
+        SELECT pg_advisory_xact_lock(hashtext('gestor_tareas_estructura'))
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS usuarios (
+            id SERIAL PRIMARY KEY,
+            username VARCHAR(100) NOT NULL UNIQUE,
+            password_hash VARCHAR(255) NOT NULL DEFAULT '',
+            fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS tareas (
+            id SERIAL PRIMARY KEY,
+            usuario_id INTEGER NOT NULL REFERENCES usuarios(id),
+            descripcion TEXT NOT NULL,
+            categoria VARCHAR(50) NOT NULL,
+            fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            estado VARCHAR(20) NOT NULL DEFAULT 'Pendiente'
+                CHECK (estado IN ('Pendiente', 'Completada', 'Sin realizar'))
+        )
+        """,
+        # logs_actividad particionada por mes de fecha_log
+        """
+        DO $$
+        BEGIN
+            CREATE SEQUENCE IF NOT EXISTS logs_actividad_id_seq;
+            -- Versiones anteriores: tabla sin particionar; se aparta y sus filas se
+            -- copian más abajo, una vez creadas las particiones de sus meses
+            IF EXISTS (SELECT 1 FROM pg_class WHERE oid = to_regclass('logs_actividad') AND relkind = 'r') THEN
+                ALTER SEQUENCE logs_actividad_id_seq OWNED BY NONE;
+                ALTER TABLE logs_actividad RENAME TO logs_actividad_sin_particionar;
+                ALTER TABLE logs_actividad_sin_particionar RENAME CONSTRAINT logs_actividad_pkey TO logs_actividad_sin_particionar_pkey;
+                ALTER INDEX IF EXISTS idx_logs_usuario_fecha RENAME TO idx_logs_usuario_fecha_sin_particionar;
+            END IF;
+            CREATE TABLE IF NOT EXISTS logs_actividad (
+                id INTEGER NOT NULL DEFAULT nextval('logs_actividad_id_seq'),
+                usuario_id INTEGER REFERENCES usuarios(id) ON DELETE SET NULL,
+                accion VARCHAR(50) NOT NULL,
+                descripcion TEXT,
+                fecha_log TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (id, fecha_log)
+            ) PARTITION BY RANGE (fecha_log);
+            -- Recoge lo que no tenga partición mensual; crear_particion_logs lo reubica
+            CREATE TABLE IF NOT EXISTS logs_actividad_default PARTITION OF logs_actividad DEFAULT;
+            ALTER SEQUENCE logs_actividad_id_seq OWNED BY logs_actividad.id;
+        END
+        $$
+        """,
+        """
+        CREATE OR REPLACE FUNCTION crear_particion_logs(p_mes DATE)
+        RETURNS BOOLEAN AS $$
+        DECLARE
+            v_desde DATE := date_trunc('month', p_mes)::date;
+            v_hasta DATE := (date_trunc('month', p_mes) + INTERVAL '1 month')::date;
+            v_nombre TEXT := 'logs_actividad_' || to_char(p_mes, 'YYYYMM');
+        BEGIN
+            PERFORM pg_advisory_xact_lock(hashtext('logs_actividad_particiones'));
+            IF to_regclass(v_nombre) IS NOT NULL THEN
+                RETURN false;
+            END IF;
+            IF EXISTS (SELECT 1 FROM logs_actividad_default WHERE fecha_log >= v_desde AND fecha_log < v_hasta) THEN
+                -- Hay filas del mes en la partición por defecto: se mueven a la nueva
+                ALTER TABLE logs_actividad DETACH PARTITION logs_actividad_default;
+                EXECUTE format('CREATE TABLE %I PARTITION OF logs_actividad FOR VALUES FROM (%L) TO (%L)',
+                               v_nombre, v_desde, v_hasta);
+                EXECUTE format('INSERT INTO %I SELECT * FROM logs_actividad_default WHERE fecha_log >= %L AND fecha_log < %L',
+                               v_nombre, v_desde, v_hasta);
+                DELETE FROM logs_actividad_default WHERE fecha_log >= v_desde AND fecha_log < v_hasta;
+                ALTER TABLE logs_actividad ATTACH PARTITION logs_actividad_default DEFAULT;
+            ELSE
+                EXECUTE format('CREATE TABLE %I PARTITION OF logs_actividad FOR VALUES FROM (%L) TO (%L)',
+                               v_nombre, v_desde, v_hasta);
+            END IF;
+            RETURN true;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE FUNCTION asegurar_particiones_logs(p_meses_futuros INTEGER DEFAULT 3)
+        RETURNS INTEGER AS $$
+        DECLARE
+            v_creadas INTEGER := 0;
+        BEGIN
+            FOR i IN 0..p_meses_futuros LOOP
+                IF crear_particion_logs((date_trunc('month', CURRENT_DATE) + make_interval(months => i))::date) THEN
+                    v_creadas := v_creadas + 1;
+                END IF;
+            END LOOP;
+            RETURN v_creadas;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE FUNCTION purgar_particiones_logs(p_meses_retencion INTEGER, p_solo_separar BOOLEAN DEFAULT false)
+        RETURNS SETOF TEXT AS $$
+        DECLARE
+            v_limite DATE := (date_trunc('month', CURRENT_DATE) - make_interval(months => p_meses_retencion))::date;
+            v_particion TEXT;
+        BEGIN
+            PERFORM pg_advisory_xact_lock(hashtext('logs_actividad_particiones'));
+            FOR v_particion IN
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'logs_actividad'::regclass
+                  AND c.relname ~ '^logs_actividad_[0-9]{6}$'
+                  AND to_date(right(c.relname, 6), 'YYYYMM') < v_limite
+                ORDER BY c.relname
+            LOOP
+                EXECUTE format('ALTER TABLE logs_actividad DETACH PARTITION %I', v_particion);
+                IF NOT p_solo_separar THEN
+                    EXECUTE format('DROP TABLE %I', v_particion);
+                END IF;
+                RETURN NEXT v_particion;
+            END LOOP;
+            DELETE FROM logs_actividad_default WHERE fecha_log < v_limite;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        DO $$
+        DECLARE
+            v_mes DATE;
+        BEGIN
+            IF to_regclass('logs_actividad_sin_particionar') IS NOT NULL THEN
+                FOR v_mes IN SELECT DISTINCT date_trunc('month', fecha_log)::date
+                             FROM logs_actividad_sin_particionar WHERE fecha_log IS NOT NULL LOOP
+                    PERFORM crear_particion_logs(v_mes);
+                END LOOP;
+                INSERT INTO logs_actividad (id, usuario_id, accion, descripcion, fecha_log)
+                SELECT id, usuario_id, accion, descripcion, COALESCE(fecha_log, CURRENT_TIMESTAMP)
+                FROM logs_actividad_sin_particionar;
+                DROP TABLE logs_actividad_sin_particionar;
+            END IF;
+        END
+        $$
+        """,
+        # El registro de actividad lo escribe services.registro_actividad por lotes
+        """
+        DROP TRIGGER IF EXISTS after_update_tarea ON tareas
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_tareas_usuario ON tareas(usuario_id)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_logs_usuario_fecha ON logs_actividad(usuario_id, fecha_log)
+        """,
+        """
+        SELECT asegurar_particiones_logs(3)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_tareas_usuario_fecha_id
+            ON tareas(usuario_id, fecha_creacion DESC, id DESC)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_tareas_usuario_estado
+            ON tareas(usuario_id, estado, fecha_creacion DESC, id DESC)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_tareas_usuario_categoria
+            ON tareas(usuario_id, categoria, fecha_creacion DESC, id DESC)
+        """,
+        """
+        ALTER TABLE tareas ADD COLUMN IF NOT EXISTS descripcion_tsv tsvector
+            GENERATED ALWAYS AS (to_tsvector('spanish', descripcion)) STORED
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_tareas_descripcion_tsv ON tareas USING GIN (descripcion_tsv)
+        """,
+        # Sincronización incremental (cambios_desde). version es el ID de la
+        # última transacción que escribió la fila: a diferencia de una secuencia,
+        # permite saber con el snapshot qué cambios ya están todos confirmados
+        """
+        ALTER TABLE tareas
+            ADD COLUMN IF NOT EXISTS actualizado_en TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT pg_current_xact_id()::text::bigint
+        """,
+        # actualizado_en se envía como Last-Modified: con zona horaria no hay que
+        # suponer que el servidor web y PostgreSQL usan la misma
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM information_schema.columns
+                       WHERE table_schema = current_schema() AND table_name = 'tareas'
+                         AND column_name = 'actualizado_en' AND data_type = 'timestamp without time zone') THEN
+                ALTER TABLE tareas ALTER COLUMN actualizado_en TYPE TIMESTAMPTZ;
+            END IF;
+        END
+        $$
+        """,
+        """
+        CREATE OR REPLACE FUNCTION marcar_cambio_tarea()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.actualizado_en := CURRENT_TIMESTAMP;
+            NEW.version := pg_current_xact_id()::text::bigint;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE TRIGGER marcar_cambio_tarea
+        BEFORE UPDATE ON tareas FOR EACH ROW
+        WHEN ((OLD.usuario_id, OLD.descripcion, OLD.categoria, OLD.estado)
+              IS DISTINCT FROM (NEW.usuario_id, NEW.descripcion, NEW.categoria, NEW.estado))
+        EXECUTE FUNCTION marcar_cambio_tarea()
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_tareas_usuario_version ON tareas(usuario_id, version)
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS tareas_eliminadas (
+            tarea_id INTEGER PRIMARY KEY,
+            usuario_id INTEGER NOT NULL,
+            version BIGINT NOT NULL DEFAULT pg_current_xact_id()::text::bigint,
+            eliminada_en TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_tareas_eliminadas_usuario_version ON tareas_eliminadas(usuario_id, version)
+        """,
+        # Versión más alta de las tareas eliminadas ya purgadas: quien sincronice
+        # desde una marca anterior ha perdido bajas y debe descargarlo todo
+        """
+        CREATE TABLE IF NOT EXISTS tareas_eliminadas_purga (
+            id BOOLEAN PRIMARY KEY DEFAULT true CHECK (id),
+            version BIGINT NOT NULL
+        )
+        """,
+        # Transacción que creó el usuario: una marca anterior viene de otro
+        # usuario con el mismo nombre (borrado y vuelto a crear)
+        """
+        ALTER TABLE usuarios ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT pg_current_xact_id()::text::bigint
+        """,
+        """
+        CREATE OR REPLACE FUNCTION registrar_tareas_eliminadas()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            INSERT INTO tareas_eliminadas (tarea_id, usuario_id)
+            SELECT id, usuario_id FROM viejas
+            ON CONFLICT (tarea_id) DO NOTHING;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE TRIGGER tareas_eliminadas_delete
+        AFTER DELETE ON tareas REFERENCING OLD TABLE AS viejas
+        FOR EACH STATEMENT EXECUTE FUNCTION registrar_tareas_eliminadas()
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS estadisticas_usuario (
+            usuario_id INTEGER PRIMARY KEY REFERENCES usuarios(id) ON DELETE CASCADE,
+            total INTEGER NOT NULL DEFAULT 0,
+            completadas INTEGER NOT NULL DEFAULT 0,
+            pendientes INTEGER NOT NULL DEFAULT 0,
+            sin_realizar INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        """
+        CREATE OR REPLACE FUNCTION aplicar_delta_estadisticas(p_usuarios INTEGER[], p_estados TEXT[], p_signos INTEGER[])
+        RETURNS VOID AS $$
+            INSERT INTO estadisticas_usuario AS e (usuario_id, total, completadas, pendientes, sin_realizar)
+            SELECT usuario_id,
+                   SUM(signo),
+                   COALESCE(SUM(signo) FILTER (WHERE estado = 'Completada'), 0),
+                   COALESCE(SUM(signo) FILTER (WHERE estado = 'Pendiente'), 0),
+                   COALESCE(SUM(signo) FILTER (WHERE estado = 'Sin realizar'), 0)
+            FROM unnest(p_usuarios, p_estados, p_signos) AS d(usuario_id, estado, signo)
+            GROUP BY usuario_id
+            ON CONFLICT (usuario_id) DO UPDATE SET
+                total = e.total + EXCLUDED.total,
+                completadas = e.completadas + EXCLUDED.completadas,
+                pendientes = e.pendientes + EXCLUDED.pendientes,
+                sin_realizar = e.sin_realizar + EXCLUDED.sin_realizar
+        $$ LANGUAGE sql
+        """,
+        """
+        CREATE OR REPLACE FUNCTION acumular_estadisticas_usuario()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            -- Una sola actualización por usuario para todas las filas de la sentencia
+            IF TG_OP = 'INSERT' THEN
+                PERFORM aplicar_delta_estadisticas(array_agg(usuario_id), array_agg(estado::text),
+                                                   array_agg(1)) FROM nuevas;
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM aplicar_delta_estadisticas(array_agg(usuario_id), array_agg(estado::text),
+                                                   array_agg(-1)) FROM viejas;
+            ELSE
+                PERFORM aplicar_delta_estadisticas(array_agg(x.usuario_id), array_agg(x.estado),
+                                                   array_agg(x.signo))
+                FROM nuevas n
+                JOIN viejas v ON v.id = n.id
+                CROSS JOIN LATERAL (VALUES (n.usuario_id, n.estado::text, 1), (v.usuario_id, v.estado::text, -1))
+                    AS x(usuario_id, estado, signo)
+                WHERE (n.usuario_id, n.estado) IS DISTINCT FROM (v.usuario_id, v.estado);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE TRIGGER estadisticas_tareas_insert
+        AFTER INSERT ON tareas REFERENCING NEW TABLE AS nuevas
+        FOR EACH STATEMENT EXECUTE FUNCTION acumular_estadisticas_usuario()
+        """,
+        """
+        CREATE OR REPLACE TRIGGER estadisticas_tareas_update
+        AFTER UPDATE ON tareas REFERENCING OLD TABLE AS viejas NEW TABLE AS nuevas
+        FOR EACH STATEMENT EXECUTE FUNCTION acumular_estadisticas_usuario()
+        """,
+        """
+        CREATE OR REPLACE TRIGGER estadisticas_tareas_delete
+        AFTER DELETE ON tareas REFERENCING OLD TABLE AS viejas
+        FOR EACH STATEMENT EXECUTE FUNCTION acumular_estadisticas_usuario()
+        """,
+        # Carga inicial de los contadores cuando la tabla se crea sobre datos existentes
+        """
+        INSERT INTO estadisticas_usuario (usuario_id, total, completadas, pendientes, sin_realizar)
+        SELECT usuario_id, COUNT(*),
+               COUNT(*) FILTER (WHERE estado = 'Completada'),
+               COUNT(*) FILTER (WHERE estado = 'Pendiente'),
+               COUNT(*) FILTER (WHERE estado = 'Sin realizar')
+        FROM tareas
+        WHERE NOT EXISTS (SELECT 1 FROM estadisticas_usuario)
+        GROUP BY usuario_id
+        """,
+        # reporte_productividad era una vista normal en versiones anteriores
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_views
+                       WHERE schemaname = current_schema() AND viewname = 'reporte_productividad') THEN
+                DROP VIEW reporte_productividad;
+            END IF;
+        END
+        $$
+        """,
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS reporte_productividad AS
+        SELECT
+            u.username,
+            COUNT(t.id) FILTER (WHERE t.estado = 'Completada') AS tareas_completadas_mes,
+            COUNT(t.id) FILTER (WHERE t.estado = 'Pendiente' AND t.fecha_creacion >= CURRENT_DATE - INTERVAL '30 days') AS tareas_pendientes,
+            ROUND(COUNT(t.id) FILTER (WHERE t.estado = 'Completada') * 100.0 /
+                  NULLIF(COUNT(t.id) FILTER (WHERE t.fecha_creacion >= CURRENT_DATE - INTERVAL '30 days'), 0), 2) AS porcentaje_eficiencia,
+            now() AS calculado_en
+        FROM usuarios u
+        LEFT JOIN tareas t ON u.id = t.usuario_id
+        GROUP BY u.id, u.username
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_reporte_productividad_username ON reporte_productividad(username)
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS esquema_gestor (
+            huella TEXT PRIMARY KEY,
+            aplicado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    # Si esta huella ya figura en esquema_gestor la estructura está al día y no
+    # se vuelve a ejecutar DDL (que bloquea tablas) contra una base en uso
+    HUELLA_ESTRUCTURA = hashlib.sha1("".join(SCRIPTS_ESTRUCTURA).encode()).hexdigest()
 
-    def __init__(self, db_config: Optional[Dict[str, Any]] = None):
+    def __init__(self, db_config: Optional[Dict[str, Any]] = None,
+                 pool_config: Optional[Dict[str, Any]] = None,
+                 tamano_cache_usuarios: int = 1024,
+                 cache_listados: Optional[Any] = None,
+                 actividad_config: Optional[Dict[str, Any]] = None):
         self.db_config = db_config
+        self.pool_config = pool_config
         self.usa_postgresql = db_config is not None
         self.conn = None
-        self.tareas: Dict[int, Dict[str, Any]] = {}
+        self.pool: Optional[PoolConexiones] = None
+        self._lock_conexion = threading.RLock()
+        self._local = threading.local()
+        self._cache_usuarios = CacheLRU(tamano_cache_usuarios)
+        # Backend de services.cache_listados (solo se usa con PostgreSQL)
+        self.cache_listados = cache_listados
+        self._oyentes_mutacion: List[Callable[[int, int], None]] = []
+        # Con PostgreSQL el gestor arranca su propio RegistroActividad
+        # (opciones en actividad_config); al iniciarse se asigna aquí
+        self.actividad_config = actividad_config
+        self.registro_actividad: Optional[RegistroActividad] = None
+        self.tareas: Dict[int, RegistroTarea] = {}
+        # Índices secundarios del modo memoria (dict como conjunto ordenado de IDs)
+        self._indice_usuario: Dict[str, Dict[int, None]] = {}
+        self._indice_categoria: Dict[Tuple[str, str], Dict[int, None]] = {}
+        self._indice_estado: Dict[Tuple[str, str], Dict[int, None]] = {}
+        self._indice_texto: Dict[str, IndiceInvertido] = {}
         self.contador_id = 1
+        # Sincronización incremental del modo memoria (cambios_desde): última
+        # versión asignada (cada tarea guarda la suya) y tareas eliminadas
+        self._version = 0
+        self._eliminadas: Dict[int, Tuple[str, int, datetime]] = {}
+        self._version_purgada = 0
         self._configurar_logging()
         self._inicializar_base_datos()
 
     def _configurar_logging(self):
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('gestor_tareas.log'),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
+        asegurar_logging()
         self.logger = logging.getLogger(__name__)
 
     def _inicializar_base_datos(self):
@@ -40,84 +448,557 @@ class GestorTareas:
             self.logger.info("Modo memoria activado (sin PostgreSQL)")
             return
         try:
-            self.conn = psycopg2.connect(**self.db_config)
-            self.conn.autocommit = False
+            if self.pool_config is not None:
+                self.pool = PoolConexiones(self.db_config, **self.pool_config)
+            else:
+                self.conn = psycopg2.connect(**self.db_config)
+                self.conn.autocommit = False
             self._crear_estructura_bd()
+            RegistroActividad(self, **(self.actividad_config or {})).iniciar()
             self.logger.info("Conexión exitosa a PostgreSQL")
         except Exception as e:
-            self.logger.error(f"Error al conectar a PostgreSQL: {e}")
+            self.logger.error("Error al conectar a PostgreSQL: %s", e)
             self.usa_postgresql = False
             self.logger.warning("Se usará modo memoria")
-            if self.conn:
-                self.conn.close()
-                self.conn = None
+            self.cerrar()
+
+    @contextmanager
+    def conexion(self):
+        """
+        Entrega la conexión a usar durante una operación.
+
+        Con pool, toma una conexión por llamada y la devuelve al salir; sin pool,
+        serializa el acceso a la conexión única. Las llamadas anidadas del mismo
+        hilo reutilizan la conexión ya obtenida, y cualquier excepción deshace
+        la transacción en curso.
+        """
+        actual = getattr(self._local, 'conn', None)
+        if actual is not None:
+            yield actual
+            return
+        if self.pool is not None:
+            with self.pool.conexion() as conn:
+                self._local.conn = conn
+                try:
+                    yield conn
+                finally:
+                    self._local.conn = None
+        else:
+            with self._lock_conexion:
+                self._local.conn = self.conn
+                try:
+                    yield self.conn
+                except Exception:
+                    self.conn.rollback()
+                    raise
+                finally:
+                    self._local.conn = None
+
+    @contextmanager
+    def _conexion_dedicada(self):
+        """
+        Conexión exclusiva para operaciones largas (cursores de servidor).
+
+        No se registra como conexión del hilo, así que las demás operaciones que
+        se hagan mientras tanto no comparten su transacción.
+        """
+        if self.pool is not None:
+            with self.pool.conexion() as conn:
+                yield conn
+        else:
+            conn = psycopg2.connect(**self.db_config)
+            try:
+                yield conn
+            finally:
+                conn.close()
+
+    def metricas_pool(self) -> Optional[Dict[str, Any]]:
+        return self.pool.metricas() if self.pool is not None else None
+
+    def _indexar(self, indice: Dict[Any, Dict[int, None]], clave: Any, tarea_id: int):
+        indice.setdefault(clave, {})[tarea_id] = None
+
+    def _desindexar(self, indice: Dict[Any, Dict[int, None]], clave: Any, tarea_id: int):
+        ids = indice.get(clave)
+        if ids is not None:
+            ids.pop(tarea_id, None)
+            if not ids:
+                del indice[clave]
+
+    def _marcar_cambio(self, tarea: RegistroTarea):
+        self._version += 1
+        tarea.marcar_cambio(self._version, datetime.now())
+
+    def _indexar_tarea(self, tarea: RegistroTarea):
+        usuario, tarea_id = tarea.usuario, tarea.id
+        self._indexar(self._indice_usuario, usuario, tarea_id)
+        self._indexar(self._indice_categoria, (usuario, tarea.categoria), tarea_id)
+        self._indexar(self._indice_estado, (usuario, tarea.estado), tarea_id)
+        self._indice_texto.setdefault(usuario, IndiceInvertido()).agregar(tarea_id, tarea.descripcion)
+
+    def _desindexar_tarea(self, tarea: RegistroTarea):
+        usuario, tarea_id = tarea.usuario, tarea.id
+        self._version += 1
+        self._eliminadas[tarea_id] = (usuario, self._version, datetime.now())
+        self._desindexar(self._indice_usuario, usuario, tarea_id)
+        self._desindexar(self._indice_categoria, (usuario, tarea.categoria), tarea_id)
+        self._desindexar(self._indice_estado, (usuario, tarea.estado), tarea_id)
+        indice_texto = self._indice_texto.get(usuario)
+        if indice_texto is not None:
+            indice_texto.eliminar(tarea_id, tarea.descripcion)
+            if not len(indice_texto):
+                del self._indice_texto[usuario]
+
+    def _ids_tareas_usuario(self, usuario: str, categoria: Optional[str] = None,
+                            estado: Optional[str] = None) -> Iterable[int]:
+        """IDs (en orden de creación) de las tareas de un usuario en modo memoria."""
+        vacio: Dict[int, None] = {}
+        if categoria is None and estado is None:
+            return self._indice_usuario.get(usuario, vacio)
+        if estado is None:
+            return self._indice_categoria.get((usuario, categoria), vacio)
+        if categoria is None:
+            return self._indice_estado.get((usuario, estado), vacio)
+        por_categoria = self._indice_categoria.get((usuario, categoria), vacio)
+        por_estado = self._indice_estado.get((usuario, estado), vacio)
+        if len(por_categoria) <= len(por_estado):
+            return [i for i in por_categoria if i in por_estado]
+        return [i for i in por_estado if i in por_categoria]
+
+    def _cambiar_estado_en_memoria(self, tarea: RegistroTarea, nuevo_estado: str):
+        self._desindexar(self._indice_estado, (tarea.usuario, tarea.estado), tarea.id)
+        tarea.estado = nuevo_estado
+        self._indexar(self._indice_estado, (tarea.usuario, nuevo_estado), tarea.id)
+        self._marcar_cambio(tarea)
+
+    def _editar_en_memoria(self, tarea: RegistroTarea, nueva_descripcion: str, nueva_categoria: str):
+        self._desindexar(self._indice_categoria, (tarea.usuario, tarea.categoria), tarea.id)
+        indice_texto = self._indice_texto[tarea.usuario]
+        indice_texto.eliminar(tarea.id, tarea.descripcion)
+        tarea.descripcion = nueva_descripcion
+        tarea.categoria = nueva_categoria
+        self._indexar(self._indice_categoria, (tarea.usuario, nueva_categoria), tarea.id)
+        indice_texto.agregar(tarea.id, nueva_descripcion)
+        self._marcar_cambio(tarea)
+
+    def _normalizar_estado(self, estado: str) -> str:
+        estado = estado.strip().capitalize()
+        if estado not in self.ESTADOS_VALIDOS:
+            raise EstadoInvalidoError(f"Estado inválido: '{estado}'")
+        return estado
+
+    def _normalizar_edicion(self, descripcion: str, categoria: str) -> Tuple[str, str]:
+        descripcion = descripcion.strip()
+        categoria = categoria.strip().lower()
+        if not descripcion:
+            raise DescripcionVaciaError("Descripción vacía")
+        if categoria not in self.CATEGORIAS_VALIDAS:
+            raise CategoriaInvalidaError(f"Categoría inválida: '{categoria}'")
+        return descripcion, categoria
+
+    def _normalizar_filtros(self, categoria: Optional[str],
+                            estado: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        if categoria is not None:
+            categoria = categoria.strip().lower()
+            if categoria not in self.CATEGORIAS_VALIDAS:
+                raise CategoriaInvalidaError(f"Categoría inválida: '{categoria}'")
+        if estado is not None:
+            estado = self._normalizar_estado(estado)
+        return categoria, estado
 
     def _crear_estructura_bd(self):
-        scripts = [
-            """
-            CREATE TABLE IF NOT EXISTS usuarios (
-                id SERIAL PRIMARY KEY,
-                username VARCHAR(100) NOT NULL UNIQUE,
-                password_hash VARCHAR(255) NOT NULL DEFAULT '',
-                fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS tareas (
-                id SERIAL PRIMARY KEY,
-                usuario_id INTEGER NOT NULL REFERENCES usuarios(id),
-                descripcion TEXT NOT NULL,
-                categoria VARCHAR(50) NOT NULL,
-                fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                estado VARCHAR(20) NOT NULL DEFAULT 'Pendiente'
-                    CHECK (estado IN ('Pendiente', 'Completada', 'Sin realizar'))
-            )
-            """,
-            """
-            CREATE INDEX IF NOT EXISTS idx_tareas_usuario ON tareas(usuario_id)
-            """
-        ]
         try:
-            with self.conn.cursor() as cur:
-                for script in scripts:
+            with self.conexion() as conn, conn.cursor() as cur:
+                cur.execute("SELECT to_regclass('esquema_gestor') IS NOT NULL")
+                if cur.fetchone()[0]:
+                    cur.execute("SELECT 1 FROM esquema_gestor WHERE huella = %s", (self.HUELLA_ESTRUCTURA,))
+                    if cur.fetchone():
+                        conn.rollback()
+                        self.logger.info("Estructura de BD al día")
+                        return
+                for script in self.SCRIPTS_ESTRUCTURA:
                     cur.execute(script)
-                self.conn.commit()
+                cur.execute("INSERT INTO esquema_gestor (huella) VALUES (%s) ON CONFLICT DO NOTHING",
+                            (self.HUELLA_ESTRUCTURA,))
+                conn.commit()
             self.logger.info("Estructura de BD creada correctamente")
         except Exception as e:
-            self.conn.rollback()
-            self.logger.error(f"Error al crear estructura de BD: {e}")
+            self.logger.error("Error al crear estructura de BD: %s", e)
             raise RuntimeError(f"No se pudieron crear las tablas: {e}")
 
     def _obtener_id_usuario(self, username: str) -> int:
+        usuario_id = self._cache_usuarios.obtener(username)
+        if usuario_id is not None:
+            return usuario_id
         try:
-            with self.conn.cursor() as cur:
+            with self.conexion() as conn, conn.cursor() as cur:
                 cur.execute("SELECT id FROM usuarios WHERE username = %s", (username,))
                 usuario = cur.fetchone()
                 if usuario:
-                    return usuario[0]
+                    usuario_id = usuario[0]
+                else:
+                    cur.execute(
+                        """INSERT INTO usuarios (username, password_hash) VALUES (%s, '')
+                           ON CONFLICT (username) DO UPDATE SET username = EXCLUDED.username
+                           RETURNING id""",
+                        (username,)
+                    )
+                    usuario_id = cur.fetchone()[0]
+                    conn.commit()
+        except Exception as e:
+            raise RuntimeError(f"No se pudo obtener o crear usuario '{username}': {e}")
+        self._cache_usuarios.guardar(username, usuario_id)
+        return usuario_id
+
+    def recordar_usuario(self, username: str, usuario_id: int):
+        """Siembra la caché de IDs con un par recién leído de la base (p. ej. al iniciar sesión)."""
+        self._cache_usuarios.guardar(username, usuario_id)
+
+    def verificar_usuario(self, username: str, usuario_id: int) -> bool:
+        """
+        Comprueba que ``username`` sigue teniendo el ID ``usuario_id`` (p. ej. el
+        guardado en una sesión). Devuelve False si el usuario se borró o se
+        renombró; no crea usuarios. Sin PostgreSQL siempre devuelve True.
+        """
+        cacheado = self._cache_usuarios.obtener(username)
+        if cacheado is not None:
+            return cacheado == usuario_id
+        if not self.usa_postgresql:
+            return True
+        try:
+            with self.conexion() as conn, conn.cursor() as cur:
+                cur.execute("SELECT id FROM usuarios WHERE username = %s", (username,))
+                usuario = cur.fetchone()
+        except Exception as e:
+            raise RuntimeError(f"No se pudo verificar el usuario '{username}': {e}")
+        if usuario is None or usuario[0] != usuario_id:
+            return False
+        self._cache_usuarios.guardar(username, usuario_id)
+        return True
+
+    def invalidar_usuario_cache(self, username: str):
+        """Olvida el ID cacheado de un usuario (llamar si se borra o renombra fuera del gestor)."""
+        self._cache_usuarios.invalidar(username)
+
+    def estadisticas_cache_usuarios(self) -> Dict[str, Any]:
+        return self._cache_usuarios.estadisticas()
+
+    def estadisticas_cache_listados(self) -> Optional[Dict[str, Any]]:
+        return self.cache_listados.estadisticas() if self.cache_listados is not None else None
+
+    def suscribir_mutaciones(self, oyente: Callable[[int, int], None]):
+        """
+        Registra ``oyente(usuario_id, filas)``, que se llama tras cada cambio de
+        tareas confirmado en PostgreSQL por este gestor.
+        """
+        self._oyentes_mutacion.append(oyente)
+
+    def cancelar_suscripcion_mutaciones(self, oyente: Callable[[int, int], None]):
+        if oyente in self._oyentes_mutacion:
+            self._oyentes_mutacion.remove(oyente)
+
+    def _tras_mutacion(self, usuario_id: Optional[int], filas: int = 1):
+        if usuario_id is None:
+            return
+        if self.cache_listados is not None:
+            self.cache_listados.invalidar_usuario(usuario_id)
+        for oyente in self._oyentes_mutacion:
+            try:
+                oyente(usuario_id, filas)
+            except Exception as e:
+                self.logger.error("Error en oyente de mutaciones: %s", e)
+
+    def _registrar_actividad(self, usuario_id: Optional[int], accion: str, descripcion: str):
+        if self.registro_actividad is not None and usuario_id is not None:
+            self.registro_actividad.registrar(usuario_id, accion, descripcion)
+
+    def _registrar_cambio_estado(self, usuario_id: int, tarea_id: int, anterior: str, nuevo: str):
+        if anterior != nuevo:
+            self._registrar_actividad(usuario_id, 'CAMBIAR_ESTADO',
+                                      f"Tarea ID: {tarea_id} - Estado cambiado de {anterior} a {nuevo}")
+
+    def _filas_listado(self, usuario_id: int, tipo: str, consulta: str, parametros: List[Any]) -> List[tuple]:
+        """Ejecuta una consulta de listado pasando por la caché de listados, si la hay."""
+        cache = self.cache_listados
+        if cache is not None:
+            clave = f"{usuario_id}:{cache.generacion(usuario_id)}:{tipo}:{parametros!r}"
+            filas = cache.obtener(clave)
+            if filas is not None:
+                return filas
+        with self.conexion() as conn, conn.cursor() as cur:
+            cur.execute(consulta, parametros)
+            filas = cur.fetchall()
+        if cache is not None:
+            cache.guardar(clave, filas)
+        return filas
+
+    def eliminar_usuario(self, username: str):
+        username = username.strip()
+        try:
+            if self.usa_postgresql:
+                with self.conexion() as conn, conn.cursor() as cur:
+                    cur.execute(
+                        "DELETE FROM tareas WHERE usuario_id = (SELECT id FROM usuarios WHERE username = %s)",
+                        (username,)
+                    )
+                    eliminadas = cur.rowcount
+                    cur.execute("DELETE FROM usuarios WHERE username = %s RETURNING id", (username,))
+                    fila = cur.fetchone()
+                    if fila is not None:
+                        cur.execute("DELETE FROM tareas_eliminadas WHERE usuario_id = %s", (fila[0],))
+                    conn.commit()
+                if fila is not None:
+                    self._tras_mutacion(fila[0], max(eliminadas, 1))
+            else:
+                for tarea_id in list(self._indice_usuario.get(username, ())):
+                    self._desindexar_tarea(self.tareas.pop(tarea_id))
+            self.logger.info("Usuario '%s' eliminado", username)
+        except Exception as e:
+            raise RuntimeError(f"Error al eliminar usuario '{username}': {e}")
+        finally:
+            self.invalidar_usuario_cache(username)
+
+    def renombrar_usuario(self, username: str, nuevo_username: str):
+        username = username.strip()
+        nuevo_username = nuevo_username.strip()
+        try:
+            if not nuevo_username:
+                raise ValueError("Usuario vacío")
+            if self.usa_postgresql:
+                with self.conexion() as conn, conn.cursor() as cur:
+                    cur.execute(
+                        "UPDATE usuarios SET username = %s WHERE username = %s RETURNING id",
+                        (nuevo_username, username)
+                    )
+                    fila = cur.fetchone()
+                    conn.commit()
+                if fila is not None:
+                    self._tras_mutacion(fila[0])
+            else:
+                for tarea_id in list(self._indice_usuario.get(username, ())):
+                    tarea = self.tareas[tarea_id]
+                    self._desindexar_tarea(tarea)
+                    tarea.usuario = nuevo_username
+                    self._indexar_tarea(tarea)
+                    self._marcar_cambio(tarea)
+            self.logger.info("Usuario '%s' renombrado a '%s'", username, nuevo_username)
+        except Exception as e:
+            raise RuntimeError(f"Error al renombrar usuario '{username}': {e}")
+        finally:
+            self.invalidar_usuario_cache(username)
+            self.invalidar_usuario_cache(nuevo_username)
+
+    def estadisticas_usuario(self, usuario: str) -> Dict[str, Any]:
+        """
+        Conteo de tareas de un usuario por estado, con las mismas columnas que
+        ``vista_estadisticas_tareas``.
+
+        No agrega sobre ``tareas``: en PostgreSQL lee la fila de contadores de
+        ``estadisticas_usuario`` (mantenida por triggers) y en memoria usa los
+        tamaños de los índices por usuario y estado.
+        """
+        try:
+            usuario = usuario.strip()
+            if self.usa_postgresql:
+                with self.conexion() as conn, conn.cursor() as cur:
+                    cur.execute(
+                        """SELECT e.total, e.completadas, e.pendientes, e.sin_realizar
+                           FROM estadisticas_usuario e
+                           JOIN usuarios u ON u.id = e.usuario_id
+                           WHERE u.username = %s""",
+                        (usuario,)
+                    )
+                    fila = cur.fetchone() or (0, 0, 0, 0)
+                total, completadas, pendientes, sin_realizar = fila
+            else:
+                total = len(self._indice_usuario.get(usuario, ()))
+                completadas, pendientes, sin_realizar = (
+                    len(self._indice_estado.get((usuario, estado), ()))
+                    for estado in ('Completada', 'Pendiente', 'Sin realizar')
+                )
+            return {
+                'username': usuario,
+                'total_tareas': total,
+                'tareas_completadas': completadas,
+                'tareas_pendientes': pendientes,
+                'tareas_sin_realizar': sin_realizar,
+                'porcentaje_completado': round(100.0 * completadas / total, 2) if total else None
+            }
+        except Exception as e:
+            raise RuntimeError(f"Error al obtener estadísticas de '{usuario}': {e}")
+
+    def reporte_productividad(self, usuario: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Filas de ``reporte_productividad`` (todas o solo la de ``usuario``).
+
+        En PostgreSQL lee la vista materializada, así que los datos son los del
+        último ``refrescar_reporte_productividad`` (columna 'calculado_en');
+        en memoria se calcula al momento con la misma definición.
+        """
+        try:
+            if usuario is not None:
+                usuario = usuario.strip()
+            if self.usa_postgresql:
+                with self.conexion() as conn, conn.cursor() as cur:
+                    cur.execute(
+                        """SELECT username, tareas_completadas_mes, tareas_pendientes,
+                                  porcentaje_eficiencia, calculado_en
+                           FROM reporte_productividad
+                           WHERE %(usuario)s::varchar IS NULL OR username = %(usuario)s
+                           ORDER BY username""",
+                        {'usuario': usuario}
+                    )
+                    filas = cur.fetchall()
+            else:
+                ahora = datetime.now()
+                desde = datetime.combine(date.today(), datetime.min.time()) - timedelta(days=30)
+                usuarios = sorted(self._indice_usuario) if usuario is None else [usuario]
+                filas = []
+                for nombre in usuarios:
+                    tareas = [self.tareas[i] for i in self._indice_usuario.get(nombre, ())]
+                    if not tareas:
+                        continue
+                    recientes = [t for t in tareas if t.fecha_creacion >= desde]
+                    completadas = len(self._indice_estado.get((nombre, 'Completada'), ()))
+                    pendientes = sum(1 for t in recientes if t.estado == 'Pendiente')
+                    eficiencia = round(completadas * 100.0 / len(recientes), 2) if recientes else None
+                    filas.append((nombre, completadas, pendientes, eficiencia, ahora))
+            return [
+                {
+                    'username': fila[0],
+                    'tareas_completadas_mes': fila[1],
+                    'tareas_pendientes': fila[2],
+                    'porcentaje_eficiencia': fila[3],
+                    'calculado_en': fila[4]
+                } for fila in filas
+            ]
+        except Exception as e:
+            raise RuntimeError(f"Error al leer el reporte de productividad: {e}")
+
+    def refrescar_reporte_productividad(self, concurrente: bool = True):
+        """
+        Recalcula ``reporte_productividad``. Con ``concurrente`` usa
+        REFRESH ... CONCURRENTLY, que no bloquea a quienes lo están leyendo.
+        """
+        if not self.usa_postgresql:
+            return
+        try:
+            with self.conexion() as conn, conn.cursor() as cur:
+                cur.execute("REFRESH MATERIALIZED VIEW " + ("CONCURRENTLY " if concurrente else "")
+                            + "reporte_productividad")
+                conn.commit()
+            self.logger.info("Reporte de productividad refrescado")
+        except Exception as e:
+            raise RuntimeError(f"Error al refrescar el reporte de productividad: {e}")
+
+    # ------------------------------------------------------------------
+    # logs_actividad: particiones mensuales y consultas de auditoría.
+    # En modo memoria no hay registro de actividad.
+    # ------------------------------------------------------------------
+
+    def asegurar_particiones_logs(self, meses_futuros: int = 3) -> int:
+        """Crea las particiones del mes actual y los siguientes; devuelve cuántas creó."""
+        if not self.usa_postgresql:
+            return 0
+        try:
+            with self.conexion() as conn, conn.cursor() as cur:
+                cur.execute("SELECT asegurar_particiones_logs(%s)", (meses_futuros,))
+                creadas = cur.fetchone()[0]
+                conn.commit()
+            if creadas:
+                self.logger.info("Creadas %s particiones de logs_actividad", creadas)
+            return creadas
+        except Exception as e:
+            raise RuntimeError(f"Error al crear particiones de logs_actividad: {e}")
+
+    def purgar_logs_actividad(self, meses_retencion: int, solo_separar: bool = False) -> List[str]:
+        """
+        Aplica la retención de ``logs_actividad`` separando las particiones de
+        meses anteriores a los últimos ``meses_retencion`` y, salvo que
+        ``solo_separar`` sea True (para archivarlas), borrándolas. Devuelve los
+        nombres de las particiones afectadas.
+        """
+        if meses_retencion < 1:
+            raise ValueError(f"Retención inválida: {meses_retencion}")
+        if not self.usa_postgresql:
+            return []
+        try:
+            with self.conexion() as conn, conn.cursor() as cur:
+                cur.execute("SELECT purgar_particiones_logs(%s, %s)", (meses_retencion, solo_separar))
+                particiones = [fila[0] for fila in cur.fetchall()]
+                conn.commit()
+            if particiones:
+                self.logger.info("Particiones de logs_actividad %s: %s",
+                                 "separadas" if solo_separar else "borradas", ", ".join(particiones))
+            return particiones
+        except Exception as e:
+            raise RuntimeError(f"Error al purgar logs_actividad: {e}")
+
+    def particiones_logs(self) -> List[Dict[str, Any]]:
+        """Particiones de ``logs_actividad`` con su rango y filas estimadas."""
+        if not self.usa_postgresql:
+            return []
+        try:
+            with self.conexion() as conn, conn.cursor() as cur:
                 cur.execute(
-                    "INSERT INTO usuarios (username, password_hash) VALUES (%s, '') RETURNING id",
-                    (username,)
+                    """SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint
+                       FROM pg_inherits i
+                       JOIN pg_class c ON c.oid = i.inhrelid
+                       WHERE i.inhparent = 'logs_actividad'::regclass
+                       ORDER BY c.relname"""
                 )
-                nuevo_id = cur.fetchone()[0]
-                self.conn.commit()
-                return nuevo_id
+                return [
+                    {'nombre': fila[0], 'rango': fila[1], 'filas_estimadas': max(fila[2], 0)}
+                    for fila in cur.fetchall()
+                ]
         except Exception as e:
-            self.conn.rollback()
-            raise RuntimeError(f"No se pudo obtener o crear usuario '{username}': {e}")
+            raise RuntimeError(f"Error al listar particiones de logs_actividad: {e}")
+
+    def actividad_usuario(self, usuario: str, desde: Optional[datetime] = None,
+                          hasta: Optional[datetime] = None, limite: int = 100) -> List[Dict[str, Any]]:
+        """
+        Eventos de ``logs_actividad`` de un usuario con ``desde <= fecha_log < hasta``,
+        del más reciente al más antiguo. Sin ``desde`` se toman los últimos 30
+        días: el rango acotado permite a PostgreSQL leer solo las particiones
+        de esos meses.
+        """
+        try:
+            usuario = usuario.strip()
+            if desde is None:
+                desde = datetime.now() - timedelta(days=30)
+            if not self.usa_postgresql:
+                return []
+            condiciones = ["u.username = %s", "l.fecha_log >= %s"]
+            parametros: List[Any] = [usuario, desde]
+            if hasta is not None:
+                condiciones.append("l.fecha_log < %s")
+                parametros.append(hasta)
+            parametros.append(limite)
+            with self.conexion() as conn, conn.cursor() as cur:
+                cur.execute(
+                    """SELECT l.id, l.accion, l.descripcion, l.fecha_log
+                       FROM logs_actividad l
+                       JOIN usuarios u ON u.id = l.usuario_id
+                       WHERE """ + " AND ".join(condiciones) + """
+                       ORDER BY l.fecha_log DESC, l.id DESC
+                       LIMIT %s""",
+                    parametros
+                )
+                return [
+                    {'id': fila[0], 'accion': fila[1], 'descripcion': fila[2], 'fecha_log': fila[3]}
+                    for fila in cur.fetchall()
+                ]
+        except Exception as e:
+            raise RuntimeError(f"Error al consultar la actividad de '{usuario}': {e}")
 
     def tarea_pertenece_a_usuario(self, tarea_id: int, username: str) -> bool:
         try:
-            tarea = self.obtener_tarea(tarea_id)
-            if not tarea:
-                return False
-            if self.usa_postgresql and self.conn:
-                usuario_id = self._obtener_id_usuario(username)
-                return tarea.get('usuario_id') == usuario_id
-            else:
-                return tarea.get('usuario') == username
+            self.obtener_tarea_de_usuario(tarea_id, username)
+            return True
+        except (TareaNoEncontradaError, AccesoDenegadoError):
+            return False
         except Exception as e:
-            self.logger.error(f"Error al verificar pertenencia de tarea {tarea_id}: {e}")
+            self.logger.error("Error al verificar pertenencia de tarea %s: %s", tarea_id, e)
             return False
 
     def agregar_tarea(self, usuario: str, descripcion: str, categoria: str) -> int:
@@ -133,40 +1014,108 @@ class GestorTareas:
             if categoria not in self.CATEGORIAS_VALIDAS:
                 raise CategoriaInvalidaError(f"Categoría inválida: '{categoria}'")
 
-            if self.usa_postgresql and self.conn:
+            if self.usa_postgresql:
                 usuario_id = self._obtener_id_usuario(usuario)
-                with self.conn.cursor() as cur:
+                with self.conexion() as conn, conn.cursor() as cur:
                     cur.execute(
                         """INSERT INTO tareas (usuario_id, descripcion, categoria, estado)
                         VALUES (%s, %s, %s, 'Pendiente') RETURNING id""",
                         (usuario_id, descripcion, categoria)
                     )
                     tarea_id = cur.fetchone()[0]
-                    self.conn.commit()
-                    self.logger.info(f"Tarea agregada en PostgreSQL con ID {tarea_id}")
-                    return tarea_id
+                    conn.commit()
+                self._tras_mutacion(usuario_id)
+                self._registrar_actividad(usuario_id, 'AGREGAR_TAREA', f"Nueva tarea: {descripcion[:50]}")
+                self.logger.info("Tarea agregada en PostgreSQL con ID %s", tarea_id)
+                return tarea_id
             else:
                 tarea_id = self.contador_id
-                self.tareas[tarea_id] = {
-                    'id': tarea_id,
-                    'usuario': usuario,
-                    'descripcion': descripcion,
-                    'categoria': categoria,
-                    'fecha_creacion': datetime.now(),
-                    'estado': 'Pendiente'
-                }
+                self._version += 1
+                tarea = RegistroTarea(tarea_id, usuario, descripcion, categoria, datetime.now(),
+                                      version=self._version)
+                self.tareas[tarea_id] = tarea
+                self._indexar_tarea(tarea)
                 self.contador_id += 1
-                self.logger.info(f"Tarea agregada en memoria con ID {tarea_id}")
+                self.logger.info("Tarea agregada en memoria con ID %s", tarea_id)
                 return tarea_id
         except Exception as e:
-            if self.usa_postgresql and self.conn:
-                self.conn.rollback()
             raise RuntimeError(f"Error al agregar tarea: {e}")
     
+    def agregar_tareas_lote(self, usuario: str, items: Iterable[Any],
+                            tamano_lote: int = 1000) -> Dict[str, Any]:
+        """
+        Agrega muchas tareas de un usuario con una sola transacción.
+
+        Cada item puede ser un dict con 'descripcion' y 'categoria' o una tupla
+        (descripcion, categoria). Los items inválidos no detienen el lote: se
+        informan en 'errores' (índice -> mensaje) y su posición en 'ids' queda
+        en None. En PostgreSQL las filas se insertan con INSERT multi-fila en
+        páginas de ``tamano_lote``.
+        """
+        try:
+            usuario = usuario.strip()
+            if not usuario:
+                raise ValueError("Usuario vacío")
+            if tamano_lote < 1:
+                raise ValueError(f"Tamaño de lote inválido: {tamano_lote}")
+
+            ids: List[Optional[int]] = []
+            errores: Dict[int, str] = {}
+            validas: List[Tuple[int, str, str]] = []
+            for indice, item in enumerate(items):
+                ids.append(None)
+                try:
+                    if isinstance(item, dict):
+                        descripcion, categoria = item['descripcion'], item['categoria']
+                    else:
+                        descripcion, categoria = item
+                    descripcion, categoria = self._normalizar_edicion(descripcion, categoria)
+                    validas.append((indice, descripcion, categoria))
+                except Exception as e:
+                    errores[indice] = f"{type(e).__name__}: {e}"
+
+            if validas and self.usa_postgresql:
+                usuario_id = self._obtener_id_usuario(usuario)
+                with self.conexion() as conn, conn.cursor() as cur:
+                    nuevos = execute_values(
+                        cur,
+                        "INSERT INTO tareas (usuario_id, descripcion, categoria, estado) VALUES %s RETURNING id",
+                        [(usuario_id, descripcion, categoria) for _, descripcion, categoria in validas],
+                        template="(%s, %s, %s, 'Pendiente')",
+                        page_size=tamano_lote,
+                        fetch=True
+                    )
+                    conn.commit()
+                self._tras_mutacion(usuario_id, len(validas))
+                for _, descripcion, _ in validas:
+                    self._registrar_actividad(usuario_id, 'AGREGAR_TAREA', f"Nueva tarea: {descripcion[:50]}")
+                for (indice, _, _), (tarea_id,) in zip(validas, nuevos):
+                    ids[indice] = tarea_id
+            elif validas:
+                ahora = datetime.now()
+                # Como en PostgreSQL, todas las tareas del lote comparten versión
+                self._version += 1
+                nuevas = {}
+                for indice, descripcion, categoria in validas:
+                    tarea_id = self.contador_id + len(nuevas)
+                    nuevas[tarea_id] = RegistroTarea(tarea_id, usuario, descripcion, categoria, ahora,
+                                                     version=self._version)
+                    ids[indice] = tarea_id
+                self.tareas.update(nuevas)
+                for tarea in nuevas.values():
+                    self._indexar_tarea(tarea)
+                self.contador_id += len(nuevas)
+
+            self.logger.info("Lote de %s tareas agregado para '%s' (%s con error)",
+                             len(validas), usuario, len(errores))
+            return {'ids': ids, 'errores': errores}
+        except Exception as e:
+            raise RuntimeError(f"Error al agregar lote de tareas: {e}")
+
     def obtener_tarea(self, tarea_id: int) -> Dict[str, Any]:
         try:
-            if self.usa_postgresql and self.conn:
-                with self.conn.cursor() as cur:
+            if self.usa_postgresql:
+                with self.conexion() as conn, conn.cursor() as cur:
                     cur.execute(
                         """SELECT t.id, t.usuario_id, t.descripcion, t.categoria,
                                   t.fecha_creacion, t.estado
@@ -194,117 +1143,680 @@ class GestorTareas:
 
     def eliminar_tarea(self, tarea_id: int):
         try:
-            if self.usa_postgresql and self.conn:
-                with self.conn.cursor() as cur:
-                    cur.execute("DELETE FROM tareas WHERE id = %s", (tarea_id,))
-                    if cur.rowcount == 0:
+            if self.usa_postgresql:
+                with self.conexion() as conn, conn.cursor() as cur:
+                    cur.execute("DELETE FROM tareas WHERE id = %s RETURNING usuario_id", (tarea_id,))
+                    fila = cur.fetchone()
+                    if fila is None:
                         raise TareaNoEncontradaError(f"No existe tarea con ID {tarea_id}")
-                    self.conn.commit()
-                    self.logger.info(f"Tarea {tarea_id} eliminada de PostgreSQL")
+                    conn.commit()
+                self._tras_mutacion(fila[0])
+                self.logger.info("Tarea %s eliminada de PostgreSQL", tarea_id)
             else:
                 if tarea_id not in self.tareas:
                     raise TareaNoEncontradaError(f"No existe tarea con ID {tarea_id}")
-                del self.tareas[tarea_id]
-                self.logger.info(f"Tarea {tarea_id} eliminada de memoria")
+                self._desindexar_tarea(self.tareas.pop(tarea_id))
+                self.logger.info("Tarea %s eliminada de memoria", tarea_id)
         except Exception as e:
-            if self.usa_postgresql and self.conn:
-                self.conn.rollback()
             raise RuntimeError(f"Error al eliminar tarea {tarea_id}: {e}")
 
-    def obtener_tareas_usuario(self, usuario: str) -> List[Dict[str, Any]]:
+    def obtener_tareas_usuario(self, usuario: str, categoria: Optional[str] = None,
+                               estado: Optional[str] = None) -> List[Dict[str, Any]]:
+        try:
+            usuario = usuario.strip()
+            categoria, estado = self._normalizar_filtros(categoria, estado)
+            if self.usa_postgresql:
+                usuario_id = self._obtener_id_usuario(usuario)
+                condiciones, parametros = ["t.usuario_id = %s"], [usuario_id]
+                if categoria is not None:
+                    condiciones.append("t.categoria = %s")
+                    parametros.append(categoria)
+                if estado is not None:
+                    condiciones.append("t.estado = %s")
+                    parametros.append(estado)
+                tareas_data = self._filas_listado(
+                    usuario_id, 'completo',
+                    """SELECT t.id, t.usuario_id, t.descripcion, t.categoria,
+                              t.fecha_creacion, t.estado
+                       FROM tareas t
+                       WHERE """ + " AND ".join(condiciones) + """
+                       ORDER BY t.fecha_creacion DESC, t.id DESC""",
+                    parametros
+                )
+                if not tareas_data:
+                    raise UsuarioSinTareasError(f"El usuario '{usuario}' no tiene tareas")
+                return [
+                    {
+                        'id': row[0],
+                        'usuario_id': row[1],
+                        'descripcion': row[2],
+                        'categoria': row[3],
+                        'fecha_creacion': row[4],
+                        'estado': row[5],
+                        'usuario': usuario
+                    } for row in tareas_data
+                ]
+            else:
+                tareas_usuario = [self.tareas[i] for i in self._ids_tareas_usuario(usuario, categoria, estado)]
+                if not tareas_usuario:
+                    raise UsuarioSinTareasError(f"El usuario '{usuario}' no tiene tareas")
+                return tareas_usuario
+        except Exception as e:
+            raise RuntimeError(f"Error al obtener tareas del usuario '{usuario}': {e}")
+
+    @staticmethod
+    def _codificar_cursor(fecha_creacion: datetime, tarea_id: int) -> str:
+        texto = f"{fecha_creacion.isoformat()}|{tarea_id}"
+        return base64.urlsafe_b64encode(texto.encode()).decode()
+
+    @staticmethod
+    def _decodificar_cursor(cursor: str) -> Tuple[datetime, int]:
+        try:
+            fecha, tarea_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            return datetime.fromisoformat(fecha), int(tarea_id)
+        except Exception:
+            raise ValueError(f"Cursor de paginación inválido: '{cursor}'")
+
+    def obtener_tareas_usuario_paginado(self, usuario: str, limite: int = 50,
+                                        cursor: Optional[str] = None,
+                                        categoria: Optional[str] = None,
+                                        estado: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Página de tareas de un usuario, de la más reciente a la más antigua.
+
+        Usa paginación por clave (fecha_creacion, id): ``cursor`` es el valor
+        'siguiente_cursor' de la página anterior, así que cada página cuesta lo
+        mismo sin importar cuántas tareas tenga el usuario. Devuelve un dict con
+        'tareas' y 'siguiente_cursor' (None en la última página).
+        """
+        try:
+            usuario = usuario.strip()
+            if limite < 1:
+                raise ValueError(f"Límite inválido: {limite}")
+            categoria, estado = self._normalizar_filtros(categoria, estado)
+            posicion = self._decodificar_cursor(cursor) if cursor else None
+
+            if self.usa_postgresql:
+                usuario_id = self._obtener_id_usuario(usuario)
+                condiciones, parametros = ["t.usuario_id = %s"], [usuario_id]
+                if categoria is not None:
+                    condiciones.append("t.categoria = %s")
+                    parametros.append(categoria)
+                if estado is not None:
+                    condiciones.append("t.estado = %s")
+                    parametros.append(estado)
+                if posicion is not None:
+                    condiciones.append("(t.fecha_creacion, t.id) < (%s, %s)")
+                    parametros.extend(posicion)
+                parametros.append(limite + 1)
+                filas = self._filas_listado(
+                    usuario_id, 'pagina',
+                    """SELECT t.id, t.usuario_id, t.descripcion, t.categoria,
+                              t.fecha_creacion, t.estado
+                       FROM tareas t
+                       WHERE """ + " AND ".join(condiciones) + """
+                       ORDER BY t.fecha_creacion DESC, t.id DESC
+                       LIMIT %s""",
+                    parametros
+                )
+                tareas = [
+                    {
+                        'id': row[0],
+                        'usuario_id': row[1],
+                        'descripcion': row[2],
+                        'categoria': row[3],
+                        'fecha_creacion': row[4],
+                        'estado': row[5],
+                        'usuario': usuario
+                    } for row in filas
+                ]
+            else:
+                # En memoria los IDs crecen con la fecha de creación, así que el
+                # orden (fecha, id) descendente es el orden inverso del índice.
+                tareas = []
+                for tarea_id in reversed(self._ids_tareas_usuario(usuario, categoria, estado)):
+                    tarea = self.tareas[tarea_id]
+                    if posicion is not None and (tarea.fecha_creacion, tarea_id) >= posicion:
+                        continue
+                    tareas.append(tarea)
+                    if len(tareas) > limite:
+                        break
+
+            siguiente = None
+            if len(tareas) > limite:
+                tareas = tareas[:limite]
+                ultima = tareas[-1]
+                siguiente = self._codificar_cursor(ultima['fecha_creacion'], ultima['id'])
+            return {'tareas': tareas, 'siguiente_cursor': siguiente}
+        except Exception as e:
+            raise RuntimeError(f"Error al obtener tareas del usuario '{usuario}': {e}")
+
+    def cambios_desde(self, usuario: str, marca: int = 0) -> Dict[str, Any]:
+        """
+        Cambios en las tareas de un usuario desde ``marca`` (0: todas).
+
+        Devuelve un dict con:
+        - 'tareas': tareas creadas o modificadas desde la marca, con 'version'
+          y 'actualizado_en', en orden de versión.
+        - 'eliminadas': IDs de las tareas eliminadas desde la marca.
+        - 'marca': la marca a usar en la siguiente llamada.
+        - 'completo': True si 'tareas' son todas las del usuario y el cliente
+          debe descartar su copia (marca 0, desconocida, anterior a la última
+          purga de eliminadas o, en PostgreSQL, a la creación del usuario).
+
+        Un mismo cambio puede llegar en dos llamadas seguidas (si su
+        transacción seguía abierta al calcular la marca), pero nunca se pierde:
+        el cliente debe aplicar las tareas como altas o reemplazos y después
+        las eliminadas.
+        """
+        try:
+            usuario = usuario.strip()
+            if marca < 0:
+                raise ValueError(f"Marca inválida: {marca}")
+            if self.usa_postgresql:
+                usuario_id = self._obtener_id_usuario(usuario)
+                with self.conexion() as conn, conn.cursor() as cur:
+                    # Las transacciones con ID menor que la marca ya terminaron, así
+                    # que las consultas siguientes ven todo lo que hicieron
+                    cur.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+                    nueva_marca = cur.fetchone()[0]
+                    cur.execute(
+                        """SELECT GREATEST((SELECT COALESCE(MAX(version), 0) FROM tareas_eliminadas_purga),
+                                           (SELECT version FROM usuarios WHERE id = %(usuario)s)),
+                                  ARRAY(SELECT tarea_id FROM tareas_eliminadas
+                                        WHERE usuario_id = %(usuario)s AND version >= %(marca)s
+                                        ORDER BY tarea_id)""",
+                        {'usuario': usuario_id, 'marca': marca}
+                    )
+                    # Con una marca anterior a la última purga o a la creación del
+                    # usuario pueden faltar bajas: el cliente debe descargarlo todo
+                    version_minima, eliminadas = cur.fetchone()
+                    completo = marca == 0 or marca <= version_minima or marca > nueva_marca
+                    cur.execute(
+                        """SELECT t.id, t.descripcion, t.categoria, t.fecha_creacion, t.estado,
+                                  t.actualizado_en, t.version
+                           FROM tareas t
+                           WHERE t.usuario_id = %s AND t.version >= %s
+                           ORDER BY t.version, t.id""",
+                        (usuario_id, 0 if completo else marca)
+                    )
+                    filas = cur.fetchall()
+                tareas = [
+                    {
+                        'id': row[0],
+                        'usuario_id': usuario_id,
+                        'descripcion': row[1],
+                        'categoria': row[2],
+                        'fecha_creacion': row[3],
+                        'estado': row[4],
+                        'actualizado_en': row[5],
+                        'version': row[6],
+                        'usuario': usuario
+                    } for row in filas
+                ]
+            else:
+                nueva_marca = self._version + 1
+                completo = marca == 0 or marca <= self._version_purgada or marca > nueva_marca
+                desde = 0 if completo else marca
+                tareas = []
+                for tarea_id in self._indice_usuario.get(usuario, ()):
+                    registro = self.tareas[tarea_id]
+                    if registro.version >= desde:
+                        tareas.append(registro.como_dict())
+                tareas.sort(key=lambda tarea: tarea['version'])
+                eliminadas = sorted(tarea_id for tarea_id, (dueno, version, _) in self._eliminadas.items()
+                                    if dueno == usuario and version >= marca)
+            return {
+                'tareas': tareas,
+                'eliminadas': [] if completo else eliminadas,
+                'marca': nueva_marca,
+                'completo': completo
+            }
+        except Exception as e:
+            raise RuntimeError(f"Error al obtener cambios del usuario '{usuario}': {e}")
+
+    def purgar_eliminadas(self, dias: int = 30) -> int:
+        """
+        Olvida las tareas eliminadas hace más de ``dias`` días. Los clientes
+        cuya marca sea anterior recibirán en cambios_desde la lista completa.
+        Devuelve cuántas se purgaron.
+        """
+        try:
+            if self.usa_postgresql:
+                with self.conexion() as conn, conn.cursor() as cur:
+                    cur.execute(
+                        """WITH purgadas AS (
+                               DELETE FROM tareas_eliminadas
+                               WHERE eliminada_en < CURRENT_TIMESTAMP - make_interval(days => %s)
+                               RETURNING version
+                           ), purga AS (
+                               INSERT INTO tareas_eliminadas_purga (id, version)
+                               SELECT true, MAX(version) FROM purgadas HAVING COUNT(*) > 0
+                               ON CONFLICT (id) DO UPDATE
+                                   SET version = GREATEST(tareas_eliminadas_purga.version, EXCLUDED.version)
+                           )
+                           SELECT COUNT(*) FROM purgadas""",
+                        (dias,)
+                    )
+                    purgadas = cur.fetchone()[0]
+                    conn.commit()
+            else:
+                limite = datetime.now() - timedelta(days=dias)
+                antiguas = [tarea_id for tarea_id, (_, _, eliminada_en) in self._eliminadas.items()
+                            if eliminada_en < limite]
+                for tarea_id in antiguas:
+                    self._version_purgada = max(self._version_purgada, self._eliminadas.pop(tarea_id)[1])
+                purgadas = len(antiguas)
+            self.logger.info("%s tareas eliminadas purgadas (más de %s días)", purgadas, dias)
+            return purgadas
+        except Exception as e:
+            raise RuntimeError(f"Error al purgar tareas eliminadas: {e}")
+
+    def buscar_tareas(self, usuario: str, estado: Optional[str] = None,
+                      categoria: Optional[str] = None,
+                      desde: Optional[date] = None, hasta: Optional[date] = None,
+                      orden: str = 'reciente', limite: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Tareas de un usuario filtradas por estado, categoría y rango de fechas.
+
+        El rango es ``desde <= fecha_creacion < hasta`` (acepta date o datetime).
+        ``orden`` es una de las claves de ORDENES. En PostgreSQL todo el filtro,
+        el orden y el límite se resuelven en la consulta; en memoria se parte
+        del índice más selectivo. Devuelve una lista vacía si no hay resultados.
+        """
         try:
             usuario = usuario.strip()
-            if self.usa_postgresql and self.conn:
+            categoria, estado = self._normalizar_filtros(categoria, estado)
+            if orden not in self.ORDENES:
+                raise ValueError(f"Orden inválido: '{orden}'. Opciones: {sorted(self.ORDENES)}")
+            if limite is not None and limite < 1:
+                raise ValueError(f"Límite inválido: {limite}")
+            if desde is not None and not isinstance(desde, datetime):
+                desde = datetime.combine(desde, datetime.min.time())
+            if hasta is not None and not isinstance(hasta, datetime):
+                hasta = datetime.combine(hasta, datetime.min.time())
+
+            if self.usa_postgresql:
+                usuario_id = self._obtener_id_usuario(usuario)
+                condiciones, parametros = ["t.usuario_id = %s"], [usuario_id]
+                for columna, operador, valor in (("t.estado", "=", estado),
+                                                 ("t.categoria", "=", categoria),
+                                                 ("t.fecha_creacion", ">=", desde),
+                                                 ("t.fecha_creacion", "<", hasta)):
+                    if valor is not None:
+                        condiciones.append(f"{columna} {operador} %s")
+                        parametros.append(valor)
+                consulta = (
+                    """SELECT t.id, t.usuario_id, t.descripcion, t.categoria,
+                              t.fecha_creacion, t.estado
+                       FROM tareas t
+                       WHERE """ + " AND ".join(condiciones) +
+                    " ORDER BY " + self.ORDENES[orden]
+                )
+                if limite is not None:
+                    consulta += " LIMIT %s"
+                    parametros.append(limite)
+                with self.conexion() as conn, conn.cursor() as cur:
+                    cur.execute(consulta, parametros)
+                    filas = cur.fetchall()
+                return [
+                    {
+                        'id': row[0],
+                        'usuario_id': row[1],
+                        'descripcion': row[2],
+                        'categoria': row[3],
+                        'fecha_creacion': row[4],
+                        'estado': row[5],
+                        'usuario': usuario
+                    } for row in filas
+                ]
+
+            ids = self._ids_tareas_usuario(usuario, categoria, estado)
+            # Los IDs en memoria crecen con la fecha: para ordenar por fecha basta
+            # recorrer el índice en un sentido u otro y cortar al llegar al límite.
+            if orden in ('reciente', 'antigua'):
+                ids = reversed(ids) if orden == 'reciente' else iter(ids)
+            resultado = []
+            for tarea_id in ids:
+                tarea = self.tareas[tarea_id]
+                if desde is not None or hasta is not None:
+                    fecha = tarea.fecha_creacion
+                    if (desde is not None and fecha < desde) or (hasta is not None and fecha >= hasta):
+                        continue
+                resultado.append(tarea)
+                if limite is not None and orden in ('reciente', 'antigua') and len(resultado) >= limite:
+                    break
+            if orden in ('categoria', 'estado'):
+                resultado.sort(key=lambda t: -t.id)
+                resultado.sort(key=lambda t: getattr(t, orden))
+                if limite is not None:
+                    resultado = resultado[:limite]
+            return resultado
+        except Exception as e:
+            raise RuntimeError(f"Error al buscar tareas del usuario '{usuario}': {e}")
+
+    def buscar_texto(self, usuario: str, consulta: str, limite: int = 20) -> List[Dict[str, Any]]:
+        """
+        Tareas de un usuario cuya descripción contiene todas las palabras de
+        ``consulta``, de la más a la menos relevante.
+
+        En PostgreSQL usa la columna generada ``descripcion_tsv`` (índice GIN)
+        con ``websearch_to_tsquery`` y ``ts_rank``; en memoria, un índice
+        invertido por usuario que se mantiene al agregar, editar y eliminar.
+        """
+        try:
+            usuario = usuario.strip()
+            consulta = consulta.strip()
+            if limite < 1:
+                raise ValueError(f"Límite inválido: {limite}")
+            if not consulta:
+                return []
+
+            if self.usa_postgresql:
                 usuario_id = self._obtener_id_usuario(usuario)
-                with self.conn.cursor() as cur:
+                with self.conexion() as conn, conn.cursor() as cur:
                     cur.execute(
                         """SELECT t.id, t.usuario_id, t.descripcion, t.categoria,
-                                  t.fecha_creacion, t.estado
+                                  t.fecha_creacion, t.estado,
+                                  ts_rank(t.descripcion_tsv, q) AS rango
+                           FROM tareas t, websearch_to_tsquery('spanish', %s) q
+                           WHERE t.usuario_id = %s AND t.descripcion_tsv @@ q
+                           ORDER BY rango DESC, t.id DESC
+                           LIMIT %s""",
+                        (consulta, usuario_id, limite)
+                    )
+                    filas = cur.fetchall()
+                return [
+                    {
+                        'id': row[0],
+                        'usuario_id': row[1],
+                        'descripcion': row[2],
+                        'categoria': row[3],
+                        'fecha_creacion': row[4],
+                        'estado': row[5],
+                        'rango': row[6],
+                        'usuario': usuario
+                    } for row in filas
+                ]
+
+            indice_texto = self._indice_texto.get(usuario)
+            if indice_texto is None:
+                return []
+            return [self.tareas[i] for i in indice_texto.buscar(consulta, limite)]
+        except Exception as e:
+            raise RuntimeError(f"Error al buscar texto en tareas de '{usuario}': {e}")
+
+    def iterar_tareas(self, usuario: Optional[str] = None, filtros: Optional[Dict[str, str]] = None,
+                      itersize: int = 2000) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre tareas (de un usuario o de todos) en orden de ID sin cargarlas todas.
+
+        En PostgreSQL usa un cursor con nombre (del lado del servidor) que trae
+        ``itersize`` filas por viaje, sobre una conexión propia. En memoria
+        recorre los índices de forma perezosa. ``filtros`` admite 'categoria'
+        y 'estado'.
+        """
+        filtros = dict(filtros or {})
+        desconocidos = set(filtros) - {'categoria', 'estado'}
+        if desconocidos:
+            raise ValueError(f"Filtros no soportados: {sorted(desconocidos)}")
+        if itersize < 1:
+            raise ValueError(f"itersize inválido: {itersize}")
+        categoria, estado = self._normalizar_filtros(filtros.get('categoria'), filtros.get('estado'))
+        usuario = usuario.strip() if usuario is not None else None
+
+        if self.usa_postgresql:
+            condiciones, parametros = [], []
+            if usuario is not None:
+                condiciones.append("u.username = %s")
+                parametros.append(usuario)
+            if categoria is not None:
+                condiciones.append("t.categoria = %s")
+                parametros.append(categoria)
+            if estado is not None:
+                condiciones.append("t.estado = %s")
+                parametros.append(estado)
+            donde = "WHERE " + " AND ".join(condiciones) if condiciones else ""
+            with self._conexion_dedicada() as conn:
+                with conn.cursor(name=f"iterar_tareas_{uuid.uuid4().hex}") as cur:
+                    cur.itersize = itersize
+                    cur.execute(
+                        """SELECT t.id, t.usuario_id, t.descripcion, t.categoria,
+                                  t.fecha_creacion, t.estado, u.username
                            FROM tareas t
-                           WHERE t.usuario_id = %s
-                           ORDER BY t.fecha_creacion DESC""",
-                        (usuario_id,)
+                           JOIN usuarios u ON u.id = t.usuario_id
+                           """ + donde + """
+                           ORDER BY t.id""",
+                        parametros
                     )
-                    tareas_data = cur.fetchall()
-                    if not tareas_data:
-                        raise UsuarioSinTareasError(f"El usuario '{usuario}' no tiene tareas")
-                    return [
-                        {
+                    for row in cur:
+                        yield {
                             'id': row[0],
                             'usuario_id': row[1],
                             'descripcion': row[2],
                             'categoria': row[3],
                             'fecha_creacion': row[4],
                             'estado': row[5],
-                            'usuario': usuario
-                        } for row in tareas_data
-                    ]
-            else:
-                tareas_usuario = [t for t in self.tareas.values() if t['usuario'] == usuario]
-                if not tareas_usuario:
-                    raise UsuarioSinTareasError(f"El usuario '{usuario}' no tiene tareas")
-                return tareas_usuario
-        except Exception as e:
-            raise RuntimeError(f"Error al obtener tareas del usuario '{usuario}': {e}")
+                            'usuario': row[6]
+                        }
+                conn.rollback()
+        elif usuario is not None:
+            # Se copian solo los IDs para tolerar cambios durante el recorrido
+            for tarea_id in tuple(self._ids_tareas_usuario(usuario, categoria, estado)):
+                tarea = self.tareas.get(tarea_id)
+                if tarea is not None:
+                    yield tarea
+        else:
+            for tarea_id in tuple(self.tareas):
+                tarea = self.tareas.get(tarea_id)
+                if tarea is None:
+                    continue
+                if categoria is not None and tarea.categoria != categoria:
+                    continue
+                if estado is not None and tarea.estado != estado:
+                    continue
+                yield tarea
 
     def cambiar_estado_tarea(self, tarea_id: int, nuevo_estado: str):
         try:
-            nuevo_estado = nuevo_estado.strip().capitalize()
-            if nuevo_estado not in self.ESTADOS_VALIDOS:
-                raise EstadoInvalidoError(f"Estado inválido: '{nuevo_estado}'")
+            nuevo_estado = self._normalizar_estado(nuevo_estado)
 
-            if self.usa_postgresql and self.conn:
-                with self.conn.cursor() as cur:
+            if self.usa_postgresql:
+                with self.conexion() as conn, conn.cursor() as cur:
                     cur.execute(
-                        "UPDATE tareas SET estado = %s WHERE id = %s",
+                        """UPDATE tareas t SET estado = %s
+                           FROM (SELECT id, estado FROM tareas WHERE id = %s FOR UPDATE) anterior
+                           WHERE t.id = anterior.id
+                           RETURNING t.usuario_id, anterior.estado""",
                         (nuevo_estado, tarea_id)
                     )
-                    if cur.rowcount == 0:
+                    fila = cur.fetchone()
+                    if fila is None:
                         raise TareaNoEncontradaError(f"No existe tarea con ID {tarea_id}")
-                    self.conn.commit()
-                    self.logger.info(f"Estado de tarea {tarea_id} cambiado a '{nuevo_estado}'")
+                    conn.commit()
+                self._tras_mutacion(fila[0])
+                self._registrar_cambio_estado(fila[0], tarea_id, fila[1], nuevo_estado)
+                self.logger.info("Estado de tarea %s cambiado a '%s'", tarea_id, nuevo_estado)
             else:
                 if tarea_id not in self.tareas:
                     raise TareaNoEncontradaError(f"No existe tarea con ID {tarea_id}")
-                self.tareas[tarea_id]['estado'] = nuevo_estado
-                self.logger.info(f"Estado de tarea {tarea_id} cambiado a '{nuevo_estado}' en memoria")
+                self._cambiar_estado_en_memoria(self.tareas[tarea_id], nuevo_estado)
+                self.logger.info("Estado de tarea %s cambiado a '%s' en memoria", tarea_id, nuevo_estado)
         except Exception as e:
-            if self.usa_postgresql and self.conn:
-                self.conn.rollback()
             raise RuntimeError(f"Error al cambiar estado de tarea {tarea_id}: {e}")
 
     def editar_tarea(self, tarea_id: int, nueva_descripcion: str, nueva_categoria: str):
         try:
-            nueva_descripcion = nueva_descripcion.strip()
-            nueva_categoria = nueva_categoria.strip().lower()
+            nueva_descripcion, nueva_categoria = self._normalizar_edicion(nueva_descripcion, nueva_categoria)
 
-            if not nueva_descripcion:
-                raise DescripcionVaciaError("Descripción vacía")
-            if nueva_categoria not in self.CATEGORIAS_VALIDAS:
-                raise CategoriaInvalidaError(f"Categoría inválida: '{nueva_categoria}'")
-
-            if self.usa_postgresql and self.conn:
-                with self.conn.cursor() as cur:
+            if self.usa_postgresql:
+                with self.conexion() as conn, conn.cursor() as cur:
                     cur.execute(
-                        "UPDATE tareas SET descripcion = %s, categoria = %s WHERE id = %s",
+                        "UPDATE tareas SET descripcion = %s, categoria = %s WHERE id = %s RETURNING usuario_id",
                         (nueva_descripcion, nueva_categoria, tarea_id)
                     )
-                    if cur.rowcount == 0:
+                    fila = cur.fetchone()
+                    if fila is None:
                         raise TareaNoEncontradaError(f"No existe tarea con ID {tarea_id}")
-                    self.conn.commit()
-                    self.logger.info(f"Tarea {tarea_id} actualizada en PostgreSQL")
+                    conn.commit()
+                self._tras_mutacion(fila[0])
+                self.logger.info("Tarea %s actualizada en PostgreSQL", tarea_id)
             else:
                 if tarea_id not in self.tareas:
                     raise TareaNoEncontradaError(f"No existe tarea con ID {tarea_id}")
-                self.tareas[tarea_id]['descripcion'] = nueva_descripcion
-                self.tareas[tarea_id]['categoria'] = nueva_categoria
-                self.logger.info(f"Tarea {tarea_id} actualizada en memoria")
+                self._editar_en_memoria(self.tareas[tarea_id], nueva_descripcion, nueva_categoria)
+                self.logger.info("Tarea %s actualizada en memoria", tarea_id)
         except Exception as e:
-            if self.usa_postgresql and self.conn:
-                self.conn.rollback()
             raise RuntimeError(f"Error al editar tarea {tarea_id}: {e}")
 
-    def __del__(self):
+    # ------------------------------------------------------------------
+    # Operaciones con verificación de propiedad en la misma consulta.
+    # Lanzan TareaNoEncontradaError si la tarea no existe y
+    # AccesoDenegadoError si pertenece a otro usuario.
+    # ------------------------------------------------------------------
+
+    def _tarea_propia_en_memoria(self, tarea_id: int, usuario: str) -> RegistroTarea:
+        tarea = self.tareas.get(tarea_id)
+        if tarea is None:
+            raise TareaNoEncontradaError(f"No existe tarea con ID {tarea_id}")
+        if tarea.usuario != usuario:
+            raise AccesoDenegadoError(f"La tarea {tarea_id} no pertenece a '{usuario}'")
+        return tarea
+
+    def _mutar_tarea_propia(self, tarea_id: int, usuario: str, mutacion: str, parametros: tuple) -> Tuple[int, str]:
+        """
+        Ejecuta ``mutacion`` sobre la tarea solo si pertenece a ``usuario``, en un
+        único viaje a la base de datos. ``mutacion`` es un UPDATE/DELETE de
+        ``tareas`` cuyo filtro es ``id = (SELECT id FROM objetivo WHERE propia)``.
+        Devuelve (usuario_id, estado anterior a la mutación).
+        """
+        with self.conexion() as conn, conn.cursor() as cur:
+            cur.execute(
+                """WITH objetivo AS (
+                       SELECT t.id, t.usuario_id, t.estado, u.username = %s AS propia
+                       FROM tareas t
+                       JOIN usuarios u ON u.id = t.usuario_id
+                       WHERE t.id = %s
+                       FOR UPDATE OF t
+                   ), mutacion AS (""" + mutacion + """ RETURNING id)
+                   SELECT propia, usuario_id, estado FROM objetivo""",
+                (usuario, tarea_id) + parametros
+            )
+            resultado = cur.fetchone()
+            if resultado is None:
+                raise TareaNoEncontradaError(f"No existe tarea con ID {tarea_id}")
+            if not resultado[0]:
+                raise AccesoDenegadoError(f"La tarea {tarea_id} no pertenece a '{usuario}'")
+            conn.commit()
+        self._tras_mutacion(resultado[1])
+        return resultado[1], resultado[2]
+
+    def obtener_tarea_de_usuario(self, tarea_id: int, usuario: str) -> Dict[str, Any]:
+        try:
+            usuario = usuario.strip()
+            if self.usa_postgresql:
+                with self.conexion() as conn, conn.cursor() as cur:
+                    cur.execute(
+                        """SELECT t.id, t.usuario_id, t.descripcion, t.categoria,
+                                  t.fecha_creacion, t.estado, u.username,
+                                  t.actualizado_en, t.version
+                           FROM tareas t
+                           JOIN usuarios u ON u.id = t.usuario_id
+                           WHERE t.id = %s""",
+                        (tarea_id,)
+                    )
+                    tarea = cur.fetchone()
+                if not tarea:
+                    raise TareaNoEncontradaError(f"No existe tarea con ID {tarea_id}")
+                if tarea[6] != usuario:
+                    raise AccesoDenegadoError(f"La tarea {tarea_id} no pertenece a '{usuario}'")
+                return {
+                    'id': tarea[0],
+                    'usuario_id': tarea[1],
+                    'descripcion': tarea[2],
+                    'categoria': tarea[3],
+                    'fecha_creacion': tarea[4],
+                    'estado': tarea[5],
+                    'usuario': tarea[6],
+                    'actualizado_en': tarea[7],
+                    'version': tarea[8]
+                }
+            return self._tarea_propia_en_memoria(tarea_id, usuario)
+        except (TareaNoEncontradaError, AccesoDenegadoError):
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Error al obtener tarea {tarea_id}: {e}")
+
+    def eliminar_tarea_de_usuario(self, tarea_id: int, usuario: str):
+        try:
+            usuario = usuario.strip()
+            if self.usa_postgresql:
+                self._mutar_tarea_propia(
+                    tarea_id, usuario,
+                    "DELETE FROM tareas WHERE id = (SELECT id FROM objetivo WHERE propia)", ()
+                )
+            else:
+                self._tarea_propia_en_memoria(tarea_id, usuario)
+                self._desindexar_tarea(self.tareas.pop(tarea_id))
+            self.logger.info("Tarea %s eliminada por '%s'", tarea_id, usuario)
+        except (TareaNoEncontradaError, AccesoDenegadoError):
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Error al eliminar tarea {tarea_id}: {e}")
+
+    def cambiar_estado_tarea_de_usuario(self, tarea_id: int, usuario: str, nuevo_estado: str):
+        try:
+            usuario = usuario.strip()
+            nuevo_estado = self._normalizar_estado(nuevo_estado)
+            if self.usa_postgresql:
+                usuario_id, anterior = self._mutar_tarea_propia(
+                    tarea_id, usuario,
+                    "UPDATE tareas SET estado = %s WHERE id = (SELECT id FROM objetivo WHERE propia)",
+                    (nuevo_estado,)
+                )
+                self._registrar_cambio_estado(usuario_id, tarea_id, anterior, nuevo_estado)
+            else:
+                tarea = self._tarea_propia_en_memoria(tarea_id, usuario)
+                self._cambiar_estado_en_memoria(tarea, nuevo_estado)
+            self.logger.info("Estado de tarea %s cambiado a '%s' por '%s'", tarea_id, nuevo_estado, usuario)
+        except (TareaNoEncontradaError, AccesoDenegadoError):
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Error al cambiar estado de tarea {tarea_id}: {e}")
+
+    def editar_tarea_de_usuario(self, tarea_id: int, usuario: str, nueva_descripcion: str,
+                                nueva_categoria: str):
+        try:
+            usuario = usuario.strip()
+            nueva_descripcion, nueva_categoria = self._normalizar_edicion(nueva_descripcion, nueva_categoria)
+            if self.usa_postgresql:
+                self._mutar_tarea_propia(
+                    tarea_id, usuario,
+                    """UPDATE tareas SET descripcion = %s, categoria = %s
+                       WHERE id = (SELECT id FROM objetivo WHERE propia)""",
+                    (nueva_descripcion, nueva_categoria)
+                )
+            else:
+                tarea = self._tarea_propia_en_memoria(tarea_id, usuario)
+                self._editar_en_memoria(tarea, nueva_descripcion, nueva_categoria)
+            self.logger.info("Tarea %s actualizada por '%s'", tarea_id, usuario)
+        except (TareaNoEncontradaError, AccesoDenegadoError):
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Error al editar tarea {tarea_id}: {e}")
+
+    def cerrar(self):
+        if self.registro_actividad is not None:
+            self.registro_actividad.detener()
+        if self.pool is not None:
+            self.pool.cerrar()
+            self.pool = None
+            self.logger.info("Pool de conexiones PostgreSQL cerrado")
         if self.conn:
             self.conn.close()
+            self.conn = None
             self.logger.info("Conexión PostgreSQL cerrada")
+
+    def __del__(self):
+        if hasattr(self, 'logger'):
+            self.cerrar()
@@ -0,0 +1,519 @@
+"""
+Variante asyncio de GestorTareas.
+
+Ofrece las operaciones principales de ``GestorTareas`` como corrutinas, con
+las mismas validaciones, excepciones y formatos de respuesta, para usarlas
+desde un servidor asíncrono sin dedicar un hilo a cada petición. En
+PostgreSQL usa ``asyncpg`` con su pool de conexiones: miles de corrutinas
+pueden esperar su turno en el mismo bucle de eventos mientras el pool
+limita las conexiones abiertas.
+
+Sin ``db_config`` (o si PostgreSQL no está disponible) trabaja en memoria
+delegando en un ``GestorTareas`` interno, útil para pruebas.
+
+Tras cada cambio confirmado en PostgreSQL hace lo mismo que el gestor
+síncrono: invalida los listados del usuario en ``cache_listados`` (con
+Redis, la caché que comparten los procesos web) y avisa a los oyentes de
+``suscribir_mutaciones`` (p. ej. RefrescoReportes), desde un hilo del
+executor para no bloquear el bucle de eventos.
+
+Con PostgreSQL escribe ``logs_actividad`` igual que el gestor síncrono, con
+su propio ``RegistroActividad`` (opciones en ``actividad_config``). El hilo
+del registro inserta cada lote con asyncpg en el bucle de eventos del
+gestor. Registrar nunca bloquea el bucle: en modo 'lote', con la cola llena
+el evento se descarta, y en modo 'sincrona' la escritura se espera desde
+un hilo del executor.
+
+Ejemplo de uso:
+--------------
+>>> async with AsyncGestorTareas(db_config=DB_CONFIG, pool_config=POOL_CONFIG) as gestor:
+...     tarea_id = await gestor.agregar_tarea("ana", "Leer", "estudio")
+...     tareas = await gestor.obtener_tareas_usuario("ana")
+"""
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import asyncpg
+except ImportError:  # asyncpg es opcional: solo lo necesita el modo PostgreSQL
+    asyncpg = None
+
+from services.cache import CacheLRU
+from services.configuracion_logging import asegurar_logging
+from services.registro_actividad import Evento, RegistroActividad
+from services.gestor_tareas import (
+    GestorTareas, TareaNoEncontradaError, UsuarioSinTareasError, AccesoDenegadoError
+)
+
+_COLUMNAS_TAREA = "t.id, t.usuario_id, t.descripcion, t.categoria, t.fecha_creacion, t.estado"
+
+
+class AsyncGestorTareas:
+    CATEGORIAS_VALIDAS = GestorTareas.CATEGORIAS_VALIDAS
+    ESTADOS_VALIDOS = GestorTareas.ESTADOS_VALIDOS
+
+    # Validaciones compartidas con el gestor síncrono
+    _normalizar_estado = GestorTareas._normalizar_estado
+    _normalizar_edicion = GestorTareas._normalizar_edicion
+    _normalizar_filtros = GestorTareas._normalizar_filtros
+    _codificar_cursor = staticmethod(GestorTareas._codificar_cursor)
+    _decodificar_cursor = staticmethod(GestorTareas._decodificar_cursor)
+
+    # Aviso tras cada mutación (caché de listados y oyentes), compartido con el gestor síncrono
+    suscribir_mutaciones = GestorTareas.suscribir_mutaciones
+    cancelar_suscripcion_mutaciones = GestorTareas.cancelar_suscripcion_mutaciones
+    _tras_mutacion = GestorTareas._tras_mutacion
+
+    def __init__(self, db_config: Optional[Dict[str, Any]] = None,
+                 pool_config: Optional[Dict[str, Any]] = None,
+                 tamano_cache_usuarios: int = 1024,
+                 cache_listados: Optional[Any] = None,
+                 actividad_config: Optional[Dict[str, Any]] = None):
+        asegurar_logging()
+        self.logger = logging.getLogger(__name__)
+        self.db_config = db_config
+        self.pool_config = pool_config or {}
+        self.usa_postgresql = db_config is not None
+        self.pool = None
+        # Backend de services.cache_listados (solo se usa con PostgreSQL)
+        self.cache_listados = cache_listados
+        self._oyentes_mutacion: List[Callable[[int, int], None]] = []
+        self.actividad_config = actividad_config
+        self.registro_actividad: Optional[RegistroActividad] = None
+        self._bucle_eventos: Optional[asyncio.AbstractEventLoop] = None
+        self._cache_usuarios = CacheLRU(tamano_cache_usuarios)
+        self._memoria: Optional[GestorTareas] = None if self.usa_postgresql else GestorTareas()
+
+    async def iniciar(self):
+        """Crea el pool y la estructura de BD; si falla, pasa a modo memoria."""
+        if not self.usa_postgresql or self.pool is not None:
+            return self
+        try:
+            if asyncpg is None:
+                raise RuntimeError("asyncpg no está instalado")
+            parametros = {
+                'database': self.db_config.get('dbname'),
+                'user': self.db_config.get('user'),
+                'password': self.db_config.get('password'),
+                'host': self.db_config.get('host'),
+                'port': self.db_config.get('port')
+            }
+            self.pool = await asyncpg.create_pool(
+                min_size=self.pool_config.get('minimo', 1),
+                max_size=self.pool_config.get('maximo', 10),
+                timeout=self.pool_config.get('timeout', 30.0),
+                **{clave: valor for clave, valor in parametros.items() if valor is not None}
+            )
+            async with self.pool.acquire() as conn, conn.transaction():
+                al_dia = await conn.fetchval("SELECT to_regclass('esquema_gestor') IS NOT NULL") and \
+                    await conn.fetchval("SELECT true FROM esquema_gestor WHERE huella = $1",
+                                        GestorTareas.HUELLA_ESTRUCTURA)
+                if not al_dia:
+                    for script in GestorTareas.SCRIPTS_ESTRUCTURA:
+                        await conn.execute(script)
+                    await conn.execute("INSERT INTO esquema_gestor (huella) VALUES ($1) ON CONFLICT DO NOTHING",
+                                       GestorTareas.HUELLA_ESTRUCTURA)
+            self._bucle_eventos = asyncio.get_running_loop()
+            RegistroActividad(self, **{**(self.actividad_config or {}), 'espera_maxima': 0},
+                              escritor=self._escribir_actividad).iniciar()
+            self.logger.info("Conexión asíncrona exitosa a PostgreSQL")
+        except Exception as e:
+            self.logger.error("Error al conectar a PostgreSQL: %s", e)
+            self.logger.warning("Se usará modo memoria")
+            await self.cerrar()
+            self.usa_postgresql = False
+            self._memoria = GestorTareas()
+        return self
+
+    async def cerrar(self):
+        if self.registro_actividad is not None:
+            # Vaciar la cola escribe en este bucle: se espera desde otro hilo
+            await asyncio.get_running_loop().run_in_executor(None, self.registro_actividad.detener)
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+            self.logger.info("Pool asíncrono de PostgreSQL cerrado")
+
+    async def __aenter__(self):
+        return await self.iniciar()
+
+    async def __aexit__(self, *excepcion):
+        await self.cerrar()
+
+    @staticmethod
+    def _tarea(fila, usuario: Optional[str] = None) -> Dict[str, Any]:
+        tarea = dict(fila)
+        if usuario is not None:
+            tarea['usuario'] = usuario
+        return tarea
+
+    def _escribir_actividad(self, lote: List[Evento]):
+        """Escritor del RegistroActividad: corre en su hilo y espera al bucle de eventos."""
+        asyncio.run_coroutine_threadsafe(self._insertar_actividad(lote), self._bucle_eventos).result()
+
+    async def _insertar_actividad(self, lote: List[Evento]):
+        # Mismo INSERT que RegistroActividad, con arrays en lugar de VALUES
+        usuarios, acciones, descripciones, fechas = zip(*lote)
+        async with self.pool.acquire() as conn:
+            await conn.execute(
+                """INSERT INTO logs_actividad (usuario_id, accion, descripcion, fecha_log)
+                   SELECT u.id, v.accion, v.descripcion, v.fecha_log
+                   FROM unnest($1::int[], $2::text[], $3::text[], $4::timestamp[])
+                        WITH ORDINALITY AS v(usuario_id, accion, descripcion, fecha_log, orden)
+                   LEFT JOIN usuarios u ON u.id = v.usuario_id
+                   ORDER BY v.orden""",
+                list(usuarios), list(acciones), list(descripciones), list(fechas)
+            )
+
+    async def _avisar_mutacion(self, usuario_id: Optional[int], filas: int = 1):
+        if usuario_id is not None and (self.cache_listados is not None or self._oyentes_mutacion):
+            await asyncio.get_running_loop().run_in_executor(None, self._tras_mutacion, usuario_id, filas)
+
+    async def _registrar_actividad(self, usuario_id: Optional[int], accion: str, descripcion: str):
+        registro = self.registro_actividad
+        if registro is None or usuario_id is None:
+            return
+        if registro.durabilidad == 'sincrona':
+            await asyncio.get_running_loop().run_in_executor(
+                None, registro.registrar, usuario_id, accion, descripcion
+            )
+        else:
+            registro.registrar(usuario_id, accion, descripcion)
+
+    async def _registrar_cambio_estado(self, usuario_id: int, tarea_id: int, anterior: str, nuevo: str):
+        if anterior != nuevo:
+            await self._registrar_actividad(usuario_id, 'CAMBIAR_ESTADO',
+                                            f"Tarea ID: {tarea_id} - Estado cambiado de {anterior} a {nuevo}")
+
+    async def _obtener_id_usuario(self, username: str) -> int:
+        usuario_id = self._cache_usuarios.obtener(username)
+        if usuario_id is not None:
+            return usuario_id
+        try:
+            async with self.pool.acquire() as conn:
+                usuario_id = await conn.fetchval("SELECT id FROM usuarios WHERE username = $1", username)
+                if usuario_id is None:
+                    usuario_id = await conn.fetchval(
+                        """INSERT INTO usuarios (username, password_hash) VALUES ($1, '')
+                           ON CONFLICT (username) DO UPDATE SET username = EXCLUDED.username
+                           RETURNING id""",
+                        username
+                    )
+        except Exception as e:
+            raise RuntimeError(f"No se pudo obtener o crear usuario '{username}': {e}")
+        self._cache_usuarios.guardar(username, usuario_id)
+        return usuario_id
+
+    async def agregar_tarea(self, usuario: str, descripcion: str, categoria: str) -> int:
+        if self._memoria is not None:
+            return self._memoria.agregar_tarea(usuario, descripcion, categoria)
+        try:
+            usuario = usuario.strip()
+            if not usuario:
+                raise ValueError("Usuario vacío")
+            descripcion, categoria = self._normalizar_edicion(descripcion, categoria)
+            usuario_id = await self._obtener_id_usuario(usuario)
+            async with self.pool.acquire() as conn:
+                tarea_id = await conn.fetchval(
+                    """INSERT INTO tareas (usuario_id, descripcion, categoria, estado)
+                       VALUES ($1, $2, $3, 'Pendiente') RETURNING id""",
+                    usuario_id, descripcion, categoria
+                )
+            await self._avisar_mutacion(usuario_id)
+            await self._registrar_actividad(usuario_id, 'AGREGAR_TAREA', f"Nueva tarea: {descripcion[:50]}")
+            self.logger.info("Tarea agregada en PostgreSQL con ID %s", tarea_id)
+            return tarea_id
+        except Exception as e:
+            raise RuntimeError(f"Error al agregar tarea: {e}")
+
+    async def agregar_tareas_lote(self, usuario: str, items: Iterable[Any],
+                                  tamano_lote: int = 1000) -> Dict[str, Any]:
+        """
+        Como ``GestorTareas.agregar_tareas_lote``; cada página de ``tamano_lote``
+        tareas se inserta con una sentencia, todas en la misma transacción.
+        """
+        if self._memoria is not None:
+            return self._memoria.agregar_tareas_lote(usuario, items, tamano_lote)
+        try:
+            usuario = usuario.strip()
+            if not usuario:
+                raise ValueError("Usuario vacío")
+            if tamano_lote < 1:
+                raise ValueError(f"Tamaño de lote inválido: {tamano_lote}")
+            ids: List[Optional[int]] = []
+            errores: Dict[int, str] = {}
+            validas: List[Tuple[int, str, str]] = []
+            for indice, item in enumerate(items):
+                ids.append(None)
+                try:
+                    if isinstance(item, dict):
+                        descripcion, categoria = item['descripcion'], item['categoria']
+                    else:
+                        descripcion, categoria = item
+                    validas.append((indice,) + self._normalizar_edicion(descripcion, categoria))
+                except Exception as e:
+                    errores[indice] = f"{type(e).__name__}: {e}"
+
+            if validas:
+                usuario_id = await self._obtener_id_usuario(usuario)
+                filas = []
+                async with self.pool.acquire() as conn, conn.transaction():
+                    for inicio in range(0, len(validas), tamano_lote):
+                        pagina = validas[inicio:inicio + tamano_lote]
+                        filas.extend(await conn.fetch(
+                            """INSERT INTO tareas (usuario_id, descripcion, categoria, estado)
+                               SELECT $1, d, c, 'Pendiente' FROM unnest($2::text[], $3::text[]) AS v(d, c)
+                               RETURNING id""",
+                            usuario_id, [v[1] for v in pagina], [v[2] for v in pagina]
+                        ))
+                await self._avisar_mutacion(usuario_id, len(validas))
+                for _, descripcion, _ in validas:
+                    await self._registrar_actividad(usuario_id, 'AGREGAR_TAREA', f"Nueva tarea: {descripcion[:50]}")
+                for (indice, _, _), fila in zip(validas, filas):
+                    ids[indice] = fila['id']
+            self.logger.info("Lote de %s tareas agregado para '%s' (%s con error)",
+                             len(validas), usuario, len(errores))
+            return {'ids': ids, 'errores': errores}
+        except Exception as e:
+            raise RuntimeError(f"Error al agregar lote de tareas: {e}")
+
+    async def obtener_tarea(self, tarea_id: int) -> Dict[str, Any]:
+        if self._memoria is not None:
+            return self._memoria.obtener_tarea(tarea_id)
+        try:
+            async with self.pool.acquire() as conn:
+                fila = await conn.fetchrow(f"SELECT {_COLUMNAS_TAREA} FROM tareas t WHERE t.id = $1", tarea_id)
+            if fila is None:
+                raise TareaNoEncontradaError(f"No existe tarea con ID {tarea_id}")
+            return self._tarea(fila)
+        except Exception as e:
+            raise RuntimeError(f"Error al obtener tarea {tarea_id}: {e}")
+
+    async def eliminar_tarea(self, tarea_id: int):
+        if self._memoria is not None:
+            return self._memoria.eliminar_tarea(tarea_id)
+        try:
+            async with self.pool.acquire() as conn:
+                usuario_id = await conn.fetchval("DELETE FROM tareas WHERE id = $1 RETURNING usuario_id", tarea_id)
+            if usuario_id is None:
+                raise TareaNoEncontradaError(f"No existe tarea con ID {tarea_id}")
+            await self._avisar_mutacion(usuario_id)
+            self.logger.info("Tarea %s eliminada de PostgreSQL", tarea_id)
+        except Exception as e:
+            raise RuntimeError(f"Error al eliminar tarea {tarea_id}: {e}")
+
+    async def obtener_tareas_usuario(self, usuario: str, categoria: Optional[str] = None,
+                                     estado: Optional[str] = None) -> List[Dict[str, Any]]:
+        if self._memoria is not None:
+            return self._memoria.obtener_tareas_usuario(usuario, categoria, estado)
+        try:
+            usuario = usuario.strip()
+            categoria, estado = self._normalizar_filtros(categoria, estado)
+            usuario_id = await self._obtener_id_usuario(usuario)
+            condiciones, parametros = ["t.usuario_id = $1"], [usuario_id]
+            for columna, valor in (('categoria', categoria), ('estado', estado)):
+                if valor is not None:
+                    parametros.append(valor)
+                    condiciones.append(f"t.{columna} = ${len(parametros)}")
+            async with self.pool.acquire() as conn:
+                filas = await conn.fetch(
+                    f"""SELECT {_COLUMNAS_TAREA} FROM tareas t
+                        WHERE {' AND '.join(condiciones)}
+                        ORDER BY t.fecha_creacion DESC, t.id DESC""",
+                    *parametros
+                )
+            if not filas:
+                raise UsuarioSinTareasError(f"El usuario '{usuario}' no tiene tareas")
+            return [self._tarea(fila, usuario) for fila in filas]
+        except Exception as e:
+            raise RuntimeError(f"Error al obtener tareas del usuario '{usuario}': {e}")
+
+    async def obtener_tareas_usuario_paginado(self, usuario: str, limite: int = 50,
+                                              cursor: Optional[str] = None,
+                                              categoria: Optional[str] = None,
+                                              estado: Optional[str] = None) -> Dict[str, Any]:
+        if self._memoria is not None:
+            return self._memoria.obtener_tareas_usuario_paginado(usuario, limite=limite, cursor=cursor,
+                                                                 categoria=categoria, estado=estado)
+        try:
+            usuario = usuario.strip()
+            if limite < 1:
+                raise ValueError(f"Límite inválido: {limite}")
+            categoria, estado = self._normalizar_filtros(categoria, estado)
+            usuario_id = await self._obtener_id_usuario(usuario)
+            condiciones, parametros = ["t.usuario_id = $1"], [usuario_id]
+            for columna, valor in (('categoria', categoria), ('estado', estado)):
+                if valor is not None:
+                    parametros.append(valor)
+                    condiciones.append(f"t.{columna} = ${len(parametros)}")
+            if cursor:
+                parametros.extend(self._decodificar_cursor(cursor))
+                condiciones.append(f"(t.fecha_creacion, t.id) < (${len(parametros) - 1}, ${len(parametros)})")
+            parametros.append(limite + 1)
+            async with self.pool.acquire() as conn:
+                filas = await conn.fetch(
+                    f"""SELECT {_COLUMNAS_TAREA} FROM tareas t
+                        WHERE {' AND '.join(condiciones)}
+                        ORDER BY t.fecha_creacion DESC, t.id DESC
+                        LIMIT ${len(parametros)}""",
+                    *parametros
+                )
+            tareas = [self._tarea(fila, usuario) for fila in filas[:limite]]
+            siguiente = None
+            if len(filas) > limite:
+                siguiente = self._codificar_cursor(tareas[-1]['fecha_creacion'], tareas[-1]['id'])
+            return {'tareas': tareas, 'siguiente_cursor': siguiente}
+        except Exception as e:
+            raise RuntimeError(f"Error al paginar tareas del usuario '{usuario}': {e}")
+
+    async def cambiar_estado_tarea(self, tarea_id: int, nuevo_estado: str):
+        if self._memoria is not None:
+            return self._memoria.cambiar_estado_tarea(tarea_id, nuevo_estado)
+        try:
+            nuevo_estado = self._normalizar_estado(nuevo_estado)
+            async with self.pool.acquire() as conn:
+                fila = await conn.fetchrow(
+                    """UPDATE tareas t SET estado = $1
+                       FROM (SELECT id, estado FROM tareas WHERE id = $2 FOR UPDATE) anterior
+                       WHERE t.id = anterior.id
+                       RETURNING t.usuario_id, anterior.estado""",
+                    nuevo_estado, tarea_id
+                )
+            if fila is None:
+                raise TareaNoEncontradaError(f"No existe tarea con ID {tarea_id}")
+            await self._avisar_mutacion(fila['usuario_id'])
+            await self._registrar_cambio_estado(fila['usuario_id'], tarea_id, fila['estado'], nuevo_estado)
+            self.logger.info("Estado de tarea %s cambiado a '%s'", tarea_id, nuevo_estado)
+        except Exception as e:
+            raise RuntimeError(f"Error al cambiar estado de tarea {tarea_id}: {e}")
+
+    async def editar_tarea(self, tarea_id: int, nueva_descripcion: str, nueva_categoria: str):
+        if self._memoria is not None:
+            return self._memoria.editar_tarea(tarea_id, nueva_descripcion, nueva_categoria)
+        try:
+            nueva_descripcion, nueva_categoria = self._normalizar_edicion(nueva_descripcion, nueva_categoria)
+            async with self.pool.acquire() as conn:
+                usuario_id = await conn.fetchval(
+                    "UPDATE tareas SET descripcion = $1, categoria = $2 WHERE id = $3 RETURNING usuario_id",
+                    nueva_descripcion, nueva_categoria, tarea_id
+                )
+            if usuario_id is None:
+                raise TareaNoEncontradaError(f"No existe tarea con ID {tarea_id}")
+            await self._avisar_mutacion(usuario_id)
+            self.logger.info("Tarea %s actualizada en PostgreSQL", tarea_id)
+        except Exception as e:
+            raise RuntimeError(f"Error al editar tarea {tarea_id}: {e}")
+
+    # ------------------------------------------------------------------
+    # Operaciones con verificación de propiedad (ver GestorTareas).
+    # ------------------------------------------------------------------
+
+    async def _mutar_tarea_propia(self, tarea_id: int, usuario: str, mutacion: str,
+                                  *parametros) -> Tuple[int, str]:
+        """
+        ``mutacion`` usa $1 (usuario) y $2 (ID) reservados; sus parámetros empiezan en $3.
+        Devuelve (usuario_id, estado anterior a la mutación).
+        """
+        async with self.pool.acquire() as conn:
+            propia = await conn.fetchrow(
+                """WITH objetivo AS (
+                       SELECT t.id, t.usuario_id, t.estado, u.username = $1 AS propia
+                       FROM tareas t
+                       JOIN usuarios u ON u.id = t.usuario_id
+                       WHERE t.id = $2
+                       FOR UPDATE OF t
+                   ), mutacion AS (""" + mutacion + """ RETURNING id)
+                   SELECT propia, usuario_id, estado FROM objetivo""",
+                usuario, tarea_id, *parametros
+            )
+        if propia is None:
+            raise TareaNoEncontradaError(f"No existe tarea con ID {tarea_id}")
+        if not propia['propia']:
+            raise AccesoDenegadoError(f"La tarea {tarea_id} no pertenece a '{usuario}'")
+        await self._avisar_mutacion(propia['usuario_id'])
+        return propia['usuario_id'], propia['estado']
+
+    async def obtener_tarea_de_usuario(self, tarea_id: int, usuario: str) -> Dict[str, Any]:
+        if self._memoria is not None:
+            return self._memoria.obtener_tarea_de_usuario(tarea_id, usuario)
+        try:
+            usuario = usuario.strip()
+            async with self.pool.acquire() as conn:
+                fila = await conn.fetchrow(
+                    f"""SELECT {_COLUMNAS_TAREA}, u.username AS usuario
+                        FROM tareas t
+                        JOIN usuarios u ON u.id = t.usuario_id
+                        WHERE t.id = $1""",
+                    tarea_id
+                )
+            if fila is None:
+                raise TareaNoEncontradaError(f"No existe tarea con ID {tarea_id}")
+            if fila['usuario'] != usuario:
+                raise AccesoDenegadoError(f"La tarea {tarea_id} no pertenece a '{usuario}'")
+            return self._tarea(fila)
+        except (TareaNoEncontradaError, AccesoDenegadoError):
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Error al obtener tarea {tarea_id}: {e}")
+
+    async def tarea_pertenece_a_usuario(self, tarea_id: int, username: str) -> bool:
+        try:
+            await self.obtener_tarea_de_usuario(tarea_id, username)
+            return True
+        except (TareaNoEncontradaError, AccesoDenegadoError):
+            return False
+        except Exception as e:
+            self.logger.error("Error al verificar pertenencia de tarea %s: %s", tarea_id, e)
+            return False
+
+    async def eliminar_tarea_de_usuario(self, tarea_id: int, usuario: str):
+        if self._memoria is not None:
+            return self._memoria.eliminar_tarea_de_usuario(tarea_id, usuario)
+        try:
+            usuario = usuario.strip()
+            await self._mutar_tarea_propia(
+                tarea_id, usuario, "DELETE FROM tareas WHERE id = (SELECT id FROM objetivo WHERE propia)"
+            )
+            self.logger.info("Tarea %s eliminada por '%s'", tarea_id, usuario)
+        except (TareaNoEncontradaError, AccesoDenegadoError):
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Error al eliminar tarea {tarea_id}: {e}")
+
+    async def cambiar_estado_tarea_de_usuario(self, tarea_id: int, usuario: str, nuevo_estado: str):
+        if self._memoria is not None:
+            return self._memoria.cambiar_estado_tarea_de_usuario(tarea_id, usuario, nuevo_estado)
+        try:
+            usuario = usuario.strip()
+            nuevo_estado = self._normalizar_estado(nuevo_estado)
+            usuario_id, anterior = await self._mutar_tarea_propia(
+                tarea_id, usuario,
+                "UPDATE tareas SET estado = $3 WHERE id = (SELECT id FROM objetivo WHERE propia)",
+                nuevo_estado
+            )
+            await self._registrar_cambio_estado(usuario_id, tarea_id, anterior, nuevo_estado)
+            self.logger.info("Estado de tarea %s cambiado a '%s' por '%s'", tarea_id, nuevo_estado, usuario)
+        except (TareaNoEncontradaError, AccesoDenegadoError):
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Error al cambiar estado de tarea {tarea_id}: {e}")
+
+    async def editar_tarea_de_usuario(self, tarea_id: int, usuario: str, nueva_descripcion: str,
+                                      nueva_categoria: str):
+        if self._memoria is not None:
+            return self._memoria.editar_tarea_de_usuario(tarea_id, usuario, nueva_descripcion, nueva_categoria)
+        try:
+            usuario = usuario.strip()
+            nueva_descripcion, nueva_categoria = self._normalizar_edicion(nueva_descripcion, nueva_categoria)
+            await self._mutar_tarea_propia(
+                tarea_id, usuario,
+                """UPDATE tareas SET descripcion = $3, categoria = $4
+                   WHERE id = (SELECT id FROM objetivo WHERE propia)""",
+                nueva_descripcion, nueva_categoria
+            )
+            self.logger.info("Tarea %s actualizada por '%s'", tarea_id, usuario)
+        except (TareaNoEncontradaError, AccesoDenegadoError):
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Error al editar tarea {tarea_id}: {e}")
@@ -0,0 +1,85 @@
+"""
+Índice invertido en memoria para la búsqueda de texto en descripciones.
+
+Es el equivalente en modo memoria de la columna ``tsvector`` con índice GIN
+de PostgreSQL: cada término normalizado apunta a los IDs de las tareas que
+lo contienen, con su frecuencia. Las consultas exigen todos los términos
+(como ``websearch_to_tsquery``) y ordenan por relevancia TF-IDF.
+
+Normalización:
+-------------
+- Minúsculas y sin tildes ("Reunión" -> "reunion")
+- Se separa por cualquier carácter no alfanumérico
+- Se descartan palabras vacías frecuentes del español
+
+Ejemplo de uso:
+--------------
+>>> indice = IndiceInvertido()
+>>> indice.agregar(1, "Preparar la reunión de equipo")
+>>> indice.buscar("reunion equipo")
+[1]
+"""
+import math
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+PALABRAS_VACIAS = frozenset({
+    'a', 'al', 'con', 'de', 'del', 'el', 'en', 'es', 'la', 'las', 'lo', 'los',
+    'o', 'para', 'por', 'que', 'se', 'su', 'un', 'una', 'y'
+})
+_SEPARADOR = re.compile(r'\W+')
+
+
+def tokenizar(texto: str) -> List[str]:
+    sin_tildes = unicodedata.normalize('NFKD', texto.lower())
+    sin_tildes = ''.join(c for c in sin_tildes if not unicodedata.combining(c))
+    return [t for t in _SEPARADOR.split(sin_tildes) if t and t not in PALABRAS_VACIAS]
+
+
+class IndiceInvertido:
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._documentos = 0
+
+    def __len__(self) -> int:
+        return self._documentos
+
+    def agregar(self, doc_id: int, texto: str):
+        self._documentos += 1
+        for termino in tokenizar(texto):
+            documentos = self._postings.setdefault(termino, {})
+            documentos[doc_id] = documentos.get(doc_id, 0) + 1
+
+    def eliminar(self, doc_id: int, texto: str):
+        """Quita un documento; ``texto`` debe ser el que se indexó."""
+        self._documentos -= 1
+        for termino in set(tokenizar(texto)):
+            documentos = self._postings.get(termino)
+            if documentos is not None:
+                documentos.pop(doc_id, None)
+                if not documentos:
+                    del self._postings[termino]
+
+    def buscar(self, consulta: str, limite: Optional[int] = None) -> List[int]:
+        terminos = list(dict.fromkeys(tokenizar(consulta)))
+        if not terminos:
+            return []
+        listas = []
+        for termino in terminos:
+            documentos = self._postings.get(termino)
+            if not documentos:
+                return []
+            listas.append(documentos)
+        listas.sort(key=len)
+        candidatos: Iterable[int] = listas[0]
+        for documentos in listas[1:]:
+            candidatos = [d for d in candidatos if d in documentos]
+
+        idf = [math.log(1 + self._documentos / len(documentos)) for documentos in listas]
+        puntajes = {
+            d: sum(documentos[d] * peso for documentos, peso in zip(listas, idf))
+            for d in candidatos
+        }
+        ordenados = sorted(puntajes, key=lambda d: (-puntajes[d], -d))
+        return ordenados[:limite] if limite is not None else ordenados
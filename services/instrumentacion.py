@@ -0,0 +1,270 @@
+"""
+Instrumentación opcional de GestorTareas.
+
+Envuelve los métodos públicos de una instancia (más ``_obtener_id_usuario``)
+y registra por método: número de llamadas, errores, histograma de latencia,
+consultas enviadas a PostgreSQL (idas y vueltas) y filas leídas. Las
+consultas se cuentan con un cursor propio que se instala en la conexión
+(también en la dedicada de los cursores de servidor) solo mientras dura la
+operación; las filas, tanto con ``fetch*`` como recorriendo el cursor.
+
+En los métodos generadores (``iterar_tareas``) una llamada es el recorrido
+completo: cuenta al agotarse o cerrarse, y su latencia es el tiempo pasado
+dentro del generador, sin el del código que consume las filas.
+
+Las envolturas se ponen en la instancia, no en la clase: un gestor sin
+instrumentar ejecuta exactamente el mismo código que antes, sin coste.
+Las métricas son inclusivas: si un método llama a otro instrumentado, la
+latencia y las consultas del interno cuentan también para el externo.
+
+Ejemplo de uso:
+--------------
+>>> instrumentacion = Instrumentacion()
+>>> instrumentacion.instrumentar(gestor)
+>>> gestor.obtener_tareas_usuario("ana")
+>>> print(instrumentacion.exportar_prometheus())
+"""
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+import psycopg2.extensions
+
+# Límites superiores (segundos) de las cubetas del histograma de latencia
+CUBETAS_SEGUNDOS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+METODOS_PRIVADOS_INSTRUMENTADOS = ('_obtener_id_usuario',)
+METODOS_EXCLUIDOS = ('conexion',)
+CONEXIONES_INSTRUMENTADAS = ('conexion', '_conexion_dedicada')
+
+_contexto = threading.local()
+
+
+def _pila() -> List[List[int]]:
+    pila = getattr(_contexto, 'pila', None)
+    if pila is None:
+        pila = _contexto.pila = []
+    return pila
+
+
+def _contar(consultas: int, filas: int):
+    for registro in getattr(_contexto, 'pila', ()):
+        registro[0] += consultas
+        registro[1] += filas
+
+
+class CursorContador(psycopg2.extensions.cursor):
+    """Cursor que atribuye consultas y filas leídas a las llamadas en curso."""
+
+    def execute(self, query, vars=None):
+        _contar(1, 0)
+        return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        _contar(1, 0)
+        return super().executemany(query, vars_list)
+
+    def fetchone(self):
+        fila = super().fetchone()
+        if fila is not None:
+            _contar(0, 1)
+        return fila
+
+    def fetchmany(self, size=None):
+        filas = super().fetchmany(self.arraysize if size is None else size)
+        _contar(0, len(filas))
+        return filas
+
+    def fetchall(self):
+        filas = super().fetchall()
+        _contar(0, len(filas))
+        return filas
+
+    def __next__(self):
+        fila = super().__next__()
+        _contar(0, 1)
+        return fila
+
+
+class _MetricasMetodo:
+    __slots__ = ('llamadas', 'errores', 'suma', 'cubetas', 'consultas', 'filas')
+
+    def __init__(self):
+        self.llamadas = 0
+        self.errores = 0
+        self.suma = 0.0
+        self.cubetas = [0] * (len(CUBETAS_SEGUNDOS) + 1)
+        self.consultas = 0
+        self.filas = 0
+
+
+class Instrumentacion:
+    def __init__(self, prefijo: str = 'gestor_tareas'):
+        self.prefijo = prefijo
+        self._lock = threading.Lock()
+        self._metricas: Dict[str, _MetricasMetodo] = {}
+
+    def _metodos(self, gestor) -> List[str]:
+        nombres = []
+        for nombre, funcion in inspect.getmembers(type(gestor), inspect.isfunction):
+            if nombre in METODOS_EXCLUIDOS:
+                continue
+            if not nombre.startswith('_') or nombre in METODOS_PRIVADOS_INSTRUMENTADOS:
+                nombres.append(nombre)
+        return nombres
+
+    def instrumentar(self, gestor):
+        """Empieza a medir ``gestor``. Es idempotente."""
+        if getattr(gestor, '_instrumentacion', None) is self:
+            return gestor
+        for nombre in self._metodos(gestor):
+            metodo = getattr(gestor, nombre)
+            envolver = self._envolver_generador if inspect.isgeneratorfunction(metodo) else self._envolver
+            setattr(gestor, nombre, envolver(nombre, metodo))
+        for nombre in CONEXIONES_INSTRUMENTADAS:
+            if hasattr(gestor, nombre):
+                setattr(gestor, nombre, self._envolver_conexion(getattr(gestor, nombre)))
+        gestor._instrumentacion = self
+        return gestor
+
+    def desinstrumentar(self, gestor):
+        """Quita las envolturas; el gestor vuelve a sus métodos originales."""
+        if getattr(gestor, '_instrumentacion', None) is not self:
+            return
+        for nombre in self._metodos(gestor) + list(CONEXIONES_INSTRUMENTADAS) + ['_instrumentacion']:
+            gestor.__dict__.pop(nombre, None)
+
+    def _envolver(self, nombre: str, metodo):
+        @functools.wraps(metodo)
+        def envoltura(*args, **kwargs):
+            pila = _pila()
+            actual = [0, 0]
+            pila.append(actual)
+            error = False
+            inicio = time.perf_counter()
+            try:
+                return metodo(*args, **kwargs)
+            except BaseException:
+                error = True
+                raise
+            finally:
+                duracion = time.perf_counter() - inicio
+                pila.pop()
+                self._registrar(nombre, duracion, actual[0], actual[1], error)
+        return envoltura
+
+    def _envolver_generador(self, nombre: str, metodo):
+        @functools.wraps(metodo)
+        def envoltura(*args, **kwargs):
+            actual = [0, 0]
+            duracion = 0.0
+            error = False
+            generador = metodo(*args, **kwargs)
+
+            def paso(funcion):
+                # Solo se mide (y se atribuyen consultas) mientras corre el generador
+                nonlocal duracion, error
+                pila = _pila()
+                pila.append(actual)
+                inicio = time.perf_counter()
+                try:
+                    return funcion()
+                except StopIteration:
+                    raise
+                except BaseException:
+                    error = True
+                    raise
+                finally:
+                    duracion += time.perf_counter() - inicio
+                    pila.pop()
+
+            try:
+                while True:
+                    try:
+                        fila = paso(lambda: next(generador))
+                    except StopIteration:
+                        return
+                    yield fila
+            finally:
+                # Al cerrarse antes de agotarse, el generador libera su cursor aquí
+                try:
+                    paso(generador.close)
+                finally:
+                    self._registrar(nombre, duracion, actual[0], actual[1], error)
+        return envoltura
+
+    def _envolver_conexion(self, conexion):
+        @contextmanager
+        def envoltura():
+            with conexion() as conn:
+                previo = conn.cursor_factory
+                if previo is CursorContador:
+                    yield conn
+                    return
+                conn.cursor_factory = CursorContador
+                try:
+                    yield conn
+                finally:
+                    conn.cursor_factory = previo
+        return envoltura
+
+    def _registrar(self, nombre: str, duracion: float, consultas: int, filas: int, error: bool):
+        cubeta = next((i for i, tope in enumerate(CUBETAS_SEGUNDOS) if duracion <= tope), len(CUBETAS_SEGUNDOS))
+        with self._lock:
+            metricas = self._metricas.get(nombre)
+            if metricas is None:
+                metricas = self._metricas[nombre] = _MetricasMetodo()
+            metricas.llamadas += 1
+            metricas.errores += error
+            metricas.suma += duracion
+            metricas.cubetas[cubeta] += 1
+            metricas.consultas += consultas
+            metricas.filas += filas
+
+    def instantanea(self) -> Dict[str, Dict[str, Any]]:
+        """Copia de las métricas actuales por método."""
+        with self._lock:
+            return {
+                nombre: {
+                    'llamadas': m.llamadas,
+                    'errores': m.errores,
+                    'segundos_total': m.suma,
+                    'cubetas': list(m.cubetas),
+                    'consultas': m.consultas,
+                    'filas': m.filas
+                } for nombre, m in self._metricas.items()
+            }
+
+    def reiniciar(self):
+        with self._lock:
+            self._metricas.clear()
+
+    def exportar_prometheus(self) -> str:
+        """Métricas en el formato de texto de exposición de Prometheus."""
+        p = self.prefijo
+        datos = sorted(self.instantanea().items())
+        lineas = []
+
+        def contador(nombre: str, ayuda: str, campo: str):
+            lineas.append(f"# HELP {p}_{nombre} {ayuda}")
+            lineas.append(f"# TYPE {p}_{nombre} counter")
+            for metodo, m in datos:
+                lineas.append(f'{p}_{nombre}{{metodo="{metodo}"}} {m[campo]}')
+
+        contador('llamadas_total', "Llamadas a cada método de GestorTareas.", 'llamadas')
+        contador('errores_total', "Llamadas que terminaron con excepción.", 'errores')
+        contador('consultas_total', "Consultas enviadas a PostgreSQL (idas y vueltas).", 'consultas')
+        contador('filas_total', "Filas leídas de PostgreSQL.", 'filas')
+
+        lineas.append(f"# HELP {p}_duracion_segundos Latencia de cada método de GestorTareas.")
+        lineas.append(f"# TYPE {p}_duracion_segundos histogram")
+        for metodo, m in datos:
+            acumulado = 0
+            for tope, n in zip(CUBETAS_SEGUNDOS + ('+Inf',), m['cubetas']):
+                acumulado += n
+                lineas.append(f'{p}_duracion_segundos_bucket{{metodo="{metodo}",le="{tope}"}} {acumulado}')
+            lineas.append(f'{p}_duracion_segundos_sum{{metodo="{metodo}"}} {m["segundos_total"]}')
+            lineas.append(f'{p}_duracion_segundos_count{{metodo="{metodo}"}} {m["llamadas"]}')
+        return '\n'.join(lineas) + '\n'
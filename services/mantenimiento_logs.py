@@ -0,0 +1,75 @@
+"""
+Mantenimiento periódico de las particiones de ``logs_actividad``.
+
+Cada ``intervalo`` segundos (y al arrancar) crea las particiones mensuales
+de los próximos ``meses_futuros`` meses y aplica la retención: las
+particiones de meses anteriores a los últimos ``meses_retencion`` se
+separan y se borran enteras, sin DELETE fila a fila. Con
+``meses_retencion=None`` no se borra nada.
+
+Varios procesos pueden ejecutarlo a la vez: las funciones SQL toman un
+advisory lock.
+
+Ejemplo de uso:
+--------------
+>>> mantenimiento = MantenimientoLogs(gestor, meses_retencion=12).iniciar()
+>>> mantenimiento.detener()
+"""
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MantenimientoLogs:
+    def __init__(self, gestor, meses_futuros: int = 3, meses_retencion: Optional[int] = 12,
+                 solo_separar: bool = False, intervalo: float = 6 * 3600.0):
+        self.gestor = gestor
+        self.meses_futuros = meses_futuros
+        self.meses_retencion = meses_retencion
+        self.solo_separar = solo_separar
+        self.intervalo = intervalo
+        self.ejecuciones = 0
+        self.errores = 0
+        self._detenido = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self):
+        """Arranca el hilo de mantenimiento. Es idempotente."""
+        if self._hilo is not None and self._hilo.is_alive():
+            return self
+        self._detenido.clear()
+        self._hilo = threading.Thread(target=self._bucle, name='mantenimiento-logs', daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self, timeout: Optional[float] = 5.0):
+        if self._hilo is None:
+            return
+        self._detenido.set()
+        self._hilo.join(timeout)
+        self._hilo = None
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+
+    def ejecutar(self):
+        """Una pasada de mantenimiento en el hilo que llama."""
+        try:
+            self.gestor.asegurar_particiones_logs(self.meses_futuros)
+            if self.meses_retencion is not None:
+                self.gestor.purgar_logs_actividad(self.meses_retencion, self.solo_separar)
+            self.ejecuciones += 1
+        except Exception as e:
+            self.errores += 1
+            logger.error("Error en el mantenimiento de logs_actividad: %s", e)
+
+    def _bucle(self):
+        while True:
+            self.ejecutar()
+            if self._detenido.wait(self.intervalo):
+                return
@@ -0,0 +1,102 @@
+"""
+Refresco en segundo plano de los reportes materializados.
+
+``reporte_productividad`` es una vista materializada: leerla no toca la
+tabla tareas, pero sus datos solo cambian cuando alguien la refresca. Este
+módulo lanza un hilo que llama a ``GestorTareas.refrescar_reporte_productividad``
+(REFRESH MATERIALIZED VIEW CONCURRENTLY, sin bloquear a los lectores):
+
+- cada ``intervalo`` segundos, y/o
+- en cuanto el gestor haya confirmado ``cada_mutaciones`` filas cambiadas
+  desde el último refresco (se entera con ``suscribir_mutaciones``).
+
+Solo ve las mutaciones hechas por su propio gestor; con varios procesos
+servidor, el intervalo es lo que acota el retraso de los datos.
+
+Ejemplo de uso:
+--------------
+>>> refresco = RefrescoReportes(gestor, intervalo=300, cada_mutaciones=500)
+>>> refresco.iniciar()
+>>> gestor.reporte_productividad("ana")
+>>> refresco.detener()
+"""
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RefrescoReportes:
+    def __init__(self, gestor, intervalo: Optional[float] = 300.0, cada_mutaciones: Optional[int] = None):
+        if intervalo is None and not cada_mutaciones:
+            raise ValueError("Hace falta un intervalo, un número de mutaciones o ambos")
+        self.gestor = gestor
+        self.intervalo = intervalo
+        self.cada_mutaciones = cada_mutaciones
+        self.refrescos = 0
+        self.errores = 0
+        self._pendientes = 0
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._detenido = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self):
+        """Arranca el hilo de refresco. Es idempotente."""
+        if self._hilo is not None and self._hilo.is_alive():
+            return self
+        self._detenido.clear()
+        self.gestor.suscribir_mutaciones(self._al_mutar)
+        self._hilo = threading.Thread(target=self._bucle, name='refresco-reportes', daemon=True)
+        self._hilo.start()
+        logger.info("Refresco de reportes iniciado (intervalo=%s, cada_mutaciones=%s)",
+                    self.intervalo, self.cada_mutaciones)
+        return self
+
+    def detener(self, timeout: Optional[float] = 5.0):
+        """Para el hilo; un refresco en curso termina antes de salir."""
+        if self._hilo is None:
+            return
+        self.gestor.cancelar_suscripcion_mutaciones(self._al_mutar)
+        self._detenido.set()
+        self._despertar.set()
+        self._hilo.join(timeout)
+        self._hilo = None
+
+    def solicitar_refresco(self):
+        """Pide un refresco lo antes posible sin esperar a que termine."""
+        self._despertar.set()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+
+    def _al_mutar(self, usuario_id: int, filas: int):
+        if not self.cada_mutaciones:
+            return
+        with self._lock:
+            self._pendientes += filas
+            alcanzado = self._pendientes >= self.cada_mutaciones
+        if alcanzado:
+            self._despertar.set()
+
+    def _bucle(self):
+        while not self._detenido.is_set():
+            self._despertar.wait(self.intervalo)
+            self._despertar.clear()
+            if self._detenido.is_set():
+                break
+            self._refrescar()
+
+    def _refrescar(self):
+        with self._lock:
+            self._pendientes = 0
+        try:
+            self.gestor.refrescar_reporte_productividad()
+            self.refrescos += 1
+        except Exception as e:
+            self.errores += 1
+            logger.error("Error al refrescar los reportes: %s", e)
@@ -0,0 +1,224 @@
+"""
+Registro de actividad (tabla ``logs_actividad``) por lotes y en segundo plano.
+
+Antes cada cambio de estado insertaba su fila en ``logs_actividad`` desde un
+trigger FOR EACH ROW, dentro de la transacción del usuario. Ahora cada
+GestorTareas (y AsyncGestorTareas) con PostgreSQL arranca su propio registro
+y, una vez confirmado el cambio, le entrega el evento; el registro lo guarda
+en memoria y lo escribe junto con otros en un único INSERT multi-fila cuando
+se junta ``tamano_lote`` o pasan ``intervalo`` segundos. La fecha del evento
+se toma al registrarlo, no al escribirlo.
+
+Modos de durabilidad:
+--------------------
+- 'sincrona': el evento se escribe antes de que vuelva la operación del
+  gestor (un INSERT por evento, como el trigger pero fuera de su transacción).
+- 'lote' (por defecto): escritura en segundo plano; si la cola llega a
+  ``maximo_pendientes`` quien registra espera hasta ``espera_maxima``
+  segundos y, si sigue llena, descarta su evento (cuenta en
+  ``descartados``). Se vacía al detener o al salir del proceso; solo se
+  pierde lo pendiente si el proceso muere.
+- 'mejor_esfuerzo': como 'lote', pero con la cola llena se descartan los
+  eventos más antiguos en lugar de esperar.
+
+Si una escritura falla, el lote vuelve a la cola y el hilo reintenta con
+espera exponencial (``intervalo``, el doble, ... hasta ``reintento_maximo``
+segundos) en lugar de insistir sin pausa contra una base caída.
+
+Ejemplo de uso:
+--------------
+>>> gestor = GestorTareas(DB_CONFIG, actividad_config={'tamano_lote': 500, 'intervalo': 1.0})
+>>> gestor.cambiar_estado_tarea(7, "Completada")   # el evento queda en cola
+>>> gestor.cerrar()                                 # escribe lo pendiente
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+logger = logging.getLogger(__name__)
+
+DURABILIDADES = ('sincrona', 'lote', 'mejor_esfuerzo')
+
+# Segundos mínimos entre dos avisos en el log por eventos descartados
+AVISO_DESCARTES_CADA = 10.0
+
+Evento = Tuple[Optional[int], str, str, datetime]
+
+
+class RegistroActividad:
+    def __init__(self, gestor, tamano_lote: int = 500, intervalo: float = 1.0,
+                 durabilidad: str = 'lote', maximo_pendientes: int = 100_000,
+                 espera_maxima: float = 5.0, reintento_maximo: float = 60.0,
+                 escritor: Optional[Callable[[List[Evento]], None]] = None):
+        if durabilidad not in DURABILIDADES:
+            raise ValueError(f"Durabilidad inválida: '{durabilidad}'. Debe ser una de {DURABILIDADES}")
+        if tamano_lote < 1 or maximo_pendientes < tamano_lote:
+            raise ValueError("Hace falta 1 <= tamano_lote <= maximo_pendientes")
+        self.gestor = gestor
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo
+        self.durabilidad = durabilidad
+        self.maximo_pendientes = maximo_pendientes
+        self.espera_maxima = espera_maxima
+        self.reintento_maximo = reintento_maximo
+        # Escribe un lote; por defecto, con la conexión de gestor.conexion()
+        self.escritor = escritor or self._escribir_en_gestor
+        self.escritos = 0
+        self.lotes = 0
+        self.descartados = 0
+        self.errores = 0
+        self._fallos_seguidos = 0
+        self._ultimo_aviso = 0.0
+        self._pendientes: Deque[Evento] = deque()
+        self._condicion = threading.Condition()
+        # Solo un hilo escribe a la vez, para conservar el orden de los eventos
+        self._lock_escritura = threading.Lock()
+        self._detenido = False
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self):
+        """Conecta el registro al gestor y arranca el hilo de escritura."""
+        anterior = getattr(self.gestor, 'registro_actividad', None)
+        if anterior is not None and anterior is not self:
+            # Un solo registro por gestor, para no duplicar ni desordenar eventos
+            anterior.detener()
+        self.gestor.registro_actividad = self
+        self._detenido = False
+        if self.durabilidad != 'sincrona' and (self._hilo is None or not self._hilo.is_alive()):
+            self._hilo = threading.Thread(target=self._bucle, name='registro-actividad', daemon=True)
+            self._hilo.start()
+        atexit.register(self.detener)
+        return self
+
+    def detener(self, timeout: Optional[float] = 10.0):
+        """Desconecta el registro del gestor y escribe los eventos pendientes."""
+        if getattr(self.gestor, 'registro_actividad', None) is self:
+            self.gestor.registro_actividad = None
+        atexit.unregister(self.detener)
+        with self._condicion:
+            self._detenido = True
+            self._condicion.notify_all()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+        self.vaciar()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+
+    def registrar(self, usuario_id: Optional[int], accion: str, descripcion: str):
+        evento = (usuario_id, accion, descripcion, datetime.now())
+        if self.durabilidad == 'sincrona':
+            with self._lock_escritura:
+                self._escribir([evento])
+            return
+        limite = None
+        with self._condicion:
+            while len(self._pendientes) >= self.maximo_pendientes:
+                if self.durabilidad == 'mejor_esfuerzo' or self._detenido:
+                    self._pendientes.popleft()
+                    self.descartados += 1
+                    continue
+                if limite is None:
+                    limite = time.monotonic() + self.espera_maxima
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    self.descartados += 1
+                    avisar = time.monotonic() - self._ultimo_aviso >= AVISO_DESCARTES_CADA
+                    if avisar:
+                        self._ultimo_aviso = time.monotonic()
+                    break
+                self._condicion.wait(restante)
+            else:
+                self._pendientes.append(evento)
+                if len(self._pendientes) >= self.tamano_lote:
+                    self._condicion.notify_all()
+                return
+        if avisar:
+            logger.warning("Cola de actividad llena (%s eventos): se descartan eventos (%s en total)",
+                           self.maximo_pendientes, self.descartados)
+
+    def vaciar(self) -> int:
+        """
+        Escribe ahora, en el hilo que llama, todos los eventos pendientes.
+        Devuelve cuántos se escribieron; si falla un lote, él y los siguientes
+        vuelven a la cola.
+        """
+        escritos = 0
+        with self._lock_escritura:
+            while True:
+                with self._condicion:
+                    lote = [self._pendientes.popleft()
+                            for _ in range(min(self.tamano_lote, len(self._pendientes)))]
+                    self._condicion.notify_all()
+                if not lote:
+                    return escritos
+                try:
+                    self._escribir(lote)
+                except Exception as e:
+                    with self._condicion:
+                        self._pendientes.extendleft(reversed(lote))
+                        self.errores += 1
+                        self._fallos_seguidos += 1
+                    logger.error("Error al escribir %s eventos de actividad: %s", len(lote), e)
+                    return escritos
+                escritos += len(lote)
+                self._fallos_seguidos = 0
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._condicion:
+            return {
+                'durabilidad': self.durabilidad,
+                'pendientes': len(self._pendientes),
+                'escritos': self.escritos,
+                'lotes': self.lotes,
+                'descartados': self.descartados,
+                'errores': self.errores
+            }
+
+    def _bucle(self):
+        while True:
+            with self._condicion:
+                if self._fallos_seguidos:
+                    # Tras un fallo se espera el plazo completo aunque la cola se llene
+                    espera = min(self.intervalo * 2 ** (self._fallos_seguidos - 1), self.reintento_maximo)
+                    limite = time.monotonic() + espera
+                    while not self._detenido and time.monotonic() < limite:
+                        self._condicion.wait(limite - time.monotonic())
+                elif not self._detenido and len(self._pendientes) < self.tamano_lote:
+                    self._condicion.wait(self.intervalo)
+                detenido = self._detenido
+            self.vaciar()
+            if detenido:
+                return
+
+    def _escribir(self, lote: List[Evento]):
+        self.escritor(lote)
+        with self._condicion:
+            self.escritos += len(lote)
+            self.lotes += 1
+
+    def _escribir_en_gestor(self, lote: List[Evento]):
+        # El LEFT JOIN deja usuario_id en NULL si el usuario se borró mientras
+        # el evento esperaba, igual que ON DELETE SET NULL con las filas ya escritas.
+        with self.gestor.conexion() as conn, conn.cursor() as cur:
+            execute_values(
+                cur,
+                """INSERT INTO logs_actividad (usuario_id, accion, descripcion, fecha_log)
+                   SELECT u.id, v.accion, v.descripcion, v.fecha_log
+                   FROM (VALUES %s) AS v(orden, usuario_id, accion, descripcion, fecha_log)
+                   LEFT JOIN usuarios u ON u.id = v.usuario_id
+                   ORDER BY v.orden""",
+                [(orden,) + evento for orden, evento in enumerate(lote)],
+                page_size=len(lote)
+            )
+            conn.commit()
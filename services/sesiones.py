@@ -0,0 +1,103 @@
+"""
+Almacenes de sesiones del lado del servidor.
+
+La interfaz web guarda en la cookie solo un identificador aleatorio; los
+datos de la sesión (usuario, usuario_id, mensajes flash) viven aquí. Cada
+almacén es un clave-valor de cadenas con caducidad:
+
+- AlmacenSesionesMemoria: CacheLRU en proceso. Vale para un único proceso
+  servidor (con los hilos que sea).
+- AlmacenSesionesSQLite: archivo SQLite local en modo WAL, compartido por
+  todos los procesos servidor de la máquina.
+
+Ejemplo de uso:
+--------------
+>>> almacen = crear_almacen_sesiones('sqlite', ruta='sesiones.db', ttl=8 * 3600)
+>>> almacen.guardar("abc", '{"usuario": "ana"}')
+>>> almacen.obtener("abc")
+'{"usuario": "ana"}'
+"""
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from services.cache import CacheLRU
+
+BACKENDS_SESIONES = ('memoria', 'sqlite')
+
+
+class AlmacenSesionesMemoria:
+    def __init__(self, maximo: int = 10000, ttl: Optional[float] = 8 * 3600.0):
+        self._cache = CacheLRU(maximo, ttl)
+
+    def obtener(self, sid: str) -> Optional[str]:
+        return self._cache.obtener(sid)
+
+    def guardar(self, sid: str, datos: str):
+        self._cache.guardar(sid, datos)
+
+    def eliminar(self, sid: str):
+        self._cache.invalidar(sid)
+
+
+class AlmacenSesionesSQLite:
+    # Cada cuántas escrituras se borran las sesiones caducadas
+    PURGAR_CADA = 1000
+
+    def __init__(self, ruta: str = 'sesiones.db', ttl: Optional[float] = 8 * 3600.0):
+        self.ruta = ruta
+        self.ttl = ttl
+        self._local = threading.local()
+        self._escrituras = 0
+        conn = self._conexion()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS sesiones (
+                       sid TEXT PRIMARY KEY,
+                       datos TEXT NOT NULL,
+                       caduca REAL
+                   )"""
+            )
+
+    def _conexion(self) -> sqlite3.Connection:
+        # Una conexión por hilo: sqlite3 no permite compartirlas entre hilos
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.ruta, timeout=5.0)
+        return conn
+
+    def obtener(self, sid: str) -> Optional[str]:
+        fila = self._conexion().execute(
+            "SELECT datos FROM sesiones WHERE sid = ? AND (caduca IS NULL OR caduca > ?)",
+            (sid, time.time())
+        ).fetchone()
+        return fila[0] if fila else None
+
+    def guardar(self, sid: str, datos: str):
+        ahora = time.time()
+        conn = self._conexion()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sesiones (sid, datos, caduca) VALUES (?, ?, ?)",
+                (sid, datos, ahora + self.ttl if self.ttl else None)
+            )
+            self._escrituras += 1
+            if self._escrituras % self.PURGAR_CADA == 0:
+                conn.execute("DELETE FROM sesiones WHERE caduca <= ?", (ahora,))
+
+    def eliminar(self, sid: str):
+        conn = self._conexion()
+        with conn:
+            conn.execute("DELETE FROM sesiones WHERE sid = ?", (sid,))
+
+
+def crear_almacen_sesiones(backend: str = 'memoria', ttl: Optional[float] = 8 * 3600.0,
+                           maximo: int = 10000, ruta: str = 'sesiones.db'):
+    """Crea el almacén ``backend`` ('memoria' o 'sqlite')."""
+    if backend == 'memoria':
+        return AlmacenSesionesMemoria(maximo, ttl)
+    if backend == 'sqlite':
+        return AlmacenSesionesSQLite(ruta, ttl)
+    raise ValueError(f"Backend de sesiones inválido: '{backend}'. Debe ser uno de {BACKENDS_SESIONES}")
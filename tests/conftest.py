@@ -0,0 +1,100 @@
+"""
+Fixtures compartidas por los tests.
+
+Los tests con PostgreSQL (fixture ``gestor_pg``) se saltan salvo que
+``GESTOR_TEST_DSN`` apunte a una base de pruebas, por ejemplo::
+
+    GESTOR_TEST_DSN="dbname=gestor_prueba user=postgres host=localhost" pytest
+
+Cada test trabaja en el esquema ``gestor_pruebas`` de esa base, que se borra
+y se vuelve a crear antes del test; el resto de la base no se toca.
+"""
+import os
+import threading
+
+import psycopg2
+import psycopg2.extensions
+import pytest
+
+from services.gestor_tareas import GestorTareas
+
+ESQUEMA_PRUEBAS = 'gestor_pruebas'
+
+
+class GestorFalso:
+    """
+    Hace de GestorTareas para los servicios de fondo (RegistroActividad,
+    RefrescoReportes, MantenimientoLogs): apunta en ``llamadas`` lo que le
+    piden sin tocar PostgreSQL. Con ``fallar`` sus operaciones lanzan
+    RuntimeError.
+    """
+
+    def __init__(self, fallar=False):
+        self.registro_actividad = None
+        self.llamadas = []
+        self.fallar = fallar
+        self.oyentes = []
+        self.refrescado = threading.Event()
+
+    def _llamada(self, *llamada):
+        if self.fallar:
+            raise RuntimeError("base de datos caída")
+        self.llamadas.append(llamada)
+
+    def asegurar_particiones_logs(self, meses_futuros):
+        self._llamada('asegurar', meses_futuros)
+        return 1
+
+    def purgar_logs_actividad(self, meses_retencion, solo_separar):
+        self._llamada('purgar', meses_retencion, solo_separar)
+        return []
+
+    def refrescar_reporte_productividad(self):
+        self._llamada('refrescar')
+        self.refrescado.set()
+
+    def suscribir_mutaciones(self, oyente):
+        self.oyentes.append(oyente)
+
+    def cancelar_suscripcion_mutaciones(self, oyente):
+        self.oyentes.remove(oyente)
+
+    def mutar(self, filas):
+        for oyente in self.oyentes:
+            oyente(1, filas)
+
+
+@pytest.fixture
+def gestor_falso():
+    return GestorFalso()
+
+
+@pytest.fixture
+def db_config():
+    """Configuración de conexión a la base de pruebas, con el esquema de pruebas vacío."""
+    dsn = os.environ.get('GESTOR_TEST_DSN')
+    if not dsn:
+        pytest.skip("GESTOR_TEST_DSN no está definida")
+    try:
+        conn = psycopg2.connect(dsn)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"PostgreSQL no disponible: {e}")
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {ESQUEMA_PRUEBAS} CASCADE")
+            cur.execute(f"CREATE SCHEMA {ESQUEMA_PRUEBAS}")
+    finally:
+        conn.close()
+    config = psycopg2.extensions.parse_dsn(dsn)
+    config['options'] = f"{config.get('options', '')} -c search_path={ESQUEMA_PRUEBAS}".strip()
+    return config
+
+
+@pytest.fixture
+def gestor_pg(db_config):
+    # Actividad síncrona: cada evento está en logs_actividad al volver la operación
+    gestor = GestorTareas(db_config=db_config, actividad_config={'durabilidad': 'sincrona'})
+    assert gestor.usa_postgresql
+    yield gestor
+    gestor.cerrar()
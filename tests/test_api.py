@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from werkzeug.http import http_date, parse_date
+
+from services.gestor_tareas import GestorTareas
+from Vista.web.gestor_tareas_web import crear_app
+
+
+@pytest.fixture
+def gestor():
+    return GestorTareas()
+
+
+@pytest.fixture
+def cliente(gestor):
+    app = crear_app(iniciar=False)
+    app.extensions['gestor_tareas'] = gestor
+    cliente = app.test_client()
+    with cliente.session_transaction() as sesion:
+        sesion['usuario'] = 'ana'
+    return cliente
+
+
+def test_sin_sesion_responde_401(gestor):
+    app = crear_app(iniciar=False)
+    app.extensions['gestor_tareas'] = gestor
+    assert app.test_client().get('/api/v1/tareas').status_code == 401
+
+
+def test_crear_obtener_y_304(cliente):
+    r = cliente.post('/api/v1/tareas', json={'descripcion': 'Leer', 'categoria': 'Estudio'})
+    assert r.status_code == 201
+    assert r.json['categoria'] == 'estudio' and r.json['estado'] == 'Pendiente'
+    r = cliente.get(r.headers['Location'])
+    assert r.status_code == 200 and r.headers['ETag']
+    etag = r.headers['ETag']
+    assert cliente.get('/api/v1/tareas', headers={'If-None-Match': etag}).status_code == 200
+    r = cliente.get(f"/api/v1/tareas/{r.json['id']}", headers={'If-None-Match': etag})
+    assert r.status_code == 304 and r.data == b''
+
+
+def test_listado_cambia_etag_al_mutar(cliente):
+    ids = cliente.post('/api/v1/tareas/lote', json={'tareas': [
+        {'descripcion': 'Uno', 'categoria': 'trabajo'},
+        {'descripcion': '', 'categoria': 'trabajo'},
+        {'descripcion': 'Dos', 'categoria': 'personal'}
+    ]}).json
+    assert ids['ids'][1] is None and '1' in ids['errores']
+    r = cliente.get('/api/v1/tareas?limit=1')
+    assert [t['descripcion'] for t in r.json['tareas']] == ['Dos'] and r.json['siguiente_cursor']
+    etag = r.headers['ETag']
+    assert cliente.get('/api/v1/tareas?limit=1', headers={'If-None-Match': etag}).status_code == 304
+
+    r = cliente.patch(f"/api/v1/tareas/{ids['ids'][2]}/estado", json={'estado': 'completada'})
+    assert r.json['estado'] == 'Completada'
+    assert cliente.get('/api/v1/tareas?limit=1', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_editar_parcial_y_eliminar(cliente, gestor):
+    tarea_id = gestor.agregar_tarea('ana', 'Leer', 'estudio')
+    r = cliente.patch(f'/api/v1/tareas/{tarea_id}', json={'categoria': 'personal'})
+    assert (r.json['descripcion'], r.json['categoria']) == ('Leer', 'personal')
+    assert cliente.delete(f'/api/v1/tareas/{tarea_id}').status_code == 204
+    assert cliente.get(f'/api/v1/tareas/{tarea_id}').status_code == 404
+
+
+def test_errores(cliente, gestor):
+    ajena = gestor.agregar_tarea('beto', 'Correr', 'personal')
+    assert cliente.get(f'/api/v1/tareas/{ajena}').status_code == 403
+    assert cliente.post('/api/v1/tareas', data={'descripcion': 'x', 'categoria': 'trabajo'}).status_code == 400
+    r = cliente.post('/api/v1/tareas', json={'descripcion': 'x', 'categoria': 'ocio'})
+    assert r.status_code == 400 and 'ocio' in r.json['error']
+    assert cliente.get('/api/v1/tareas?cursor=basura').status_code == 400
+
+
+def test_cambios(cliente, gestor):
+    uno = gestor.agregar_tarea('ana', 'Uno', 'trabajo')
+    r = cliente.get('/api/v1/tareas/cambios')
+    assert r.json['completo'] and [t['id'] for t in r.json['tareas']] == [uno]
+    assert 'version' in r.json['tareas'][0]
+    marca = r.json['marca']
+    gestor.eliminar_tarea_de_usuario(uno, 'ana')
+    r = cliente.get(f'/api/v1/tareas/cambios?desde={marca}')
+    assert (r.json['tareas'], r.json['eliminadas'], r.json['completo']) == ([], [uno], False)
+    assert cliente.get('/api/v1/tareas/cambios?desde=-3').status_code == 400
+    assert cliente.get('/api/v1/tareas/cambios?desde=²').status_code == 400
+
+
+def test_sesion_de_usuario_borrado_o_renombrado_se_cierra(gestor):
+    app = crear_app(iniciar=False)
+    app.extensions['gestor_tareas'] = gestor
+    gestor.recordar_usuario('ana', 1)
+    cliente = app.test_client()
+    with cliente.session_transaction() as sesion:
+        sesion['usuario'], sesion['usuario_id'] = 'ana', 1
+    assert cliente.get('/api/v1/tareas').status_code == 200
+
+    # 'ana' ahora es otro usuario (se borró y se volvió a crear, o se renombró otro a 'ana')
+    gestor.invalidar_usuario_cache('ana')
+    gestor.recordar_usuario('ana', 2)
+    assert cliente.get('/api/v1/tareas').status_code == 401
+    assert gestor.verificar_usuario('ana', 2)
+    assert not gestor.verificar_usuario('ana', 1)
+
+
+def test_memoria_envia_version_y_last_modified(cliente):
+    r = cliente.post('/api/v1/tareas', json={'descripcion': 'Leer', 'categoria': 'estudio'})
+    assert r.json['version'] >= 1 and r.json['actualizado_en']
+    r = cliente.get(r.headers['Location'])
+    assert r.headers['Last-Modified'] and r.json['version'] >= 1
+    assert all('version' in tarea for tarea in cliente.get('/api/v1/tareas').json['tareas'])
+
+
+def test_if_modified_since_no_oculta_cambios_del_mismo_segundo(cliente, gestor):
+    tarea_id = gestor.agregar_tarea('ana', 'Leer', 'estudio')
+    r = cliente.get(f'/api/v1/tareas/{tarea_id}')
+    ultima = r.headers['Last-Modified']
+    # Editada dentro del mismo segundo: Last-Modified no cambia, pero la tarea sí
+    gestor.editar_tarea_de_usuario(tarea_id, 'ana', 'Leer dos', 'estudio')
+    r = cliente.get(f'/api/v1/tareas/{tarea_id}', headers={'If-Modified-Since': ultima})
+    assert r.status_code == 200 and r.json['descripcion'] == 'Leer dos'
+    despues = http_date(datetime.now(timezone.utc) + timedelta(seconds=2))
+    assert cliente.get(f'/api/v1/tareas/{tarea_id}', headers={'If-Modified-Since': despues}).status_code == 304
+
+
+def test_last_modified_con_otra_zona_horaria_en_postgresql(db_config):
+    # La zona de la sesión de PostgreSQL no coincide con la del servidor web
+    db_config['options'] += ' -c TimeZone=Pacific/Kiritimati'
+    gestor = GestorTareas(db_config=db_config)
+    try:
+        app = crear_app(iniciar=False)
+        app.extensions['gestor_tareas'] = gestor
+        cliente = app.test_client()
+        with cliente.session_transaction() as sesion:
+            sesion['usuario'] = 'ana'
+        tarea_id = gestor.agregar_tarea('ana', 'Leer', 'estudio')
+        r = cliente.get(f'/api/v1/tareas/{tarea_id}')
+        ultima = parse_date(r.headers['Last-Modified'])
+        assert abs(ultima - datetime.now(timezone.utc)) < timedelta(minutes=1)
+    finally:
+        gestor.cerrar()
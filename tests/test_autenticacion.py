@@ -0,0 +1,79 @@
+import pytest
+from werkzeug.security import generate_password_hash
+
+from services.autenticacion import (
+    Autenticacion, CredencialesInvalidasError, DemasiadosIntentosError
+)
+
+METODO = 'pbkdf2:sha256:1000'
+
+
+class AutenticacionEnMemoria(Autenticacion):
+    """Lee y guarda los hashes en un dict en lugar de la tabla usuarios."""
+
+    def __init__(self, usuarios, **kwargs):
+        super().__init__(None, metodo_hash=METODO, hilos=2, **kwargs)
+        self.usuarios = usuarios
+        self.lecturas = 0
+
+    def _leer_credenciales(self, usuario):
+        self.lecturas += 1
+        return self.usuarios.get(usuario)
+
+    def _actualizar_hash(self, usuario_id, hash_anterior, nuevo_hash):
+        for nombre, (id_, hash_) in self.usuarios.items():
+            if id_ == usuario_id and hash_ == hash_anterior:
+                self.usuarios[nombre] = (id_, nuevo_hash)
+
+
+@pytest.fixture
+def autenticacion():
+    usuarios = {"ana": (1, generate_password_hash("secreto", METODO)), "sin_clave": (2, '')}
+    autenticacion = AutenticacionEnMemoria(usuarios, intentos_maximos=3)
+    yield autenticacion
+    autenticacion.cerrar()
+
+
+def test_autenticar_devuelve_id(autenticacion):
+    assert autenticacion.autenticar(" ana ", "secreto") == 1
+
+
+@pytest.mark.parametrize("usuario, password", [("ana", "otra"), ("nadie", "secreto"), ("sin_clave", "")])
+def test_credenciales_invalidas(autenticacion, usuario, password):
+    with pytest.raises(CredencialesInvalidasError):
+        autenticacion.autenticar(usuario, password)
+
+
+def test_bloqueo_tras_intentos_fallidos(autenticacion):
+    for _ in range(3):
+        with pytest.raises(CredencialesInvalidasError):
+            autenticacion.autenticar("ana", "otra")
+    lecturas = autenticacion.lecturas
+    with pytest.raises(DemasiadosIntentosError):
+        autenticacion.autenticar("ana", "secreto")
+    assert autenticacion.lecturas == lecturas
+
+
+def test_bloqueo_por_origen(autenticacion):
+    for nombre in ("a", "b", "c"):
+        with pytest.raises(CredencialesInvalidasError):
+            autenticacion.autenticar(nombre, "x", origen="10.0.0.7")
+    with pytest.raises(DemasiadosIntentosError):
+        autenticacion.autenticar("ana", "secreto", origen="10.0.0.7")
+    assert autenticacion.autenticar("ana", "secreto", origen="10.0.0.8") == 1
+
+
+def test_exito_reinicia_fallos(autenticacion):
+    with pytest.raises(CredencialesInvalidasError):
+        autenticacion.autenticar("ana", "otra")
+    autenticacion.autenticar("ana", "secreto")
+    assert autenticacion.fallos("ana") == 0
+
+
+def test_rehash_con_otro_metodo():
+    usuarios = {"ana": (1, generate_password_hash("secreto", 'pbkdf2:sha256:500'))}
+    autenticacion = AutenticacionEnMemoria(usuarios)
+    assert autenticacion.autenticar("ana", "secreto") == 1
+    assert usuarios["ana"][1].startswith(METODO + '$')
+    assert autenticacion.autenticar("ana", "secreto") == 1
+    autenticacion.cerrar()
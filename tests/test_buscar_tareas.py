@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+import pytest
+from services.gestor_tareas import GestorTareas
+
+
+@pytest.fixture
+def gestor():
+    gestor = GestorTareas()
+    gestor.agregar_tareas_lote("Ana", [
+        ("Informe", "trabajo"), ("Leer", "estudio"), ("Correr", "personal"), ("Reunión", "trabajo")
+    ])
+    gestor.agregar_tarea("Beto", "Ajena", "trabajo")
+    gestor.cambiar_estado_tarea(1, "Completada")
+    return gestor
+
+
+def test_buscar_por_categoria(gestor):
+    assert [t.id for t in gestor.buscar_tareas("Ana", categoria="trabajo")] == [4, 1]
+
+
+def test_buscar_por_estado_y_categoria(gestor):
+    tareas = gestor.buscar_tareas("Ana", estado="completada", categoria="trabajo")
+    assert [t.id for t in tareas] == [1]
+
+
+def test_buscar_orden_y_limite(gestor):
+    assert [t.id for t in gestor.buscar_tareas("Ana", orden="antigua", limite=2)] == [1, 2]
+    assert [t.id for t in gestor.buscar_tareas("Ana", limite=1)] == [4]
+    assert [t.categoria for t in gestor.buscar_tareas("Ana", orden="categoria")] == [
+        "estudio", "personal", "trabajo", "trabajo"]
+
+
+def test_buscar_por_rango_de_fechas(gestor):
+    gestor.tareas[2].fecha_creacion = datetime(2025, 1, 15)
+    tareas = gestor.buscar_tareas("Ana", desde=datetime(2025, 1, 1).date(), hasta=datetime(2025, 2, 1))
+    assert [t.id for t in tareas] == [2]
+    manana = datetime.now() + timedelta(days=1)
+    assert gestor.buscar_tareas("Ana", desde=manana) == []
+
+
+def test_buscar_orden_invalido(gestor):
+    with pytest.raises(RuntimeError):
+        gestor.buscar_tareas("Ana", orden="id; DROP TABLE tareas")
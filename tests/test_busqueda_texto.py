@@ -0,0 +1,51 @@
+import pytest
+
+from services.gestor_tareas import GestorTareas
+from services.indice_invertido import IndiceInvertido, tokenizar
+
+
+@pytest.fixture
+def gestor():
+    return GestorTareas()
+
+
+def test_tokenizar_quita_tildes_y_palabras_vacias():
+    assert tokenizar("Preparar la Reunión del equipo") == ["preparar", "reunion", "equipo"]
+
+
+def test_indice_exige_todos_los_terminos():
+    indice = IndiceInvertido()
+    indice.agregar(1, "comprar leche")
+    indice.agregar(2, "comprar pan y leche")
+    indice.agregar(3, "comprar pan")
+    assert sorted(indice.buscar("pan leche")) == [2]
+    assert indice.buscar("queso") == []
+
+
+def test_indice_ordena_por_relevancia():
+    indice = IndiceInvertido()
+    indice.agregar(1, "informe")
+    indice.agregar(2, "informe informe trimestral")
+    assert indice.buscar("informe") == [2, 1]
+
+
+def test_buscar_texto_solo_en_tareas_del_usuario(gestor):
+    propia = gestor.agregar_tarea("Ana", "Revisar el informe", "trabajo")
+    gestor.agregar_tarea("Beto", "Revisar informe", "trabajo")
+    assert [t['id'] for t in gestor.buscar_texto("Ana", "informe")] == [propia]
+    assert gestor.buscar_texto("Carla", "informe") == []
+
+
+def test_buscar_texto_refleja_ediciones_y_eliminaciones(gestor):
+    tarea_id = gestor.agregar_tarea("Ana", "Llamar al médico", "personal")
+    gestor.editar_tarea(tarea_id, "Llamar al dentista", "personal")
+    assert gestor.buscar_texto("Ana", "medico") == []
+    assert [t['id'] for t in gestor.buscar_texto("Ana", "dentista")] == [tarea_id]
+    gestor.eliminar_tarea(tarea_id)
+    assert gestor.buscar_texto("Ana", "dentista") == []
+    assert "Ana" not in gestor._indice_texto
+
+
+def test_buscar_texto_consulta_vacia(gestor):
+    gestor.agregar_tarea("Ana", "Leer", "estudio")
+    assert gestor.buscar_texto("Ana", "   ") == []
@@ -0,0 +1,54 @@
+import pytest
+
+from services.cache import CacheLRU
+from services.gestor_tareas import GestorTareas
+
+
+def test_cache_lru_expulsa_menos_usado():
+    cache = CacheLRU(maximo=2)
+    cache.guardar("ana", 1)
+    cache.guardar("beto", 2)
+    cache.obtener("ana")
+    cache.guardar("carla", 3)
+    assert "beto" not in cache
+    assert cache.obtener("ana") == 1
+    assert cache.estadisticas()['expulsiones'] == 1
+
+
+def test_cache_lru_cuenta_aciertos_y_fallos():
+    cache = CacheLRU(maximo=4)
+    assert cache.obtener("nadie") is None
+    cache.guardar("ana", 7)
+    assert cache.obtener("ana") == 7
+    estadisticas = cache.estadisticas()
+    assert (estadisticas['aciertos'], estadisticas['fallos']) == (1, 1)
+    assert estadisticas['tasa_aciertos'] == 0.5
+
+
+def test_cache_lru_invalidar():
+    cache = CacheLRU()
+    cache.guardar("ana", 1)
+    cache.invalidar("ana")
+    assert cache.obtener("ana") is None
+
+
+def test_cache_lru_tamano_invalido():
+    with pytest.raises(ValueError):
+        CacheLRU(maximo=0)
+
+
+def test_renombrar_usuario_en_memoria():
+    gestor = GestorTareas()
+    tarea_id = gestor.agregar_tarea("Ana", "Leer", "estudio")
+    gestor.renombrar_usuario("Ana", "Ana María")
+    assert gestor.tareas[tarea_id]['usuario'] == "Ana María"
+    assert len(gestor.obtener_tareas_usuario("Ana María")) == 1
+    assert "Ana" not in gestor._indice_usuario
+
+
+def test_eliminar_usuario_en_memoria():
+    gestor = GestorTareas()
+    gestor.agregar_tarea("Ana", "Leer", "estudio")
+    conservada = gestor.agregar_tarea("Beto", "Correr", "personal")
+    gestor.eliminar_usuario("Ana")
+    assert list(gestor.tareas) == [conservada]
@@ -0,0 +1,89 @@
+import pickle
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services import cache
+from services.cache import CacheLRU
+from services.cache_listados import CacheListadosMemoria, CacheListadosRedis
+
+
+class ClienteRedisFalso:
+    """Subconjunto de la API de redis-py usado por CacheListadosRedis."""
+
+    def __init__(self):
+        self.datos = {}
+        self.expiraciones = {}
+
+    def get(self, clave):
+        return self.datos.get(clave)
+
+    def set(self, clave, valor, ex=None):
+        # Como redis-py: las cadenas se guardan codificadas y se leen como bytes
+        self.datos[clave] = valor.encode() if isinstance(valor, str) else valor
+        self.expiraciones[clave] = ex
+
+    def incr(self, clave):
+        self.datos[clave] = str(int(self.datos.get(clave, 0)) + 1).encode()
+        return int(self.datos[clave])
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    ahora = [1000.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: ahora[0])
+    return ahora
+
+
+def test_cache_lru_caduca_por_ttl(reloj):
+    lru = CacheLRU(maximo=4, ttl=10)
+    lru.guardar("ana", [1, 2])
+    reloj[0] += 5
+    assert lru.obtener("ana") == [1, 2]
+    reloj[0] += 6
+    assert lru.obtener("ana") is None
+    assert lru.estadisticas()['caducadas'] == 1
+
+
+def test_cache_lru_ttl_invalido():
+    with pytest.raises(ValueError):
+        CacheLRU(ttl=0)
+
+
+@pytest.mark.parametrize("crear", [
+    lambda: CacheListadosMemoria(maximo=8, ttl=30),
+    lambda: CacheListadosRedis(ClienteRedisFalso(), ttl=30),
+])
+def test_invalidar_usuario_cambia_generacion(crear):
+    backend = crear()
+    generacion = backend.generacion(7)
+    backend.guardar(f"7:{generacion}:pagina", [(1, "Leer")])
+    assert backend.obtener(f"7:{generacion}:pagina") == [(1, "Leer")]
+    backend.invalidar_usuario(7)
+    assert backend.generacion(7) == generacion + 1
+    assert backend.generacion(8) == 0
+    assert backend.obtener(f"7:{generacion + 1}:pagina") is None
+
+
+def test_redis_guarda_con_expiracion():
+    cliente = ClienteRedisFalso()
+    backend = CacheListadosRedis(cliente, ttl=15, prefijo="prueba")
+    backend.guardar("1:0:completo", [])
+    assert cliente.expiraciones["prueba:1:0:completo"] == 15
+    assert backend.obtener("1:0:completo") == []
+    assert backend.estadisticas()['aciertos'] == 1
+
+
+def test_redis_guarda_json_y_no_carga_pickle():
+    cliente = ClienteRedisFalso()
+    backend = CacheListadosRedis(cliente, prefijo="prueba")
+    filas = [(1, 7, "Leer", "estudio", datetime(2025, 5, 30, 9, 15, 0, 123456), "Pendiente"),
+             (2, 7, "Correr", "personal", datetime(2025, 5, 30, tzinfo=timezone(timedelta(hours=-3))), "Completada")]
+    backend.guardar("7:0:completo", filas)
+    assert b"2025-05-30T09:15:00.123456" in cliente.datos["prueba:7:0:completo"]
+    assert backend.obtener("7:0:completo") == filas
+
+    # Un valor con pickle (de otra versión o inyectado) no se carga: es un fallo
+    cliente.datos["prueba:7:0:pagina"] = pickle.dumps(filas)
+    assert backend.obtener("7:0:pagina") is None
+    assert backend.estadisticas()['fallos'] == 1
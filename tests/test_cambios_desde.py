@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.gestor_tareas import GestorTareas
+
+
+@pytest.fixture
+def gestor():
+    return GestorTareas()
+
+
+def test_marca_cero_devuelve_todo(gestor):
+    uno = gestor.agregar_tarea("Ana", "Uno", "trabajo")
+    dos = gestor.agregar_tarea("Ana", "Dos", "estudio")
+    gestor.agregar_tarea("Beto", "Ajena", "personal")
+    cambios = gestor.cambios_desde("Ana")
+    assert cambios['completo']
+    assert [t['id'] for t in cambios['tareas']] == [uno, dos]
+    assert cambios['eliminadas'] == []
+
+
+def test_solo_devuelve_lo_cambiado(gestor):
+    uno = gestor.agregar_tarea("Ana", "Uno", "trabajo")
+    dos = gestor.agregar_tarea("Ana", "Dos", "estudio")
+    marca = gestor.cambios_desde("Ana")['marca']
+    assert gestor.cambios_desde("Ana", marca)['tareas'] == []
+
+    gestor.cambiar_estado_tarea_de_usuario(dos, "Ana", "Completada")
+    tres = gestor.agregar_tarea("Ana", "Tres", "personal")
+    gestor.eliminar_tarea_de_usuario(uno, "Ana")
+    cambios = gestor.cambios_desde("Ana", marca)
+    assert not cambios['completo']
+    assert [(t['id'], t['estado']) for t in cambios['tareas']] == [(dos, 'Completada'), (tres, 'Pendiente')]
+    assert cambios['eliminadas'] == [uno]
+    assert cambios['tareas'][0]['version'] < cambios['tareas'][1]['version']
+
+
+def test_marca_anterior_a_la_purga_pide_copia_completa(gestor):
+    uno = gestor.agregar_tarea("Ana", "Uno", "trabajo")
+    dos = gestor.agregar_tarea("Ana", "Dos", "trabajo")
+    marca = gestor.cambios_desde("Ana")['marca']
+    gestor.eliminar_tarea_de_usuario(uno, "Ana")
+    usuario, version, _ = gestor._eliminadas[uno]
+    gestor._eliminadas[uno] = (usuario, version, datetime.now() - timedelta(days=40))
+
+    assert gestor.purgar_eliminadas(30) == 1
+    cambios = gestor.cambios_desde("Ana", marca)
+    assert cambios['completo']
+    assert [t['id'] for t in cambios['tareas']] == [dos]
+    assert not gestor.cambios_desde("Ana", cambios['marca'])['completo']
+
+
+def test_marca_invalida(gestor):
+    with pytest.raises(RuntimeError):
+        gestor.cambios_desde("Ana", -1)
+    # Una marca posterior a la actual (p. ej. de antes de reiniciar) pide copia completa
+    assert gestor.cambios_desde("Ana", 10 ** 9)['completo']
+
+
+def test_cambios_tras_la_marca_en_postgresql(gestor_pg):
+    uno = gestor_pg.agregar_tarea("Ana", "Uno", "trabajo")
+    dos = gestor_pg.agregar_tarea("Ana", "Dos", "estudio")
+    gestor_pg.agregar_tarea("Beto", "Ajena", "personal")
+    inicial = gestor_pg.cambios_desde("Ana")
+    assert inicial['completo'] and [t['id'] for t in inicial['tareas']] == [uno, dos]
+    marca = inicial['marca']
+    assert gestor_pg.cambios_desde("Ana", marca)['tareas'] == []
+
+    gestor_pg.cambiar_estado_tarea_de_usuario(dos, "Ana", "Completada")
+    tres = gestor_pg.agregar_tarea("Ana", "Tres", "personal")
+    gestor_pg.eliminar_tarea_de_usuario(uno, "Ana")
+    # Una tarea ajena que cambia no aparece
+    gestor_pg.agregar_tarea("Beto", "Otra", "personal")
+    cambios = gestor_pg.cambios_desde("Ana", marca)
+    assert not cambios['completo']
+    assert [(t['id'], t['estado']) for t in cambios['tareas']] == [(dos, 'Completada'), (tres, 'Pendiente')]
+    assert cambios['tareas'][0]['version'] < cambios['tareas'][1]['version']
+    assert cambios['eliminadas'] == [uno]
+    assert cambios['marca'] > marca
+
+    siguiente = gestor_pg.cambios_desde("Ana", cambios['marca'])
+    assert (siguiente['tareas'], siguiente['eliminadas'], siguiente['completo']) == ([], [], False)
+
+
+def test_tareas_borradas_con_su_usuario_en_postgresql(gestor_pg):
+    ids = gestor_pg.agregar_tareas_lote("Ana", [("Uno", "trabajo"), ("Dos", "estudio")])['ids']
+    beto = gestor_pg.agregar_tarea("Beto", "Ajena", "personal")
+    marca_ana = gestor_pg.cambios_desde("Ana")['marca']
+    marca_beto = gestor_pg.cambios_desde("Beto")['marca']
+
+    gestor_pg.eliminar_usuario("Ana")
+    with gestor_pg.conexion() as conn, conn.cursor() as cur:
+        # Las bajas de sus tareas no quedan en tareas_eliminadas: nadie puede pedirlas ya
+        cur.execute("SELECT COUNT(*) FROM tareas_eliminadas WHERE tarea_id = ANY(%s)", (ids,))
+        assert cur.fetchone()[0] == 0
+    assert gestor_pg.cambios_desde("Beto", marca_beto)['tareas'] == []
+    # Un cliente de la 'Ana' borrada no puede conservar su copia: la nueva 'Ana' empieza de cero
+    gestor_pg.agregar_tarea("Ana", "Nueva", "trabajo")
+    cambios = gestor_pg.cambios_desde("Ana", marca_ana)
+    assert cambios['completo'] and [t['descripcion'] for t in cambios['tareas']] == ["Nueva"]
+    assert [t['id'] for t in gestor_pg.cambios_desde("Beto")['tareas']] == [beto]
+
+
+def test_marca_anterior_a_la_purga_en_postgresql(gestor_pg):
+    uno = gestor_pg.agregar_tarea("Ana", "Uno", "trabajo")
+    dos = gestor_pg.agregar_tarea("Ana", "Dos", "trabajo")
+    marca = gestor_pg.cambios_desde("Ana")['marca']
+    gestor_pg.eliminar_tarea_de_usuario(uno, "Ana")
+    assert gestor_pg.purgar_eliminadas(30) == 0
+    assert gestor_pg.cambios_desde("Ana", marca)['eliminadas'] == [uno]
+
+    with gestor_pg.conexion() as conn, conn.cursor() as cur:
+        cur.execute("UPDATE tareas_eliminadas SET eliminada_en = eliminada_en - INTERVAL '40 days'")
+        conn.commit()
+    assert gestor_pg.purgar_eliminadas(30) == 1
+    cambios = gestor_pg.cambios_desde("Ana", marca)
+    assert cambios['completo'] and cambios['eliminadas'] == []
+    assert [t['id'] for t in cambios['tareas']] == [dos]
+    assert not gestor_pg.cambios_desde("Ana", cambios['marca'])['completo']
@@ -0,0 +1,141 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import pytest
+
+from services import configuracion_logging
+
+
+@pytest.fixture
+def archivo_log(tmp_path):
+    yield tmp_path / "app.log"
+    configuracion_logging.detener_logging()
+
+
+def test_escribe_en_segundo_plano(archivo_log):
+    configuracion_logging.configurar_logging(archivo=str(archivo_log), consola=False)
+    logging.getLogger("prueba").info("Tarea %s agregada", 7)
+    configuracion_logging.detener_logging()
+    assert "prueba - INFO - Tarea 7 agregada" in archivo_log.read_text(encoding="utf-8")
+
+
+def test_formato_json(archivo_log):
+    configuracion_logging.configurar_logging(archivo=str(archivo_log), consola=False, formato_json=True)
+    logging.getLogger("prueba").warning("Acción '%s'", "eliminar")
+    configuracion_logging.detener_logging()
+    registro = json.loads(archivo_log.read_text(encoding="utf-8").splitlines()[-1])
+    assert registro["nivel"] == "WARNING"
+    assert registro["mensaje"] == "Acción 'eliminar'"
+
+
+def test_nivel_por_logger(archivo_log):
+    configuracion_logging.configurar_logging(
+        archivo=str(archivo_log), consola=False, niveles={"ruidoso": "WARNING"}
+    )
+    logging.getLogger("ruidoso").info("no debe aparecer")
+    logging.getLogger("ruidoso").warning("sí aparece")
+    configuracion_logging.detener_logging()
+    contenido = archivo_log.read_text(encoding="utf-8")
+    assert "no debe aparecer" not in contenido
+    assert "sí aparece" in contenido
+    logging.getLogger("ruidoso").setLevel(logging.NOTSET)
+
+
+def test_reconfigurar_no_duplica_handlers(archivo_log):
+    configuracion_logging.configurar_logging(archivo=str(archivo_log), consola=False)
+    configuracion_logging.configurar_logging(archivo=str(archivo_log), consola=False)
+    configuracion_logging.asegurar_logging()
+    colas = [h for h in logging.getLogger().handlers if isinstance(h, logging.handlers.QueueHandler)]
+    assert len(colas) == 1
+
+
+def test_sin_rotacion_para_varios_procesos(archivo_log):
+    listener = configuracion_logging.configurar_logging(archivo=str(archivo_log), consola=False, rotar=False)
+    assert [type(destino) for destino in listener.handlers] == [logging.handlers.WatchedFileHandler]
+
+
+def test_hijo_no_rota_el_archivo_del_padre(archivo_log):
+    configuracion_logging.configurar_logging(archivo=str(archivo_log), consola=False, formato_json=True)
+    configuracion_logging._reiniciar_en_hijo()
+    destino, = configuracion_logging._listener.handlers
+    assert type(destino) is logging.handlers.WatchedFileHandler
+    assert isinstance(destino.formatter, configuracion_logging.FormatoJSON)
+    logging.getLogger("prueba").info("desde el hijo")
+    configuracion_logging.detener_logging()
+    assert "desde el hijo" in archivo_log.read_text(encoding="utf-8")
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="necesita os.fork")
+def test_fork_mientras_se_escribe_no_bloquea_al_hijo(archivo_log):
+    configuracion_logging.configurar_logging(archivo=str(archivo_log), consola=False)
+    # Solo se prueba el handler de la cola: los de pytest escriben sin él
+    raiz = logging.getLogger()
+    ajenos = [h for h in raiz.handlers if not isinstance(h, logging.handlers.QueueHandler)]
+    for handler in ajenos:
+        raiz.removeHandler(handler)
+    parar = threading.Event()
+
+    def ruido():
+        while not parar.is_set():
+            logging.getLogger("padre").info("ruido %s", "x" * 200)
+            time.sleep(0.0001)
+
+    hilo = threading.Thread(target=ruido)
+    hilo.start()
+    bloqueados = fallidos = 0
+    try:
+        for _ in range(10):
+            pid = os.fork()
+            if pid == 0:
+                codigo = 1
+                try:
+                    logging.getLogger("hijo").info("hijo %s", os.getpid())
+                    configuracion_logging.detener_logging()
+                    codigo = 0
+                finally:
+                    os._exit(codigo)
+            limite = time.monotonic() + 5
+            while True:
+                terminado, estado = os.waitpid(pid, os.WNOHANG)
+                if terminado:
+                    fallidos += estado != 0
+                    break
+                if time.monotonic() > limite:
+                    bloqueados += 1
+                    os.kill(pid, 9)
+                    os.waitpid(pid, 0)
+                    break
+                time.sleep(0.01)
+    finally:
+        parar.set()
+        hilo.join()
+        for handler in ajenos:
+            raiz.addHandler(handler)
+    configuracion_logging.detener_logging()
+    assert (bloqueados, fallidos) == (0, 0)
+    assert archivo_log.read_text(encoding="utf-8").count(" - hijo - ") == 10
+
+
+def test_asegurar_sin_archivo_ni_pisar_la_configuracion_de_la_app(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    raiz = logging.getLogger()
+    propios = raiz.handlers[:]
+    try:
+        # La aplicación configuró su logging: no se añade nada
+        raiz.handlers = [logging.NullHandler()]
+        configuracion_logging.asegurar_logging()
+        assert configuracion_logging._listener is None and len(raiz.handlers) == 1
+
+        # Nadie lo configuró: solo consola, sin crear archivos
+        raiz.handlers = []
+        configuracion_logging.asegurar_logging()
+        assert [type(destino) for destino in configuracion_logging._listener.handlers] == [logging.StreamHandler]
+        logging.getLogger("prueba").info("a consola")
+        configuracion_logging.detener_logging()
+        assert list(tmp_path.iterdir()) == []
+    finally:
+        configuracion_logging.detener_logging()
+        raiz.handlers = propios
@@ -0,0 +1,76 @@
+import pytest
+
+from services.gestor_tareas import GestorTareas
+
+
+@pytest.fixture
+def gestor():
+    return GestorTareas()
+
+
+def test_estadisticas_siguen_las_mutaciones(gestor):
+    ids = gestor.agregar_tareas_lote("Ana", [("Leer", "estudio"), ("Correr", "personal"), ("Informe", "trabajo")])['ids']
+    gestor.cambiar_estado_tarea(ids[0], "Completada")
+    gestor.cambiar_estado_tarea_de_usuario(ids[1], "Ana", "Sin realizar")
+    gestor.agregar_tarea("Ana", "Comprar", "personal")
+    gestor.eliminar_tarea(ids[2])
+    estadisticas = gestor.estadisticas_usuario("Ana")
+    assert (estadisticas['total_tareas'], estadisticas['tareas_completadas'],
+            estadisticas['tareas_pendientes'], estadisticas['tareas_sin_realizar']) == (3, 1, 1, 1)
+    assert estadisticas['porcentaje_completado'] == pytest.approx(33.33)
+
+
+def test_estadisticas_usuario_sin_tareas(gestor):
+    estadisticas = gestor.estadisticas_usuario("Nadie")
+    assert estadisticas['total_tareas'] == 0
+    assert estadisticas['porcentaje_completado'] is None
+
+
+def test_estadisticas_tras_renombrar(gestor):
+    tarea_id = gestor.agregar_tarea("Ana", "Leer", "estudio")
+    gestor.cambiar_estado_tarea(tarea_id, "Completada")
+    gestor.renombrar_usuario("Ana", "Ana María")
+    assert gestor.estadisticas_usuario("Ana María")['tareas_completadas'] == 1
+    assert gestor.estadisticas_usuario("Ana")['total_tareas'] == 0
+
+
+def _contadores(estadisticas):
+    return (estadisticas['total_tareas'], estadisticas['tareas_completadas'],
+            estadisticas['tareas_pendientes'], estadisticas['tareas_sin_realizar'])
+
+
+def _recuento_en_tareas(gestor, usuario):
+    with gestor.conexion() as conn, conn.cursor() as cur:
+        cur.execute(
+            """SELECT COUNT(t.id),
+                      COUNT(t.id) FILTER (WHERE t.estado = 'Completada'),
+                      COUNT(t.id) FILTER (WHERE t.estado = 'Pendiente'),
+                      COUNT(t.id) FILTER (WHERE t.estado = 'Sin realizar')
+               FROM usuarios u LEFT JOIN tareas t ON t.usuario_id = u.id
+               WHERE u.username = %s""",
+            (usuario,)
+        )
+        return cur.fetchone()
+
+
+def test_triggers_de_estadisticas_en_postgresql(gestor_pg):
+    # Un INSERT multi-fila: los triggers por sentencia ven todas las filas en la tabla de transición
+    ids = gestor_pg.agregar_tareas_lote("Ana", [("Leer", "estudio"), ("Correr", "personal"),
+                                                ("Informe", "trabajo"), ("Comprar", "personal")])['ids']
+    otra = gestor_pg.agregar_tarea("Beto", "Nadar", "personal")
+    gestor_pg.cambiar_estado_tarea(ids[0], "Completada")
+    gestor_pg.cambiar_estado_tarea_de_usuario(ids[1], "Ana", "Sin realizar")
+    gestor_pg.eliminar_tarea(ids[2])
+    assert _contadores(gestor_pg.estadisticas_usuario("Ana")) == (3, 1, 1, 1)
+
+    with gestor_pg.conexion() as conn, conn.cursor() as cur:
+        # Varias filas en una sentencia, una de ellas sin cambio real de estado
+        cur.execute("UPDATE tareas SET estado = 'Completada' WHERE id = ANY(%s)", ([ids[0], ids[3], otra],))
+        # Una tarea que cambia de usuario resta a uno y suma al otro
+        cur.execute("UPDATE tareas SET usuario_id = (SELECT usuario_id FROM tareas WHERE id = %s) WHERE id = %s",
+                    (ids[1], otra))
+        cur.execute("DELETE FROM tareas WHERE id = ANY(%s)", ([ids[0], ids[3]],))
+        conn.commit()
+    for usuario in ("Ana", "Beto"):
+        assert _contadores(gestor_pg.estadisticas_usuario(usuario)) == _recuento_en_tareas(gestor_pg, usuario)
+    assert _contadores(gestor_pg.estadisticas_usuario("Ana")) == (2, 1, 0, 1)
@@ -0,0 +1,106 @@
+import asyncio
+import inspect
+
+import pytest
+
+from services.gestor_tareas import AccesoDenegadoError, GestorTareas, TareaNoEncontradaError
+from services.gestor_tareas_async import AsyncGestorTareas
+
+
+def ejecutar(corrutina):
+    return asyncio.run(corrutina)
+
+
+def test_agregar_y_obtener_en_memoria():
+    async def escenario():
+        async with AsyncGestorTareas() as gestor:
+            tarea_id = await gestor.agregar_tarea("Ana", "Leer", "Estudio")
+            tarea = await gestor.obtener_tarea(tarea_id)
+            return tarea['categoria'], len(await gestor.obtener_tareas_usuario("Ana"))
+
+    assert ejecutar(escenario()) == ("estudio", 1)
+
+
+def test_muchas_corrutinas_concurrentes():
+    async def escenario():
+        gestor = await AsyncGestorTareas().iniciar()
+        ids = await asyncio.gather(*[
+            gestor.agregar_tarea(f"usuario{i % 10}", f"Tarea {i}", "trabajo") for i in range(1000)
+        ])
+        return ids, await gestor.obtener_tareas_usuario("usuario3")
+
+    ids, tareas = ejecutar(escenario())
+    assert len(set(ids)) == 1000
+    assert len(tareas) == 100
+
+
+def test_operaciones_con_propiedad():
+    async def escenario():
+        gestor = AsyncGestorTareas()
+        tarea_id = await gestor.agregar_tarea("Ana", "Leer", "estudio")
+        with pytest.raises(AccesoDenegadoError):
+            await gestor.editar_tarea_de_usuario(tarea_id, "Beto", "Otra", "trabajo")
+        await gestor.cambiar_estado_tarea_de_usuario(tarea_id, "Ana", "completada")
+        assert (await gestor.obtener_tarea_de_usuario(tarea_id, "Ana"))['estado'] == "Completada"
+        await gestor.eliminar_tarea_de_usuario(tarea_id, "Ana")
+        with pytest.raises(TareaNoEncontradaError):
+            await gestor.eliminar_tarea_de_usuario(tarea_id, "Ana")
+
+    ejecutar(escenario())
+
+
+def test_errores_envueltos_como_en_el_gestor_sincrono():
+    async def escenario():
+        gestor = AsyncGestorTareas()
+        with pytest.raises(RuntimeError):
+            await gestor.agregar_tarea("Ana", "   ", "trabajo")
+        with pytest.raises(RuntimeError):
+            await gestor.cambiar_estado_tarea(99, "Completada")
+
+    ejecutar(escenario())
+
+
+def test_paginacion_en_memoria():
+    async def escenario():
+        gestor = AsyncGestorTareas()
+        await gestor.agregar_tareas_lote("Ana", [(f"Tarea {i}", "trabajo") for i in range(5)])
+        primera = await gestor.obtener_tareas_usuario_paginado("Ana", limite=3)
+        segunda = await gestor.obtener_tareas_usuario_paginado("Ana", limite=3, cursor=primera['siguiente_cursor'])
+        return len(primera['tareas']), len(segunda['tareas']), segunda['siguiente_cursor']
+
+    assert ejecutar(escenario()) == (3, 2, None)
+
+
+def test_paginacion_con_filtros_en_memoria():
+    async def escenario():
+        gestor = AsyncGestorTareas()
+        await gestor.agregar_tareas_lote("Ana", [("Uno", "trabajo"), ("Dos", "personal"), ("Tres", "trabajo")])
+        await gestor.cambiar_estado_tarea_de_usuario(3, "Ana", "Completada")
+        pagina = await gestor.obtener_tareas_usuario_paginado("Ana", categoria="Trabajo", estado="pendiente")
+        return [tarea['descripcion'] for tarea in pagina['tareas']]
+
+    assert ejecutar(escenario()) == ["Uno"]
+
+
+def test_firmas_alineadas_con_el_gestor_sincrono():
+    for nombre, metodo in inspect.getmembers(AsyncGestorTareas, inspect.iscoroutinefunction):
+        if nombre.startswith('_') or not hasattr(GestorTareas, nombre):
+            continue
+        assert inspect.signature(metodo) == inspect.signature(getattr(GestorTareas, nombre)).replace(
+            return_annotation=inspect.signature(metodo).return_annotation
+        ), nombre
+
+
+def test_pertenencia_con_error_devuelve_false_como_el_sincrono():
+    def fallar(*args):
+        raise RuntimeError("base de datos caída")
+
+    async def fallar_async(*args):
+        fallar()
+
+    sincrono = GestorTareas()
+    sincrono.obtener_tarea_de_usuario = fallar
+    asincrono = AsyncGestorTareas()
+    asincrono.obtener_tarea_de_usuario = fallar_async
+    assert sincrono.tarea_pertenece_a_usuario(1, "Ana") is False
+    assert ejecutar(asincrono.tarea_pertenece_a_usuario(1, "Ana")) is False
@@ -0,0 +1,47 @@
+import pytest
+from services.gestor_tareas import GestorTareas
+
+
+@pytest.fixture
+def gestor():
+    return GestorTareas()
+
+
+def test_listado_usa_indice_por_usuario(gestor):
+    ids_ana = [gestor.agregar_tarea("Ana", f"Tarea {i}", "trabajo") for i in range(3)]
+    gestor.agregar_tarea("Beto", "Otra", "personal")
+    assert [t['id'] for t in gestor.obtener_tareas_usuario("Ana")] == ids_ana
+    assert list(gestor._indice_usuario["Ana"]) == ids_ana
+
+
+def test_eliminar_actualiza_indices(gestor):
+    tarea_id = gestor.agregar_tarea("Ana", "Unica", "estudio")
+    gestor.eliminar_tarea(tarea_id)
+    assert "Ana" not in gestor._indice_usuario
+    assert ("Ana", "estudio") not in gestor._indice_categoria
+    assert ("Ana", "Pendiente") not in gestor._indice_estado
+
+
+def test_filtrar_por_categoria_tras_editar(gestor):
+    tarea_id = gestor.agregar_tarea("Ana", "Leer", "personal")
+    gestor.agregar_tarea("Ana", "Informe", "trabajo")
+    gestor.editar_tarea(tarea_id, "Leer libro", "estudio")
+    tareas = gestor.obtener_tareas_usuario("Ana", categoria="estudio")
+    assert [t['id'] for t in tareas] == [tarea_id]
+    assert len(gestor.obtener_tareas_usuario("Ana", categoria="trabajo")) == 1
+
+
+def test_filtrar_por_estado_y_categoria(gestor):
+    t1 = gestor.agregar_tarea("Ana", "A", "trabajo")
+    t2 = gestor.agregar_tarea("Ana", "B", "trabajo")
+    gestor.agregar_tarea("Ana", "C", "personal")
+    gestor.cambiar_estado_tarea(t2, "completada")
+    tareas = gestor.obtener_tareas_usuario("Ana", categoria="trabajo", estado="Pendiente")
+    assert [t['id'] for t in tareas] == [t1]
+    assert [t['id'] for t in gestor.obtener_tareas_usuario("Ana", estado="completada")] == [t2]
+
+
+def test_filtro_sin_coincidencias_lanza_error(gestor):
+    gestor.agregar_tarea("Ana", "A", "trabajo")
+    with pytest.raises(RuntimeError):
+        gestor.obtener_tareas_usuario("Ana", estado="Sin realizar")
@@ -0,0 +1,72 @@
+import pytest
+
+from services.gestor_tareas import GestorTareas
+from services.instrumentacion import Instrumentacion
+
+
+@pytest.fixture
+def gestor():
+    return GestorTareas()
+
+
+@pytest.fixture
+def instrumentacion(gestor):
+    instrumentacion = Instrumentacion()
+    instrumentacion.instrumentar(gestor)
+    return instrumentacion
+
+
+def test_cuenta_llamadas_y_errores(gestor, instrumentacion):
+    gestor.agregar_tarea("Ana", "Leer", "estudio")
+    gestor.obtener_tareas_usuario("Ana")
+    with pytest.raises(RuntimeError):
+        gestor.obtener_tareas_usuario("Beto")
+    metricas = instrumentacion.instantanea()
+    assert metricas['agregar_tarea']['llamadas'] == 1
+    assert metricas['obtener_tareas_usuario']['llamadas'] == 2
+    assert metricas['obtener_tareas_usuario']['errores'] == 1
+    assert sum(metricas['obtener_tareas_usuario']['cubetas']) == 2
+
+
+def test_exportar_prometheus(gestor, instrumentacion):
+    gestor.agregar_tarea("Ana", "Leer", "estudio")
+    texto = instrumentacion.exportar_prometheus()
+    assert '# TYPE gestor_tareas_duracion_segundos histogram' in texto
+    assert 'gestor_tareas_llamadas_total{metodo="agregar_tarea"} 1' in texto
+    assert 'gestor_tareas_duracion_segundos_bucket{metodo="agregar_tarea",le="+Inf"} 1' in texto
+
+
+def test_desinstrumentar_restaura_metodos(gestor, instrumentacion):
+    instrumentacion.desinstrumentar(gestor)
+    assert 'agregar_tarea' not in vars(gestor)
+    gestor.agregar_tarea("Ana", "Leer", "estudio")
+    assert instrumentacion.instantanea() == {}
+
+
+def test_instrumentar_es_idempotente(gestor, instrumentacion):
+    instrumentacion.instrumentar(gestor)
+    gestor.agregar_tarea("Ana", "Leer", "estudio")
+    assert instrumentacion.instantanea()['agregar_tarea']['llamadas'] == 1
+
+
+def test_generadores_cuentan_al_terminar_el_recorrido(gestor, instrumentacion):
+    for descripcion in ("Uno", "Dos", "Tres"):
+        gestor.agregar_tarea("Ana", descripcion, "trabajo")
+    recorrido = gestor.iterar_tareas("Ana")
+    next(recorrido)
+    assert 'iterar_tareas' not in instrumentacion.instantanea()
+    assert len(list(recorrido)) == 2
+    parcial = gestor.iterar_tareas("Ana")
+    next(parcial)
+    parcial.close()
+    with pytest.raises(ValueError):
+        list(gestor.iterar_tareas("Ana", itersize=0))
+    metricas = instrumentacion.instantanea()['iterar_tareas']
+    assert (metricas['llamadas'], metricas['errores']) == (3, 1)
+
+
+def test_mide_cerrar_y_metricas_pool(gestor, instrumentacion):
+    gestor.metricas_pool()
+    gestor.cerrar()
+    metricas = instrumentacion.instantanea()
+    assert metricas['metricas_pool']['llamadas'] == metricas['cerrar']['llamadas'] == 1
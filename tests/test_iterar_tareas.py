@@ -0,0 +1,40 @@
+import types
+
+import pytest
+from services.gestor_tareas import GestorTareas
+
+
+@pytest.fixture
+def gestor():
+    gestor = GestorTareas()
+    gestor.agregar_tareas_lote("Ana", [("A1", "trabajo"), ("A2", "estudio"), ("A3", "trabajo")])
+    gestor.agregar_tareas_lote("Beto", [("B1", "trabajo")])
+    return gestor
+
+
+def test_iterar_es_generador(gestor):
+    assert isinstance(gestor.iterar_tareas(), types.GeneratorType)
+
+
+def test_iterar_todas(gestor):
+    assert [t['descripcion'] for t in gestor.iterar_tareas()] == ["A1", "A2", "A3", "B1"]
+
+
+def test_iterar_por_usuario_y_filtros(gestor):
+    tareas = gestor.iterar_tareas("Ana", filtros={'categoria': "trabajo"})
+    assert [t['descripcion'] for t in tareas] == ["A1", "A3"]
+    assert [t['usuario'] for t in gestor.iterar_tareas(filtros={'categoria': "trabajo"})] == ["Ana", "Ana", "Beto"]
+
+
+def test_iterar_tolera_eliminaciones_durante_recorrido(gestor):
+    vistos = []
+    for tarea in gestor.iterar_tareas("Ana"):
+        vistos.append(tarea['id'])
+        if tarea['id'] == 1:
+            gestor.eliminar_tarea(2)
+    assert vistos == [1, 3]
+
+
+def test_iterar_filtro_desconocido(gestor):
+    with pytest.raises(ValueError):
+        list(gestor.iterar_tareas(filtros={'prioridad': "alta"}))
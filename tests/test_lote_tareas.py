@@ -0,0 +1,41 @@
+import pytest
+from services.gestor_tareas import GestorTareas
+
+
+@pytest.fixture
+def gestor():
+    return GestorTareas()
+
+
+def test_agregar_lote_devuelve_ids_en_orden(gestor):
+    resultado = gestor.agregar_tareas_lote("User", [(f"Tarea {i}", "personal") for i in range(100)])
+    assert resultado['ids'] == list(range(1, 101))
+    assert resultado['errores'] == {}
+    assert len(gestor.obtener_tareas_usuario("User")) == 100
+
+
+def test_agregar_lote_reporta_errores_por_item(gestor):
+    items = [
+        {'descripcion': "Leer", 'categoria': "estudio"},
+        ("  ", "trabajo"),
+        ("Informe", "diversion"),
+        {'descripcion': "Correr"},
+        ("Pagar", "Personal"),
+    ]
+    resultado = gestor.agregar_tareas_lote("Ana", items)
+    assert resultado['ids'] == [1, None, None, None, 2]
+    assert sorted(resultado['errores']) == [1, 2, 3]
+    assert "DescripcionVaciaError" in resultado['errores'][1]
+    assert gestor.tareas[2]['categoria'] == "personal"
+
+
+def test_agregar_lote_continua_contador_de_ids(gestor):
+    gestor.agregar_tarea("Ana", "Primera", "trabajo")
+    resultado = gestor.agregar_tareas_lote("Ana", [("Segunda", "trabajo")])
+    assert resultado['ids'] == [2]
+    assert gestor.agregar_tarea("Ana", "Tercera", "trabajo") == 3
+
+
+def test_agregar_lote_usuario_vacio(gestor):
+    with pytest.raises(RuntimeError):
+        gestor.agregar_tareas_lote(" ", [("Leer", "estudio")])
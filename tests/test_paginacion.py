@@ -0,0 +1,46 @@
+import pytest
+from services.gestor_tareas import GestorTareas
+
+
+@pytest.fixture
+def gestor():
+    gestor = GestorTareas()
+    gestor.agregar_tareas_lote("Ana", [(f"Tarea {i}", "trabajo") for i in range(7)])
+    gestor.agregar_tarea("Beto", "Ajena", "personal")
+    return gestor
+
+
+def test_paginas_recorren_todas_las_tareas_sin_repetir(gestor):
+    vistos, cursor = [], None
+    while True:
+        pagina = gestor.obtener_tareas_usuario_paginado("Ana", limite=3, cursor=cursor)
+        vistos.extend(t['id'] for t in pagina['tareas'])
+        cursor = pagina['siguiente_cursor']
+        if cursor is None:
+            break
+    assert vistos == [7, 6, 5, 4, 3, 2, 1]
+
+
+def test_ultima_pagina_sin_cursor(gestor):
+    pagina = gestor.obtener_tareas_usuario_paginado("Ana", limite=7)
+    assert len(pagina['tareas']) == 7
+    assert pagina['siguiente_cursor'] is None
+
+
+def test_paginado_con_filtro(gestor):
+    gestor.cambiar_estado_tarea(2, "Completada")
+    gestor.cambiar_estado_tarea(5, "Completada")
+    pagina = gestor.obtener_tareas_usuario_paginado("Ana", limite=1, estado="Completada")
+    assert [t['id'] for t in pagina['tareas']] == [5]
+    siguiente = gestor.obtener_tareas_usuario_paginado(
+        "Ana", limite=1, estado="Completada", cursor=pagina['siguiente_cursor'])
+    assert [t['id'] for t in siguiente['tareas']] == [2]
+
+
+def test_usuario_sin_tareas_devuelve_pagina_vacia(gestor):
+    assert gestor.obtener_tareas_usuario_paginado("Nadie") == {'tareas': [], 'siguiente_cursor': None}
+
+
+def test_cursor_invalido(gestor):
+    with pytest.raises(RuntimeError):
+        gestor.obtener_tareas_usuario_paginado("Ana", cursor="no-es-un-cursor")
@@ -0,0 +1,84 @@
+from datetime import date
+
+import pytest
+
+from services.gestor_tareas import GestorTareas
+from services.mantenimiento_logs import MantenimientoLogs
+
+
+def test_gestion_de_particiones_en_memoria():
+    gestor = GestorTareas()
+    assert gestor.asegurar_particiones_logs() == 0
+    assert gestor.purgar_logs_actividad(12) == []
+    assert gestor.particiones_logs() == []
+    assert gestor.actividad_usuario("Ana") == []
+    with pytest.raises(ValueError):
+        gestor.purgar_logs_actividad(0)
+
+
+def test_mantenimiento_crea_y_purga(gestor_falso):
+    MantenimientoLogs(gestor_falso, meses_futuros=2, meses_retencion=6, solo_separar=True).ejecutar()
+    assert gestor_falso.llamadas == [('asegurar', 2), ('purgar', 6, True)]
+
+
+def test_mantenimiento_sin_retencion_no_purga(gestor_falso):
+    with MantenimientoLogs(gestor_falso, meses_retencion=None, intervalo=60) as mantenimiento:
+        pass
+    assert gestor_falso.llamadas == [('asegurar', 3)]
+    assert mantenimiento.ejecuciones == 1
+
+
+def test_mantenimiento_registra_errores(gestor_falso):
+    gestor_falso.fallar = True
+    mantenimiento = MantenimientoLogs(gestor_falso)
+    mantenimiento.ejecutar()
+    assert mantenimiento.errores == 1
+
+
+def _mes(desplazamiento):
+    hoy = date.today()
+    meses = hoy.year * 12 + hoy.month - 1 + desplazamiento
+    return date(meses // 12, meses % 12 + 1, 1)
+
+
+def _particion_de(cur, accion):
+    cur.execute("SELECT tableoid::regclass::text FROM logs_actividad WHERE accion = %s", (accion,))
+    return cur.fetchone()[0]
+
+
+def test_particiones_en_postgresql(gestor_pg):
+    nombres = {particion['nombre'] for particion in gestor_pg.particiones_logs()}
+    assert {f"logs_actividad_{_mes(i):%Y%m}" for i in range(4)} | {'logs_actividad_default'} == nombres
+    assert gestor_pg.asegurar_particiones_logs() == 0
+    gestor_pg.agregar_tarea("Ana", "Leer", "estudio")
+    assert [evento['accion'] for evento in gestor_pg.actividad_usuario("Ana")] == ['AGREGAR_TAREA']
+
+    antiguo, muy_antiguo = _mes(-14), _mes(-20)
+    with gestor_pg.conexion() as conn, conn.cursor() as cur:
+        cur.execute("""INSERT INTO logs_actividad (accion, descripcion, fecha_log)
+                       VALUES ('ANTIGUO', '', %s), ('MUY_ANTIGUO', '', %s), ('FUTURO', '', %s)""",
+                    (antiguo, muy_antiguo, _mes(12)))
+        assert _particion_de(cur, 'ANTIGUO') == 'logs_actividad_default'
+        # Crear la partición de un mes mueve a ella sus filas de la partición por defecto
+        cur.execute("SELECT crear_particion_logs(%s)", (antiguo,))
+        assert cur.fetchone()[0] is True
+        assert _particion_de(cur, 'ANTIGUO') == f"logs_actividad_{antiguo:%Y%m}"
+        assert _particion_de(cur, 'MUY_ANTIGUO') == 'logs_actividad_default'
+        cur.execute("SELECT crear_particion_logs(%s)", (antiguo,))
+        assert cur.fetchone()[0] is False
+        conn.commit()
+
+    # Se separa la partición vencida (queda como tabla suelta) y se borran
+    # las filas vencidas de la partición por defecto
+    assert gestor_pg.purgar_logs_actividad(12, solo_separar=True) == [f"logs_actividad_{antiguo:%Y%m}"]
+    with gestor_pg.conexion() as conn, conn.cursor() as cur:
+        cur.execute("SELECT accion FROM logs_actividad ORDER BY accion")
+        assert [fila[0] for fila in cur.fetchall()] == ['AGREGAR_TAREA', 'FUTURO']
+        cur.execute("SELECT COUNT(*) FROM logs_actividad_" + f"{antiguo:%Y%m}")
+        assert cur.fetchone()[0] == 1
+        cur.execute("SELECT crear_particion_logs(%s)", (muy_antiguo,))
+        conn.commit()
+    assert gestor_pg.purgar_logs_actividad(12) == [f"logs_actividad_{muy_antiguo:%Y%m}"]
+    with gestor_pg.conexion() as conn, conn.cursor() as cur:
+        cur.execute("SELECT to_regclass(%s)", (f"logs_actividad_{muy_antiguo:%Y%m}",))
+        assert cur.fetchone()[0] is None
@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+from psycopg2 import extensions
+
+from database.pool_conexiones import PoolConexiones, PoolAgotadoError
+
+
+class ConexionFalsa:
+    def __init__(self):
+        self.closed = 0
+        self.autocommit = True
+        self.rollbacks = 0
+        self.estado = extensions.TRANSACTION_STATUS_IDLE
+
+    def get_transaction_status(self):
+        return self.estado
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.estado = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def creadas():
+    return []
+
+
+@pytest.fixture
+def fabrica(creadas):
+    def crear():
+        conn = ConexionFalsa()
+        creadas.append(conn)
+        return conn
+    return crear
+
+
+def test_pool_abre_minimo_al_iniciar(fabrica, creadas):
+    pool = PoolConexiones({}, minimo=3, maximo=5, fabrica_conexion=fabrica)
+    assert len(creadas) == 3
+    assert pool.metricas()['libres'] == 3
+    assert all(conn.autocommit is False for conn in creadas)
+
+
+def test_pool_tamanos_invalidos(fabrica):
+    with pytest.raises(ValueError):
+        PoolConexiones({}, minimo=5, maximo=2, fabrica_conexion=fabrica)
+
+
+def test_pool_reutiliza_conexion_devuelta(fabrica, creadas):
+    pool = PoolConexiones({}, minimo=1, maximo=2, fabrica_conexion=fabrica)
+    with pool.conexion() as c1:
+        pass
+    with pool.conexion() as c2:
+        pass
+    assert c1 is c2
+    assert len(creadas) == 1
+
+
+def test_pool_timeout_al_agotarse(fabrica):
+    pool = PoolConexiones({}, minimo=0, maximo=1, timeout=0.05, fabrica_conexion=fabrica)
+    conn = pool.obtener()
+    with pytest.raises(PoolAgotadoError):
+        pool.obtener()
+    assert pool.metricas()['timeouts'] == 1
+    pool.devolver(conn)
+
+
+def test_pool_despierta_hilo_en_espera(fabrica):
+    pool = PoolConexiones({}, minimo=1, maximo=1, timeout=2, fabrica_conexion=fabrica)
+    conn = pool.obtener()
+    obtenidas = []
+    hilo = threading.Thread(target=lambda: obtenidas.append(pool.obtener()))
+    hilo.start()
+    while pool.metricas()['esperando'] == 0:
+        time.sleep(0.001)
+    pool.devolver(conn)
+    hilo.join(timeout=2)
+    assert obtenidas == [conn]
+    assert pool.metricas()['esperas'] == 1
+
+
+def test_pool_deshace_transaccion_abierta_al_devolver(fabrica):
+    pool = PoolConexiones({}, minimo=1, maximo=1, fabrica_conexion=fabrica)
+    with pool.conexion() as conn:
+        conn.estado = extensions.TRANSACTION_STATUS_INTRANS
+    assert conn.rollbacks == 1
+
+
+def test_pool_reemplaza_conexion_cerrada(fabrica, creadas):
+    pool = PoolConexiones({}, minimo=1, maximo=1, fabrica_conexion=fabrica)
+    creadas[0].closed = 1
+    with pool.conexion() as conn:
+        assert conn is not creadas[0]
+    assert pool.metricas()['descartadas'] == 1
+    assert pool.metricas()['total'] == 1
+
+
+def test_pool_metricas_latencia(fabrica):
+    pool = PoolConexiones({}, minimo=1, maximo=2, fabrica_conexion=fabrica)
+    for _ in range(5):
+        with pool.conexion():
+            pass
+    metricas = pool.metricas()
+    assert metricas['obtenciones'] == 5
+    assert metricas['latencia_p99_ms'] >= metricas['latencia_p50_ms'] >= 0
@@ -0,0 +1,51 @@
+import pytest
+from services.gestor_tareas import GestorTareas, TareaNoEncontradaError, AccesoDenegadoError
+
+
+@pytest.fixture
+def gestor():
+    return GestorTareas()
+
+
+def test_eliminar_tarea_propia(gestor):
+    tarea_id = gestor.agregar_tarea("Ana", "Leer", "estudio")
+    gestor.eliminar_tarea_de_usuario(tarea_id, "Ana")
+    assert tarea_id not in gestor.tareas
+
+
+def test_eliminar_tarea_ajena_lanza_acceso_denegado(gestor):
+    tarea_id = gestor.agregar_tarea("Ana", "Leer", "estudio")
+    with pytest.raises(AccesoDenegadoError):
+        gestor.eliminar_tarea_de_usuario(tarea_id, "Beto")
+    assert tarea_id in gestor.tareas
+
+
+def test_cambiar_estado_tarea_inexistente(gestor):
+    with pytest.raises(TareaNoEncontradaError):
+        gestor.cambiar_estado_tarea_de_usuario(99, "Ana", "Completada")
+
+
+def test_cambiar_estado_tarea_propia(gestor):
+    tarea_id = gestor.agregar_tarea("Ana", "Leer", "estudio")
+    gestor.cambiar_estado_tarea_de_usuario(tarea_id, "Ana", "completada")
+    assert gestor.tareas[tarea_id]['estado'] == "Completada"
+
+
+def test_editar_tarea_ajena_no_modifica(gestor):
+    tarea_id = gestor.agregar_tarea("Ana", "Leer", "estudio")
+    with pytest.raises(AccesoDenegadoError):
+        gestor.editar_tarea_de_usuario(tarea_id, "Beto", "Otra", "trabajo")
+    assert gestor.tareas[tarea_id]['descripcion'] == "Leer"
+
+
+def test_editar_con_descripcion_vacia(gestor):
+    tarea_id = gestor.agregar_tarea("Ana", "Leer", "estudio")
+    with pytest.raises(RuntimeError):
+        gestor.editar_tarea_de_usuario(tarea_id, "Ana", "  ", "trabajo")
+
+
+def test_tarea_pertenece_a_usuario(gestor):
+    tarea_id = gestor.agregar_tarea("Ana", "Leer", "estudio")
+    assert gestor.tarea_pertenece_a_usuario(tarea_id, "Ana")
+    assert not gestor.tarea_pertenece_a_usuario(tarea_id, "Beto")
+    assert not gestor.tarea_pertenece_a_usuario(tarea_id + 1, "Ana")
@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+
+from services.registro_actividad import RegistroActividad
+
+
+class RegistroEnLista(RegistroActividad):
+    """Guarda los lotes en una lista en lugar de escribirlos en PostgreSQL."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.escrituras = []
+        self.fallar = False
+        self.escrito = threading.Event()
+
+    def _escribir(self, lote):
+        if self.fallar:
+            raise RuntimeError("base de datos caída")
+        self.escrituras.append([evento[:3] for evento in lote])
+        self.escritos += len(lote)
+        self.escrito.set()
+
+
+def test_lote_por_tamano_y_vaciado_al_detener(gestor_falso):
+    registro = RegistroEnLista(gestor_falso, tamano_lote=3, intervalo=60)
+    registro.iniciar()
+    assert registro.gestor.registro_actividad is registro
+    for i in range(4):
+        registro.registrar(1, 'AGREGAR_TAREA', f"Nueva tarea: {i}")
+    assert registro.escrito.wait(2)
+    registro.detener()
+    assert registro.gestor.registro_actividad is None
+    assert [len(lote) for lote in registro.escrituras] == [3, 1]
+    assert registro.escrituras[1] == [(1, 'AGREGAR_TAREA', "Nueva tarea: 3")]
+
+
+def test_lote_por_intervalo(gestor_falso):
+    with RegistroEnLista(gestor_falso, tamano_lote=100, intervalo=0.01) as registro:
+        registro.registrar(1, 'CAMBIAR_ESTADO', "Tarea ID: 1")
+        assert registro.escrito.wait(2)
+
+
+def test_sincrona_escribe_antes_de_volver(gestor_falso):
+    registro = RegistroEnLista(gestor_falso, durabilidad='sincrona')
+    registro.registrar(2, 'AGREGAR_TAREA', "Nueva tarea: Leer")
+    assert registro.escrituras == [[(2, 'AGREGAR_TAREA', "Nueva tarea: Leer")]]
+
+
+def test_mejor_esfuerzo_descarta_los_mas_antiguos(gestor_falso):
+    registro = RegistroEnLista(gestor_falso, tamano_lote=2, durabilidad='mejor_esfuerzo', maximo_pendientes=2)
+    for i in range(5):
+        registro.registrar(1, 'AGREGAR_TAREA', str(i))
+    assert registro.estadisticas()['descartados'] == 3
+    registro.vaciar()
+    assert registro.escrituras == [[(1, 'AGREGAR_TAREA', "3"), (1, 'AGREGAR_TAREA', "4")]]
+
+
+def test_lote_fallido_vuelve_a_la_cola(gestor_falso):
+    registro = RegistroEnLista(gestor_falso, tamano_lote=10)
+    registro.registrar(1, 'AGREGAR_TAREA', "a")
+    registro.fallar = True
+    assert registro.vaciar() == 0
+    assert registro.estadisticas()['pendientes'] == 1
+    registro.fallar = False
+    assert registro.vaciar() == 1
+
+
+def test_durabilidad_invalida(gestor_falso):
+    with pytest.raises(ValueError):
+        RegistroActividad(gestor_falso, durabilidad='nunca')
+
+
+def test_lote_con_cola_llena_descarta_tras_la_espera_maxima(gestor_falso):
+    registro = RegistroEnLista(gestor_falso, tamano_lote=2, maximo_pendientes=2, espera_maxima=0.05)
+    for i in range(3):
+        registro.registrar(1, 'AGREGAR_TAREA', str(i))
+    assert registro.estadisticas()['descartados'] == 1
+    registro.vaciar()
+    assert registro.escrituras == [[(1, 'AGREGAR_TAREA', "0"), (1, 'AGREGAR_TAREA', "1")]]
+
+
+def test_reintentos_con_espera_exponencial(gestor_falso):
+    intentos = []
+
+    class RegistroCaido(RegistroEnLista):
+        def _escribir(self, lote):
+            intentos.append(len(lote))
+            raise RuntimeError("base de datos caída")
+
+    registro = RegistroCaido(gestor_falso, tamano_lote=1, intervalo=0.05, reintento_maximo=0.2)
+    registro.iniciar()
+    registro.registrar(1, 'AGREGAR_TAREA', "a")
+    threading.Event().wait(0.5)
+    registro.detener(timeout=1)
+    # Sin espera entre fallos serían miles de intentos; con 0.05, 0.1, 0.2, 0.2... unos pocos
+    assert 2 <= len(intentos) <= 8
+    assert registro.estadisticas()['pendientes'] == 1
+
+
+def test_escritor_propio(gestor_falso):
+    lotes = []
+    registro = RegistroActividad(gestor_falso, durabilidad='sincrona', escritor=lotes.append)
+    registro.registrar(3, 'AGREGAR_TAREA', "Nueva tarea: Leer")
+    assert [evento[:3] for evento in lotes[0]] == [(3, 'AGREGAR_TAREA', "Nueva tarea: Leer")]
+    assert registro.estadisticas()['escritos'] == 1
+
+
+def test_un_solo_registro_por_gestor(gestor_falso):
+    primero = RegistroEnLista(gestor_falso, tamano_lote=10, intervalo=60)
+    primero.iniciar()
+    primero.registrar(1, 'AGREGAR_TAREA', "a")
+    segundo = RegistroActividad(gestor_falso, escritor=lambda lote: None).iniciar()
+    # El anterior se detiene y escribe lo que tenía pendiente
+    assert gestor_falso.registro_actividad is segundo
+    assert primero.escrituras == [[(1, 'AGREGAR_TAREA', "a")]]
+    segundo.detener()
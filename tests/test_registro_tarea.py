@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import pytest
+from models.tarea import RegistroTarea
+from services.gestor_tareas import GestorTareas
+
+
+def test_registro_sin_dict_por_instancia():
+    registro = RegistroTarea(1, "Ana", "Leer", "estudio", datetime.now())
+    assert not hasattr(registro, '__dict__')
+
+
+def test_registro_conserva_fecha_exacta():
+    fecha = datetime(2025, 5, 30, 14, 3, 7, 123456)
+    registro = RegistroTarea(1, "Ana", "Leer", "estudio", fecha)
+    assert registro.fecha_creacion == fecha
+    assert registro['fecha_creacion'] == fecha
+
+
+def test_registro_version_y_ultimo_cambio():
+    fecha = datetime(2025, 5, 30, 14, 3, 7, 123456)
+    registro = RegistroTarea(1, "Ana", "Leer", "estudio", fecha, version=4)
+    assert (registro.version, registro.actualizado_en) == (4, fecha)
+    cambio = datetime(2025, 6, 1, 9, 0, 0, 1)
+    registro.marcar_cambio(9, cambio)
+    assert (registro.version, registro.actualizado_en) == (9, cambio)
+    assert registro.fecha_creacion == fecha
+    assert (registro['version'], registro.get('actualizado_en')) == (9, cambio)
+    with pytest.raises(KeyError):
+        registro['version'] = 10
+
+
+def test_registro_vista_dict():
+    registro = RegistroTarea(3, "Ana", "Leer", "estudio", datetime.now())
+    registro['estado'] = "Completada"
+    assert registro['estado'] == registro.estado == "Completada"
+    assert registro.get('prioridad', 'baja') == 'baja'
+    assert set(registro.como_dict()) == set(RegistroTarea.CAMPOS)
+    with pytest.raises(KeyError):
+        registro['prioridad']
+
+
+def test_registro_rechaza_valores_invalidos():
+    registro = RegistroTarea(1, "Ana", "Leer", "estudio", datetime.now())
+    with pytest.raises(ValueError):
+        registro.estado = "Archivada"
+    with pytest.raises(ValueError):
+        registro.categoria = "ocio"
+
+
+def test_gestor_interna_usuarios():
+    gestor = GestorTareas()
+    t1 = gestor.agregar_tarea("".join(["A", "na"]), "Uno", "trabajo")
+    t2 = gestor.agregar_tarea("".join(["An", "a"]), "Dos", "trabajo")
+    assert gestor.tareas[t1].usuario is gestor.tareas[t2].usuario
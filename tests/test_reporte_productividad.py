@@ -0,0 +1,70 @@
+import threading
+
+import psycopg2
+import pytest
+
+from services.gestor_tareas import GestorTareas
+from services.refresco_reportes import RefrescoReportes
+
+
+def test_reporte_productividad_en_memoria():
+    gestor = GestorTareas()
+    ids = gestor.agregar_tareas_lote("Ana", [("Leer", "estudio"), ("Correr", "personal"), ("Informe", "trabajo")])['ids']
+    gestor.cambiar_estado_tarea(ids[0], "Completada")
+    gestor.agregar_tarea("Luis", "Comprar", "personal")
+
+    reporte = gestor.reporte_productividad()
+    assert [fila['username'] for fila in reporte] == ["Ana", "Luis"]
+    assert reporte[0]['tareas_completadas_mes'] == 1
+    assert reporte[0]['tareas_pendientes'] == 2
+    assert reporte[0]['porcentaje_eficiencia'] == pytest.approx(33.33)
+    assert gestor.reporte_productividad("Luis")[0]['tareas_pendientes'] == 1
+    assert gestor.reporte_productividad("Nadie") == []
+
+
+def test_refresco_tras_n_mutaciones(gestor_falso):
+    refresco = RefrescoReportes(gestor_falso, intervalo=None, cada_mutaciones=5)
+    with refresco:
+        gestor_falso.mutar(3)
+        assert not gestor_falso.refrescado.wait(0.2)
+        gestor_falso.mutar(2)
+        assert gestor_falso.refrescado.wait(2)
+    assert gestor_falso.llamadas == [('refrescar',)]
+    assert gestor_falso.oyentes == []
+
+
+def test_refresco_periodico(gestor_falso):
+    with RefrescoReportes(gestor_falso, intervalo=0.01):
+        assert gestor_falso.refrescado.wait(2)
+
+
+def test_refresco_necesita_un_disparador(gestor_falso):
+    with pytest.raises(ValueError):
+        RefrescoReportes(gestor_falso, intervalo=None)
+
+
+def test_refresco_concurrente_en_postgresql(gestor_pg, db_config):
+    ids = gestor_pg.agregar_tareas_lote("Ana", [("Leer", "estudio"), ("Correr", "personal"), ("Informe", "trabajo")])['ids']
+    gestor_pg.cambiar_estado_tarea(ids[0], "Completada")
+    gestor_pg.refrescar_reporte_productividad(concurrente=False)
+    antes = gestor_pg.reporte_productividad("Ana")[0]
+    assert (antes['tareas_completadas_mes'], antes['tareas_pendientes']) == (1, 2)
+
+    # Hasta el siguiente refresco se leen los datos ya calculados
+    gestor_pg.cambiar_estado_tarea(ids[1], "Completada")
+    assert gestor_pg.reporte_productividad("Ana")[0] == antes
+
+    # Una transacción que está leyendo la vista no bloquea el refresco concurrente
+    lector = psycopg2.connect(**db_config)
+    try:
+        with lector.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM reporte_productividad")
+        refresco = threading.Thread(target=gestor_pg.refrescar_reporte_productividad)
+        refresco.start()
+        refresco.join(10)
+        assert not refresco.is_alive()
+    finally:
+        lector.close()
+    despues = gestor_pg.reporte_productividad("Ana")[0]
+    assert (despues['tareas_completadas_mes'], despues['tareas_pendientes']) == (2, 1)
+    assert despues['calculado_en'] >= antes['calculado_en']
@@ -0,0 +1,69 @@
+import socket
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from Vista.web import gestor_tareas_web
+from Vista.web.servidor import ServidorHilos
+
+
+def test_crear_app_sin_iniciar_no_abre_recursos():
+    app = gestor_tareas_web.crear_app(iniciar=False)
+    gestor_tareas_web.precargar_plantillas(app)
+    assert {'login', 'logout', 'index'} <= set(app.view_functions)
+    assert gestor_tareas_web.gestor is None
+
+
+def test_app_del_modulo_se_crea_al_pedirla(monkeypatch):
+    creadas = []
+    monkeypatch.setattr(gestor_tareas_web, 'crear_app', lambda: creadas.append(object()) or creadas[-1])
+    try:
+        assert gestor_tareas_web.app is gestor_tareas_web.app is creadas[0]
+        assert len(creadas) == 1
+    finally:
+        vars(gestor_tareas_web).pop('app', None)
+
+
+@pytest.fixture
+def servidor():
+    en_curso = []
+    maximo = []
+    lock = threading.Lock()
+
+    def app(environ, start_response):
+        with lock:
+            en_curso.append(1)
+            maximo.append(len(en_curso))
+        time.sleep(0.05)
+        with lock:
+            en_curso.pop()
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return [b'ok']
+
+    sock = socket.create_server(('127.0.0.1', 0))
+    srv = ServidorHilos(app, '127.0.0.1', sock.fileno(), hilos=2)
+    hilo = threading.Thread(target=srv.serve_forever, daemon=True)
+    hilo.start()
+    yield sock.getsockname()[1], maximo
+    srv.shutdown()
+    srv.terminar()
+    sock.close()
+
+
+def test_servidor_hilos_acota_peticiones_simultaneas(servidor):
+    puerto, maximo = servidor
+    respuestas = []
+
+    def pedir():
+        with urllib.request.urlopen(f'http://127.0.0.1:{puerto}/') as r:
+            respuestas.append(r.read())
+
+    hilos = [threading.Thread(target=pedir) for _ in range(6)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    assert respuestas == [b'ok'] * 6
+    assert max(maximo) == 2
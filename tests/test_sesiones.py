@@ -0,0 +1,83 @@
+import time
+
+import pytest
+from flask import Flask, session
+
+from services.sesiones import AlmacenSesionesMemoria, AlmacenSesionesSQLite, crear_almacen_sesiones
+from Vista.web.sesiones import InterfazSesionesServidor
+
+
+@pytest.fixture(params=['memoria', 'sqlite'])
+def almacen(request, tmp_path):
+    return crear_almacen_sesiones(request.param, ruta=str(tmp_path / 'sesiones.db'))
+
+
+def test_almacen_guardar_obtener_eliminar(almacen):
+    assert almacen.obtener("abc") is None
+    almacen.guardar("abc", '{"usuario": "ana"}')
+    assert almacen.obtener("abc") == '{"usuario": "ana"}'
+    almacen.eliminar("abc")
+    assert almacen.obtener("abc") is None
+
+
+def test_sqlite_compartido_y_caducidad(tmp_path):
+    ruta = str(tmp_path / 'sesiones.db')
+    AlmacenSesionesSQLite(ruta).guardar("abc", "datos")
+    assert AlmacenSesionesSQLite(ruta).obtener("abc") == "datos"
+    almacen = AlmacenSesionesSQLite(ruta, ttl=0.01)
+    almacen.guardar("efimera", "datos")
+    time.sleep(0.02)
+    assert almacen.obtener("efimera") is None
+
+
+def test_backend_invalido():
+    with pytest.raises(ValueError):
+        crear_almacen_sesiones('cookie')
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.secret_key = 'prueba'
+    app.session_interface = InterfazSesionesServidor(AlmacenSesionesMemoria())
+
+    @app.route('/entrar')
+    def entrar():
+        session.regenerar()
+        session['usuario'] = 'ana'
+        session['usuario_id'] = 7
+        return ''
+
+    @app.route('/quien')
+    def quien():
+        return f"{session.get('usuario')}:{session.get('usuario_id')}"
+
+    @app.route('/salir')
+    def salir():
+        session.clear()
+        return ''
+
+    return app
+
+
+def test_la_cookie_solo_lleva_el_identificador(app):
+    cliente = app.test_client()
+    cliente.get('/entrar')
+    sid = cliente.get_cookie('session').value
+    assert 'ana' not in sid
+    assert app.session_interface.almacen.obtener(sid) is not None
+    assert cliente.get('/quien').text == "ana:7"
+
+
+def test_regenerar_y_salir_borran_la_sesion_anterior(app):
+    cliente = app.test_client()
+    cliente.get('/entrar')
+    primera = cliente.get_cookie('session').value
+    cliente.get('/entrar')
+    segunda = cliente.get_cookie('session').value
+    almacen = app.session_interface.almacen
+    assert primera != segunda
+    assert almacen.obtener(primera) is None
+    cliente.get('/salir')
+    assert almacen.obtener(segunda) is None
+    assert cliente.get('/quien').text == "None:None"